@@ -1,12 +1,25 @@
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Callable, Awaitable, Set
+from datetime import datetime, timedelta, timezone
 from playwright.sync_api import sync_playwright, Page, Browser
+from playwright.async_api import async_playwright
+import asyncio
 import json
 import logging
-from supabase import create_client, Client
-import os
+from supabase import Client
 from dotenv import load_dotenv
+from scraper.fingerprint import fingerprint
+from scraper.page_pool import PagePool
+from scraper.interception import InterceptionStats, RequestInterceptor, get_policy, site_domain
+from scraper.scrapers.hybrid_fetch import HybridFetcher
+from scraper.debug_capture import DebugCapture
+from scraper.incremental import IncrementalCrawl
+from scraper.frontier import dedupe_urls, get_frontier
+from scraper.checkpoint import CrawlCheckpoint
+from scraper.metrics import count, timed
+from scraper.images import ImagePipeline
+from scraper.db import get_supabase
+from scraper.ingest import row_unchanged
 
 load_dotenv()
 
@@ -29,23 +42,108 @@ class ScrapedArticle:
     published_at: datetime
     tags: List[str]
     source_id: str
+    # Filled by BaseScraper.image_variants when an image pipeline is set
+    image_variants: Optional[List[Dict[str, Any]]] = None
+
+# Articles scraped more recently than this are skipped by scrape_category
+FRESHNESS_WINDOW = timedelta(days=7)
+
+BROWSER_ARGS = [
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--disable-setuid-sandbox',
+    '--no-sandbox',
+    '--no-zygote',
+    '--single-process',
+    '--disable-web-security',
+    '--disable-features=IsolateOrigins,site-per-process',
+]
+
+# Configure browser context with common headers
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'extra_http_headers': {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate, br',
+    }
+}
+
+PAGE_TIMEOUT = 60000
+
+# Walk the article once inside the page and return every block in document order,
+# so extraction costs one IPC round trip instead of several per element
+STRUCTURED_CONTENT_SCRIPT = """
+(root) => Array.from(root.querySelectorAll('p, h1, h2, h3, h4, h5, h6, img, blockquote'))
+    .map(el => {
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'p') {
+            return {type: 'text', content: el.textContent.trim()};
+        }
+        if (tag === 'img') {
+            return {
+                type: 'image',
+                content: el.getAttribute('src') || '',
+                metadata: {alt: el.getAttribute('alt') || '', caption: el.getAttribute('title')}
+            };
+        }
+        if (tag === 'blockquote') {
+            return {type: 'quote', content: el.textContent.trim(), metadata: {source: el.getAttribute('cite')}};
+        }
+        return {type: 'header', content: el.textContent.trim(), metadata: {level: Number(tag[1])}};
+    })
+    .filter(block => block.type !== 'text' || block.content)
+"""
 
 class BaseScraper:
-    def __init__(self, base_url: str, source_id: str):
+    # Name of the source, used to pick its request interception policy
+    source_name = 'default'
+    # Subclasses that try static HTTP first only launch the browser on fallback
+    http_first = False
+
+    def __init__(self, base_url: str, source_id: str, pool_size: int = 1,
+                 debug_capture: Optional[DebugCapture] = None, images: Optional[ImagePipeline] = None,
+                 supabase: Optional[Client] = None):
         self.base_url = base_url
         self.source_id = source_id
+        self.pool_size = pool_size
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
         self.playwright = None
         self.context = None
-        self.supabase: Client = create_client(
-            os.getenv('SUPABASE_URL'),
-            os.getenv('SUPABASE_KEY')
+        # Async browser and page pool, used when pool_size > 1
+        self.async_playwright = None
+        self.async_browser = None
+        self.async_context = None
+        self.page_pool: Optional[PagePool] = None
+        self.interceptor = RequestInterceptor(
+            get_policy(self.source_name), site_domain(base_url), InterceptionStats()
         )
+        self.fetcher = HybridFetcher()
+        self.debug = debug_capture or DebugCapture.from_env()
+        self.frontier = get_frontier()
+        # Stores resized variants of article images on save when set
+        self.images = images
+        # Shared by default, so scrapers reuse one set of database connections
+        self.supabase: Client = supabase or get_supabase()
         self.logger = logging.getLogger(__name__)
+        # url -> last_scraped_at (None for URLs not yet in the database), kept for the run
+        self.freshness_index: Dict[str, Optional[datetime]] = {}
+        # url -> stored content_hash, filled by the same query
+        self.content_hashes: Dict[str, str] = {}
+        # url -> stored image_variants, only queried when an image pipeline is set
+        self.stored_variants: Dict[str, Any] = {}
+        # URLs the freshness query found in the articles table
+        self.known_urls: Set[str] = set()
+        # url -> last modification reported by a sitemap or feed
+        self.lastmod: Dict[str, datetime] = {}
 
     def __enter__(self):
-        self.start()
+        # Pooled scrapers run on the async API and start their own browser,
+        # HTTP-first scrapers start it on the first fallback
+        if self.pool_size <= 1 and not self.http_first:
+            self.start()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -55,91 +153,241 @@ class BaseScraper:
         """Initialize the browser and configure settings"""
         try:
             self.playwright = sync_playwright().start()
-            browser_args = [
-                '--disable-gpu',
-                '--disable-dev-shm-usage',
-                '--disable-setuid-sandbox',
-                '--no-sandbox',
-                '--no-zygote',
-                '--single-process',
-                '--disable-web-security',
-                '--disable-features=IsolateOrigins,site-per-process',
-            ]
             
             # Configure Chromium options for reliability
             self.browser = self.playwright.chromium.launch(
                 headless=True,
-                args=browser_args,
+                args=BROWSER_ARGS,
                 ignore_default_args=['--enable-automation']
             )
             
-            # Configure browser context with common headers
-            self.context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                extra_http_headers={
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                }
-            )
+            self.context = self.browser.new_context(**CONTEXT_OPTIONS)
             
             self.page = self.context.new_page()
-            self.page.set_default_timeout(60000)  # Increase timeout to 60 seconds
-            self.page.set_default_navigation_timeout(60000)  # Increase navigation timeout to 60 seconds
+            self.page.set_default_timeout(PAGE_TIMEOUT)  # Increase timeout to 60 seconds
+            self.page.set_default_navigation_timeout(PAGE_TIMEOUT)  # Increase navigation timeout to 60 seconds
             
-            # Disable loading images and other resources to speed up
-            self.context.route("**/*.{png,jpg,jpeg,webp,gif,css,woff2}", lambda route: route.abort())
+            # Abort images, styles, trackers and other requests the source's policy excludes
+            self.interceptor.install(self.context)
             
         except Exception as e:
             self.logger.error(f"Error starting browser: {str(e)}")
             self.close()
             raise
 
+    def ensure_browser(self):
+        """Start the sync browser if it is not running yet"""
+        if self.page is None:
+            self.start()
+
+    async def start_pool(self, size: Optional[int] = None):
+        """Launch an async browser with a pool of pages for parallel scraping"""
+        try:
+            self.async_playwright = await async_playwright().start()
+            self.async_browser = await self.async_playwright.chromium.launch(
+                headless=True,
+                args=BROWSER_ARGS,
+                ignore_default_args=['--enable-automation']
+            )
+            self.async_context = await self.async_browser.new_context(**CONTEXT_OPTIONS)
+            await self.interceptor.install_async(self.async_context)
+
+            self.page_pool = PagePool(self.async_context, size or self.pool_size, timeout=PAGE_TIMEOUT)
+            await self.page_pool.start()
+
+        except Exception as e:
+            self.logger.error(f"Error starting browser pool: {str(e)}")
+            await self.close_pool()
+            raise
+
+    async def ensure_pool(self, size: Optional[int] = None):
+        """Start the async browser pool if it is not running yet"""
+        if self.page_pool is None:
+            await self.start_pool(size)
+
+    async def map_pages(self, items: List[Any], worker: Callable[[Any, Any], Awaitable[Any]]) -> List[Any]:
+        """Run worker(page, item) for every item on pooled pages, returning results in input order"""
+        async def run(item):
+            async with self.page_pool.page() as page:
+                try:
+                    return await worker(page, item)
+                except Exception as e:
+                    self.logger.error(f"Error in pooled worker for {item}: {str(e)}")
+                    return None
+
+        return await asyncio.gather(*[run(item) for item in items])
+
+    async def close_pool(self):
+        """Clean up the async browser and page pool"""
+        if self.page_pool:
+            await self.page_pool.close()
+            self.page_pool = None
+        for resource in (self.async_context, self.async_browser):
+            if resource:
+                try:
+                    await resource.close()
+                except:
+                    pass
+        if self.async_playwright:
+            try:
+                await self.async_playwright.stop()
+            except:
+                pass
+        self.async_context = self.async_browser = self.async_playwright = None
+
+    def capture_screenshot(self) -> Optional[bytes]:
+        """Take a compressed full-page screenshot for a debug capture"""
+        try:
+            return self.page.screenshot(type='jpeg', quality=60, full_page=True)
+        except Exception as e:
+            self.logger.warning(f"Failed to take debug screenshot: {str(e)}")
+            return None
+
     def extract_structured_content(self, article_element) -> List[ContentBlock]:
-        """Extract content into structured blocks"""
+        """Extract content into structured blocks in document order with a single evaluate call"""
+        with timed('extraction', self.source_name):
+            return self.blocks_from_dicts(article_element.evaluate(STRUCTURED_CONTENT_SCRIPT))
+
+    @staticmethod
+    def blocks_from_dicts(raw_blocks: List[Dict[str, Any]]) -> List[ContentBlock]:
+        """Convert the dicts returned by STRUCTURED_CONTENT_SCRIPT into ContentBlocks"""
+        return [
+            ContentBlock(type=block['type'], content=block['content'], metadata=block.get('metadata'))
+            for block in raw_blocks
+        ]
+
+    def load_freshness(self, urls: List[str]):
+        """Fetch last_scraped_at for all unknown URLs in one query and cache the answers"""
+        missing = [url for url in dict.fromkeys(urls) if url not in self.freshness_index]
+        if not missing:
+            return
+
+        columns = 'url, last_scraped_at, content_hash'
+        if self.images is not None:
+            columns += ', image_variants'
+        response = self.supabase.table('articles')\
+            .select(columns)\
+            .in_('url', missing)\
+            .execute()
+
+        for url in missing:
+            self.freshness_index[url] = None
+        for row in response.data or []:
+            self.known_urls.add(row['url'])
+            if row.get('content_hash'):
+                self.content_hashes[row['url']] = row['content_hash']
+            if row.get('image_variants') is not None:
+                self.stored_variants[row['url']] = row['image_variants']
+            if row.get('last_scraped_at'):
+                self.freshness_index[row['url']] = datetime.fromisoformat(
+                    row['last_scraped_at'].replace('Z', '+00:00')
+                )
+
+    def incremental_urls(self, urls: List[str], crawl: Optional[IncrementalCrawl]) -> Optional[List[str]]:
+        """Return the URLs of a page to fetch, or None once the crawl reaches known territory"""
+        if crawl is None:
+            return urls
+
+        # Reuse the freshness query's answers instead of asking again
+        crawl.add_known(
+            [url for url in urls if url in self.known_urls],
+            checked=[url for url in urls if url in self.freshness_index]
+        )
+        if crawl.should_stop(urls):
+            return None
+        return crawl.new_urls(urls)
+
+    def is_recently_scraped(self, url: str) -> bool:
+        """Check the freshness index for an article scraped within FRESHNESS_WINDOW"""
+        last_scraped = self.freshness_index.get(url)
+        if last_scraped is None:
+            return False
+        if last_scraped.tzinfo is None:
+            last_scraped = last_scraped.replace(tzinfo=timezone.utc)
+        # A sitemap or feed saying the page changed since overrides the window
+        if url in self.lastmod and self.lastmod[url] > last_scraped:
+            return False
+        return datetime.now(timezone.utc) - last_scraped < FRESHNESS_WINDOW
+
+    def fingerprint_article(self, article: ScrapedArticle) -> Dict[str, Any]:
+        """Compute content_hash and block_hashes for a scraped article"""
+        return fingerprint(article.processed_content, article.structured_content)
+
+    def is_unchanged(self, article: ScrapedArticle) -> bool:
+        """Compare the article against the stored row with the same rule as BulkIngestor"""
+        if article.url not in self.content_hashes:
+            return False
+        stored = {
+            'content_hash': self.content_hashes[article.url],
+            'image_variants': self.stored_variants.get(article.url),
+        }
+        row = {'content_hash': self.fingerprint_article(article)['content_hash']}
+        if row['content_hash'] == stored['content_hash'] and self.images is not None:
+            row['image_variants'] = self.image_variants(article)
+        return row_unchanged(stored, row)
+
+    def unfetched_urls(self, urls: List[str]) -> List[str]:
+        """Dedupe URLs canonically and drop those the frontier saw fetched recently, by any run"""
+        if self.frontier is None:
+            return dedupe_urls(urls)
+        modified = {url: self.lastmod[url].timestamp() for url in urls if url in self.lastmod}
+        return self.frontier.filter_unfetched(urls, modified=modified)
+
+    def resume_urls(self, checkpoint: Optional[CrawlCheckpoint], page: int, urls: List[str]) -> List[str]:
+        """Drop URLs a previous attempt completed and record the page as in progress"""
+        if checkpoint is None:
+            return urls
+        urls = checkpoint.remaining(self.source_name, urls)
+        checkpoint.start_page(self.source_name, page, urls)
+        return urls
+
+    def page_failed(self, page: int, crawl: Optional[IncrementalCrawl]):
+        """Give up on pagination after a listing page failed, so the next run crawls it again"""
+        self.logger.error(f"{self.source_name}: stopping at page {page}, leaving the source open for the next run")
+        if crawl is not None:
+            crawl.mark_incomplete()
+
+    def mark_scraped(self, url: str):
+        """Record a successful scrape so later pages and later runs skip the URL"""
+        self.freshness_index[url] = datetime.now(timezone.utc)
+        if self.frontier is not None:
+            self.frontier.mark_fetched(url, self.source_name)
+
+    def extract_structured_content_from_soup(self, article_element) -> List[ContentBlock]:
+        """Extract content blocks in document order from a BeautifulSoup element"""
         blocks = []
 
-        # Extract text blocks
-        for p in article_element.query_selector_all('p'):
-            text = p.text_content().strip()
-            if text:
+        for el in article_element.select('p, h1, h2, h3, h4, h5, h6, img, blockquote'):
+            if el.name == 'p':
+                text = el.get_text().strip()
+                if text:
+                    blocks.append(ContentBlock(type='text', content=text))
+            elif el.name == 'img':
                 blocks.append(ContentBlock(
-                    type='text',
-                    content=text
+                    type='image',
+                    content=el.get('src') or '',
+                    metadata={'alt': el.get('alt') or '', 'caption': el.get('title')}
+                ))
+            elif el.name == 'blockquote':
+                blocks.append(ContentBlock(
+                    type='quote',
+                    content=el.get_text().strip(),
+                    metadata={'source': el.get('cite')}
+                ))
+            else:
+                blocks.append(ContentBlock(
+                    type='header',
+                    content=el.get_text().strip(),
+                    metadata={'level': int(el.name[1])}
                 ))
-
-        # Extract headers
-        for h in article_element.query_selector_all('h1, h2, h3, h4, h5, h6'):
-            blocks.append(ContentBlock(
-                type='header',
-                content=h.text_content().strip(),
-                metadata={'level': int(h.tag_name[1])}
-            ))
-
-        # Extract images
-        for img in article_element.query_selector_all('img'):
-            blocks.append(ContentBlock(
-                type='image',
-                content=img.get_attribute('src') or '',
-                metadata={
-                    'alt': img.get_attribute('alt') or '',
-                    'caption': img.get_attribute('title')
-                }
-            ))
-
-        # Extract quotes
-        for quote in article_element.query_selector_all('blockquote'):
-            blocks.append(ContentBlock(
-                type='quote',
-                content=quote.text_content().strip(),
-                metadata={
-                    'source': quote.get_attribute('cite')
-                }
-            ))
 
         return blocks
 
+    async def extract_structured_content_async(self, article_element) -> List[ContentBlock]:
+        """Async API variant of extract_structured_content for pooled pages"""
+        with timed('extraction', self.source_name):
+            return self.blocks_from_dicts(await article_element.evaluate(STRUCTURED_CONTENT_SCRIPT))
+
     def process_content(self, blocks: List[ContentBlock]) -> str:
         """Convert structured content blocks to formatted text"""
         processed = []
@@ -158,6 +406,19 @@ class BaseScraper:
 
         return '\n\n'.join(processed)
 
+    def image_variants(self, article: ScrapedArticle) -> List[Dict[str, Any]]:
+        """Resize and store the main image and the images in the article body, once per article"""
+        if article.image_variants is None:
+            main = article.main_image.get('url')
+            body = [block.content for block in article.structured_content if block.type == 'image' and block.content]
+            # The browser aborts image requests, so the pipeline fetches them over plain HTTP
+            article.image_variants = self.images.annotate({
+                'url': article.url,
+                'image_url': main,
+                'additional_images': [url for url in body if url != main],
+            }, self.source_name)['image_variants']
+        return article.image_variants
+
     def save_article(self, article: ScrapedArticle) -> Dict[str, Any]:
         """Save or update article in Supabase"""
         article_data = {
@@ -173,17 +434,25 @@ class BaseScraper:
             } for block in article.structured_content]),
             'image_url': article.main_image.get('url', ''),
             'author': article.author,
-            'published_at': article.published_at,
+            'published_at': article.published_at.isoformat() if article.published_at else None,
             'source_id': self.source_id,
             'scraping_status': 'completed',
-            'last_scraped_at': datetime.now().isoformat()
+            'last_scraped_at': datetime.now().isoformat(),
+            **self.fingerprint_article(article)
         }
+        if self.images is not None:
+            article_data['image_variants'] = self.image_variants(article)
 
-        result = self.supabase.table('articles').upsert(article_data).execute()
+        with timed('db_write', self.source_name):
+            result = self.supabase.table('articles').upsert(article_data, on_conflict='url').execute()
+        count('articles_written', self.source_name)
         return result.data
 
     def close(self):
         """Clean up resources"""
+        self.interceptor.stats.log_summary(self.source_name)
+        self.fetcher.stats.log_summary(self.source_name)
+        self.debug.close()
         if self.page:
             try:
                 self.page.close()
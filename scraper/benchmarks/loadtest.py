@@ -0,0 +1,302 @@
+"""Replay scrapes end to end against local stand-ins for the sites and Supabase.
+
+    python -m scraper.benchmarks.loadtest --pages 3 --latency-ms 80 --jitter-ms 40 \
+        --error-rate 0.02 --baseline loadtest_baseline.json
+
+Each scenario runs a real scraper in its own process against LocalSite
+(recorded pages from --fixtures, synthetic ones otherwise) and writes to
+FakeSupabase, then reports articles/second, p50/p99 article latency and
+peak RSS. With --baseline, runs are compared against a stored result and
+the exit status is non-zero when a metric regresses beyond --tolerance;
+--save-baseline stores the current run.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Optional
+from scraper.benchmarks.servers import FakeSupabase, LocalSite, SyntheticSite
+from scraper.metrics import Histogram, get_metrics
+from scraper.orchestrator import PROCESS, Orchestrator, SourceJob
+
+# Any JWT-shaped string passes the client's key check; the stand-in ignores it
+FAKE_SUPABASE_KEY = 'bench.bench.bench'
+
+# Stages that make up one article's latency, first observed wins
+LATENCY_STAGES = ('article_fetch', 'browser_navigation')
+
+# Metrics compared against the baseline and whether higher values are better
+BASELINE_METRICS = {
+    'articles_per_second': True,
+    'latency_p50_ms': False,
+    'latency_p99_ms': False,
+    'peak_rss_mb': False,
+}
+
+
+def _ingest(results: List[Dict[str, Any]]):
+    from scraper.db import get_supabase
+    from scraper.ingest import BulkIngestor
+
+    BulkIngestor(get_supabase()).ingest(results)
+
+
+def run_dezeen(root: str, pages: int, workers: int) -> int:
+    from scraper.scrapers import dezeen
+
+    dezeen.set_base_url(root)
+    results = dezeen.scrape_dezeen(max_pages=pages)
+    _ingest(results)
+    return len(results)
+
+
+def run_dezeen_concurrent(root: str, pages: int, workers: int) -> int:
+    from scraper.scrapers import dezeen
+
+    dezeen.set_base_url(root)
+    results = dezeen.scrape_dezeen_concurrent(max_pages=pages, max_workers=workers)
+    _ingest(results)
+    return len(results)
+
+
+def run_parallel_leibal(root: str, pages: int, workers: int) -> int:
+    import asyncio
+    from scraper.scrapers.parallel_leibal import ParallelLeibalScraper
+
+    scraper = ParallelLeibalScraper(base_url=root, max_concurrent=workers)
+    results = asyncio.run(scraper.scrape_recent_articles_async(pages))
+    _ingest(results)
+    return len(results)
+
+
+def run_leibal(root: str, pages: int, workers: int) -> int:
+    from scraper.leibal_scraper import LeibalScraper
+
+    with LeibalScraper('Leibal', pool_size=workers, base_url=root) as scraper:
+        return len(scraper.scrape_category(max_pages=pages))
+
+
+def run_metropolis(root: str, pages: int, workers: int) -> int:
+    from scraper.metropolis_scraper import MetropolisScraper
+
+    with MetropolisScraper('Metropolis', base_url=f"{root}/projects/") as scraper:
+        return len(scraper.scrape_category(max_pages=pages))
+
+
+# scenario -> (site served, runner)
+SCENARIOS: Dict[str, tuple] = {
+    'dezeen': ('dezeen', run_dezeen),
+    'dezeen_concurrent': ('dezeen', run_dezeen_concurrent),
+    'parallel_leibal': ('leibal', run_parallel_leibal),
+    'leibal': ('leibal', run_leibal),
+    'metropolis': ('metropolis', run_metropolis),
+}
+
+
+def _peak_rss_mb(who: int) -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _latency(stages=LATENCY_STAGES) -> Histogram:
+    metrics = get_metrics()
+    for stage in stages:
+        merged = Histogram()
+        for (name, _), histogram in metrics.histograms.items():
+            if name == stage:
+                merged.merge(histogram.state())
+        if merged.count:
+            return merged
+    return Histogram()
+
+
+def run_scenario(scenario: str, root: str, pages: int, workers: int) -> List[Dict[str, Any]]:
+    """Run one scenario in the current (fresh) process and measure it"""
+    runner: Callable = SCENARIOS[scenario][1]
+    start = time.perf_counter()
+    saved = runner(root, pages, workers)
+    duration = time.perf_counter() - start
+
+    counters = get_metrics().counters
+    articles = sum(value for (event, _), value in counters.items() if event == 'articles') or saved
+    latency = _latency()
+    return [{
+        'articles': articles,
+        'saved': saved,
+        'errors': sum(value for (event, _), value in counters.items() if event == 'article_errors'),
+        'duration_s': round(duration, 3),
+        'articles_per_second': round(articles / duration, 3) if duration else 0.0,
+        'latency_p50_ms': round(latency.quantile(0.5) * 1000, 1),
+        'latency_p99_ms': round(latency.quantile(0.99) * 1000, 1),
+        'peak_rss_mb': round(_peak_rss_mb(resource.RUSAGE_SELF), 1),
+        'children_peak_rss_mb': round(_peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }]
+
+
+def _configure_environment(db: FakeSupabase, sites: Dict[str, LocalSite], verbose: bool):
+    """Point scenario processes at the stand-ins; spawned children inherit this"""
+    os.environ.update({
+        'SUPABASE_URL': db.root,
+        'SUPABASE_KEY': FAKE_SUPABASE_KEY,
+        # Every run must fetch every page
+        'SCRAPER_CACHE_DISABLED': '1',
+        'SCRAPER_FRONTIER_DISABLED': '1',
+        # Pace localhost only by the injected latency, not the production limits
+        'SCRAPER_RATE_LIMITS': ','.join(f"{site.root.split('//', 1)[1]}=1000:1000" for site in sites.values()),
+    })
+    if not verbose:
+        os.environ.setdefault('SCRAPER_LOG_LEVEL', 'WARNING')
+
+
+def _median_result(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    result = dict(runs[-1])
+    for key in ('articles_per_second', 'latency_p50_ms', 'latency_p99_ms', 'duration_s'):
+        result[key] = round(statistics.median(run[key] for run in runs), 3)
+    result['peak_rss_mb'] = max(run['peak_rss_mb'] for run in runs)
+    result['runs'] = len(runs)
+    return result
+
+
+def run(scenarios: List[str], pages: int, articles_per_page: int, workers: int, repeat: int,
+        latency_ms: float, jitter_ms: float, error_rate: float, db_latency_ms: float,
+        fixtures: Optional[str], timeout: Optional[float], verbose: bool = False) -> Dict[str, Dict[str, Any]]:
+    site_names = sorted({SCENARIOS[scenario][0] for scenario in scenarios})
+    sites = {
+        name: LocalSite(SyntheticSite(name, pages=pages, articles_per_page=articles_per_page),
+                        fixtures=fixtures, latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate)
+        for name in site_names
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    with ExitStack() as stack:
+        db = stack.enter_context(FakeSupabase(latency_ms=db_latency_ms))
+        for site in sites.values():
+            stack.enter_context(site)
+        _configure_environment(db, sites, verbose)
+
+        for scenario in scenarios:
+            site = sites[SCENARIOS[scenario][0]]
+            runs = []
+            for _ in range(repeat):
+                site.reset()
+                db.reset()
+                job = SourceJob(scenario, run_scenario,
+                                {'scenario': scenario, 'root': site.root, 'pages': pages, 'workers': workers},
+                                mode=PROCESS, timeout=timeout)
+                outcome = Orchestrator().run([job])[0]
+                if outcome.status != 'ok':
+                    results[scenario] = {'status': outcome.status, 'error': outcome.error}
+                    break
+                runs.append({
+                    **outcome.results[0],
+                    'requests': site.stats['requests'],
+                    'injected_errors': site.stats['errors'],
+                    'rows_written': db.stats['rows_written'],
+                })
+            else:
+                results[scenario] = {'status': 'ok', **_median_result(runs)}
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """Describe every metric that is worse than the baseline by more than `tolerance`"""
+    regressions = []
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if result.get('status') != 'ok' or not base or base.get('status') != 'ok':
+            continue
+        for metric, higher_is_better in BASELINE_METRICS.items():
+            current, previous = result.get(metric), base.get(metric)
+            if not previous or current is None:
+                continue
+            change = (current - previous) / previous
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{scenario} {metric}: {previous} -> {current} ({change:+.0%})")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None):
+    print(f"{'scenario':<20} {'articles':>8} {'saved':>6} {'art/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'RSS MB':>8} {'errors':>6}  vs baseline")
+    for scenario, result in results.items():
+        if result['status'] != 'ok':
+            error = (result.get('error') or '').strip().splitlines()
+            print(f"{scenario:<20} {result['status']}: {error[0] if error else ''}")
+            continue
+        delta = ''
+        base = (baseline or {}).get(scenario)
+        if base and base.get('status') == 'ok' and base.get('articles_per_second'):
+            change = result['articles_per_second'] / base['articles_per_second'] - 1
+            delta = f"{change:+.0%} art/s"
+        print(f"{scenario:<20} {result['articles']:>8} {result['saved']:>6} {result['articles_per_second']:>8.2f} "
+              f"{result['latency_p50_ms']:>8.1f} {result['latency_p99_ms']:>8.1f} "
+              f"{result['peak_rss_mb']:>8.1f} {result['errors']:>6}  {delta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the scrapers against local stand-ins')
+    parser.add_argument('--scenario', action='append', dest='scenarios', choices=sorted(SCENARIOS),
+                        help='Scenario to run, may be repeated (default: all)')
+    parser.add_argument('--pages', type=int, default=2,
+                        help='Archive pages per scenario (default: 2)')
+    parser.add_argument('--articles-per-page', type=int, default=10,
+                        help='Articles on each synthetic archive page (default: 10)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrency for scenarios that support it (default: 4)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Runs per scenario; medians are reported (default: 1)')
+    parser.add_argument('--latency-ms', type=float, default=50.0,
+                        help='Latency added to every site response (default: 50)')
+    parser.add_argument('--jitter-ms', type=float, default=0.0,
+                        help='Uniform jitter around --latency-ms (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of site requests answered with 503 (default: 0)')
+    parser.add_argument('--db-latency-ms', type=float, default=5.0,
+                        help='Latency added to every Supabase call (default: 5)')
+    parser.add_argument('--fixtures', type=str, default=None,
+                        help='Directory of recorded pages, laid out as <site>/<path>/index.html')
+    parser.add_argument('--timeout', type=float, default=600.0,
+                        help='Stop a scenario after this many seconds (default: 600)')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='Compare against results stored with --save-baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed relative regression against the baseline (default: 0.15)')
+    parser.add_argument('--save-baseline', type=str, default=None,
+                        help='Store this run as a baseline')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the full results as JSON')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Keep the scrapers\' INFO logging')
+    args = parser.parse_args()
+
+    results = run(
+        args.scenarios or list(SCENARIOS), args.pages, args.articles_per_page, args.workers, args.repeat,
+        args.latency_ms, args.jitter_ms, args.error_rate, args.db_latency_ms, args.fixtures, args.timeout,
+        args.verbose
+    )
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Measure HTML parse and select cost per backend on saved pages.
+
+    python -m scraper.benchmarks.parse_benchmark page_debug.html --repeat 20
+
+Reports the median parse and select time per page for every installed
+BeautifulSoup backend, plus selectolax when it is installed, so the
+SCRAPER_HTML_PARSER setting can be chosen per deployment.
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List
+from bs4 import BeautifulSoup, FeatureNotFound
+from scraper.parsing import PARSER_BACKENDS
+
+# Selectors the scrapers run on archive and article pages
+DEFAULT_SELECTORS = [
+    'article',
+    '.entry-content',
+    '.entry-content p',
+    'article a[href*="/architecture/"]',
+    '.post-card',
+    'h1, h2, h3',
+    'img',
+]
+
+
+def _time(fn: Callable, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_bs4(html: str, backend: str, selectors: List[str], repeat: int) -> Dict[str, float]:
+    soup = BeautifulSoup(html, backend)
+    parse = _time(lambda: BeautifulSoup(html, backend), repeat)
+    select = _time(lambda: [soup.select(selector) for selector in selectors], repeat)
+    return {'parse_ms': statistics.median(parse) * 1000, 'select_ms': statistics.median(select) * 1000}
+
+
+def bench_selectolax(html: str, selectors: List[str], repeat: int) -> Dict[str, float]:
+    from selectolax.parser import HTMLParser
+
+    tree = HTMLParser(html)
+    parse = _time(lambda: HTMLParser(html), repeat)
+    select = _time(lambda: [tree.css(selector) for selector in selectors], repeat)
+    return {'parse_ms': statistics.median(parse) * 1000, 'select_ms': statistics.median(select) * 1000}
+
+
+def available_backends() -> List[str]:
+    backends = []
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup('', backend)
+            backends.append(backend)
+        except FeatureNotFound:
+            pass
+    try:
+        import selectolax  # noqa: F401
+        backends.append('selectolax')
+    except ImportError:
+        pass
+    return backends
+
+
+def run(paths: List[str], backends: List[str], selectors: List[str], repeat: int) -> List[Dict]:
+    results = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        for backend in backends:
+            if backend == 'selectolax':
+                timing = bench_selectolax(html, selectors, repeat)
+            else:
+                timing = bench_bs4(html, backend, selectors, repeat)
+            results.append({'page': path, 'bytes': len(html), 'backend': backend, **timing})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends on saved pages')
+    parser.add_argument('pages', nargs='*', default=['page_debug.html'],
+                        help='Saved HTML fixtures (default: page_debug.html)')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='Timed runs per page and backend (default: 10)')
+    parser.add_argument('--backend', action='append', dest='backends',
+                        help='Backend to include, may be repeated (default: all installed)')
+    parser.add_argument('--selector', action='append', dest='selectors',
+                        help='CSS selector to time, may be repeated (default: scraper selectors)')
+    args = parser.parse_args()
+
+    results = run(args.pages, args.backends or available_backends(),
+                  args.selectors or DEFAULT_SELECTORS, args.repeat)
+
+    print(f"{'page':<30} {'KB':>8} {'backend':<12} {'parse ms':>10} {'select ms':>10}")
+    for row in results:
+        print(f"{row['page'][-30:]:<30} {row['bytes'] / 1024:>8.1f} {row['backend']:<12} "
+              f"{row['parse_ms']:>10.2f} {row['select_ms']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
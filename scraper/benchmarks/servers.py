@@ -0,0 +1,323 @@
+"""Local stand-ins for the source sites and Supabase, used by the load test.
+
+LocalSite serves recorded pages from a fixtures directory, falling back to
+synthetic archive and article pages shaped like each source's markup, with
+injected latency and errors. FakeSupabase answers the PostgREST calls the
+scrapers make and keeps written rows in memory.
+"""
+import csv
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Production origins rewritten to the local server in recorded pages
+SITE_ORIGINS = {
+    'dezeen': ['https://www.dezeen.com', 'https://dezeen.com'],
+    'leibal': ['https://leibal.com', 'https://www.leibal.com'],
+    'metropolis': ['https://metropolismag.com', 'https://www.metropolismag.com'],
+}
+
+LOREM = (
+    "Concrete volumes step down the hillside, framing views of the valley while the "
+    "board-marked walls keep the interiors cool through the summer months."
+)
+
+
+class SyntheticSite:
+    """Archive and article pages with the selectors each scraper looks for"""
+
+    def __init__(self, name: str, pages: int = 5, articles_per_page: int = 10, paragraphs: int = 20):
+        if name not in SITE_ORIGINS:
+            raise ValueError(f"Unknown site: {name}")
+        self.name = name
+        self.pages = pages
+        self.articles_per_page = articles_per_page
+        self.paragraphs = paragraphs
+
+    def render(self, path: str, root: str) -> Optional[str]:
+        parts = [part for part in path.split('/') if part]
+        if self.name == 'dezeen':
+            # /architecture/ and /architecture/page/N/, articles at /architecture/<slug>/
+            if parts == ['architecture']:
+                return self.archive(1, root)
+            if parts[:2] == ['architecture', 'page'] and len(parts) == 3:
+                return self.archive(int(parts[2]), root)
+        elif self.name == 'leibal':
+            # /category/architecture/page/N for LeibalScraper, /architecture/page/N for ParallelLeibalScraper
+            if parts[:3] == ['category', 'architecture', 'page'] and len(parts) == 4:
+                return self.archive(int(parts[3]), root)
+            if parts[:2] == ['architecture', 'page'] and len(parts) == 3:
+                return self.archive(int(parts[2]), root)
+        elif self.name == 'metropolis':
+            if parts == ['projects']:
+                return self.archive(1, root)
+            if parts[:2] == ['projects', 'page'] and len(parts) == 3:
+                return self.archive(int(parts[2]), root)
+        if parts and parts[-1].startswith('article-'):
+            return self.article(parts[-1], root)
+        return None
+
+    def article_url(self, root: str, page: int, index: int) -> str:
+        section = 'projects' if self.name == 'metropolis' else 'architecture'
+        return f"{root}/{section}/article-{page}-{index}/"
+
+    def archive(self, page: int, root: str) -> Optional[str]:
+        if page < 1 or page > self.pages:
+            return None
+        items = []
+        for index in range(self.articles_per_page):
+            url = self.article_url(root, page, index)
+            title = f"House {page}-{index}"
+            image = f"{root}/images/{page}-{index}.jpg"
+            if self.name == 'dezeen':
+                items.append(
+                    f'<article class="dezeen-article"><a href="{url}"><h3>{title}</h3></a>'
+                    f'<img src="{image}"><span class="author">Staff</span>'
+                    f'<time datetime="2024-01-{1 + index % 28:02d}T09:00:00">Jan</time></article>'
+                )
+            elif self.name == 'leibal':
+                items.append(
+                    f'<article class="post-card"><a href="{url}"><img src="{image}"></a>'
+                    f'<h2 class="entry-title"><a href="{url}">{title}</a></h2></article>'
+                )
+            else:
+                items.append(
+                    f'<article class="post"><h2><a href="{url}">{title}</a></h2>'
+                    f'<img src="{image}" alt="{title}"><p class="byline">Staff</p><p>{LOREM}</p></article>'
+                )
+        body = '\n'.join(items)
+        return f'<html><head><title>Archive {page}</title></head><body><main class="main__content">{body}</main></body></html>'
+
+    def article(self, slug: str, root: str) -> str:
+        title = slug.replace('-', ' ').title()
+        paragraphs = '\n'.join(f'<p>{LOREM} ({i})</p>' for i in range(self.paragraphs))
+        images = ''.join(f'<img src="{root}/images/{slug}-{i}.jpg" alt="View {i}">' for i in range(3))
+        content_class = 'entry__content' if self.name == 'dezeen' else 'entry-content'
+        return (
+            f'<html><head><title>{title}</title>'
+            f'<meta name="description" content="{LOREM[:80]}">'
+            f'<meta property="article:published_time" content="2024-01-01T09:00:00+00:00"></head>'
+            f'<body><article><h1 class="entry-title">{title}</h1>'
+            f'<div class="entry-meta"><a rel="author" href="{root}/author/staff/">Staff</a>'
+            f'<time datetime="2024-01-01T09:00:00+00:00">1 January 2024</time></div>'
+            f'<div class="{content_class}"><h2>Overview</h2>{images}{paragraphs}</div>'
+            f'<a rel="tag" href="{root}/tag/concrete/">Concrete</a></article></body></html>'
+        )
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _BaseHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the production sites and PostgREST
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _StandIn:
+    """Runs a handler class on an ephemeral localhost port in a background thread"""
+
+    handler_class = _BaseHandler
+
+    def __init__(self):
+        handler = type('Handler', (self.handler_class,), {'owner': self})
+        self.server = _QuietServer(('127.0.0.1', 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name=type(self).__name__, daemon=True)
+        self.lock = threading.Lock()
+
+    @property
+    def root(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _SiteHandler(_BaseHandler):
+    def do_GET(self):
+        site = self.owner
+        path = urlsplit(self.path).path
+        site.delay()
+
+        with site.lock:
+            site.stats['requests'] += 1
+        if site.error_rate and random.random() < site.error_rate:
+            with site.lock:
+                site.stats['errors'] += 1
+            self.send_body(503, b'injected error', 'text/plain', {'Retry-After': '1'})
+            return
+
+        if path.startswith('/images/'):
+            self.send_body(200, b'\xff\xd8\xff\xd9', 'image/jpeg')
+            return
+
+        html = site.page(path)
+        if html is None:
+            with site.lock:
+                site.stats['not_found'] += 1
+            self.send_body(404, b'not found', 'text/plain')
+            return
+        self.send_body(200, html.encode('utf-8'), 'text/html; charset=utf-8')
+
+
+class LocalSite(_StandIn):
+    """Serves one source site on localhost with configurable latency and errors.
+
+    Pages come from `fixtures/<site>/<path>/index.html` when recorded, with
+    production origins rewritten to this server, and are generated otherwise.
+    """
+
+    handler_class = _SiteHandler
+
+    def __init__(self, site: SyntheticSite, fixtures: Optional[str] = None,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0):
+        super().__init__()
+        self.site = site
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stats = {'requests': 0, 'errors': 0, 'not_found': 0}
+
+    def delay(self):
+        latency = self.latency_ms + (random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def page(self, path: str) -> Optional[str]:
+        if self.fixtures:
+            recorded = os.path.join(self.fixtures, self.site.name, unquote(path).strip('/'), 'index.html')
+            if os.path.isfile(recorded):
+                with open(recorded, 'r', encoding='utf-8') as f:
+                    html = f.read()
+                for origin in SITE_ORIGINS[self.site.name]:
+                    html = html.replace(origin, self.root)
+                return html
+        return self.site.render(path, self.root)
+
+    def reset(self):
+        with self.lock:
+            self.stats = {'requests': 0, 'errors': 0, 'not_found': 0}
+
+
+def _in_values(value: str) -> List[str]:
+    """Values of a PostgREST in.(...) filter; quoted items may contain commas"""
+    inner = value[len('in.('):-1]
+    return next(csv.reader([inner])) if inner else []
+
+
+class _SupabaseHandler(_BaseHandler):
+    def _table(self):
+        parts = urlsplit(self.path)
+        segments = [segment for segment in parts.path.split('/') if segment]
+        if segments[:2] != ['rest', 'v1'] or len(segments) != 3:
+            return None, {}
+        return segments[2], parse_qs(parts.query)
+
+    def _body(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null') if length else None
+
+    def _reply(self, rows: Any, status: int = 200):
+        self.send_body(status, json.dumps(rows).encode('utf-8'), 'application/json')
+
+    def do_GET(self):
+        db = self.owner
+        table, query = self._table()
+        if table is None:
+            self._reply({'message': 'not found'}, 404)
+            return
+        db.delay()
+        self._reply(db.select(table, query))
+
+    def do_HEAD(self):
+        self.send_body(200, b'', 'application/json')
+
+    def do_POST(self):
+        db = self.owner
+        table, _ = self._table()
+        body = self._body()
+        db.delay()
+        rows = body if isinstance(body, list) else [body]
+        self._reply(db.upsert(table, rows), 201)
+
+    def do_PATCH(self):
+        db = self.owner
+        table, _ = self._table()
+        self._body()
+        db.delay()
+        with db.lock:
+            db.stats['updates'] += 1
+        self._reply([])
+
+
+class FakeSupabase(_StandIn):
+    """In-memory stand-in for the Supabase REST endpoints the scrapers call.
+
+    Every source name resolves to a source row, articles are upserted by URL
+    and reads of `articles` answer from what has been written so far, so
+    freshness and change detection behave as against a real database.
+    """
+
+    handler_class = _SupabaseHandler
+
+    def __init__(self, latency_ms: float = 0.0):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.articles: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'reads': 0, 'writes': 0, 'rows_written': 0, 'updates': 0}
+
+    def delay(self):
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+    def select(self, table: str, query: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        with self.lock:
+            self.stats['reads'] += 1
+            if table == 'sources':
+                names = []
+                for value in query.get('name', []):
+                    names += _in_values(value) if value.startswith('in.(') else [value[len('eq.'):]]
+                return [{'id': name, 'name': name, 'last_scraped_at': None} for name in names or ['bench']]
+            if table == 'articles':
+                urls = [url for value in query.get('url', []) if value.startswith('in.(') for url in _in_values(value)]
+                return [self.articles[url] for url in urls if url in self.articles]
+            return []
+
+    def upsert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self.lock:
+            self.stats['writes'] += 1
+            self.stats['rows_written'] += len(rows)
+            if table == 'articles':
+                for row in rows:
+                    if row.get('url'):
+                        self.articles[row['url']] = row
+        return rows
+
+    def reset(self):
+        with self.lock:
+            self.articles.clear()
+            self.stats = {'reads': 0, 'writes': 0, 'rows_written': 0, 'updates': 0}
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = '.scraper_checkpoints'
+
+
+class CrawlCheckpoint:
+    """Per-source crawl progress, persisted atomically as the run proceeds.
+
+    For each source it records the last completed archive page, the URLs of
+    the page in progress and the URLs already completed. A resumed run skips
+    finished sources and pages and only fetches the URLs still outstanding.
+    Writes go to a temporary file that replaces the checkpoint, so a crash
+    mid-write leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, path: str, state: Optional[Dict[str, Any]] = None, min_interval: float = 1.0):
+        self.path = path
+        self.min_interval = min_interval
+        self.state = state or {
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'sources': {}
+        }
+        self._lock = threading.RLock()
+        self._last_save = 0.0
+
+    @classmethod
+    def open(cls, path: str, resume: bool = False) -> 'CrawlCheckpoint':
+        """Load the checkpoint at `path` when resuming, otherwise start a fresh one"""
+        if resume:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    checkpoint = cls(path, json.load(f))
+                logger.info(f"Resuming crawl from checkpoint {path} (started {checkpoint.state['started_at']})")
+                return checkpoint
+            except FileNotFoundError:
+                logger.info(f"No checkpoint at {path}, starting a fresh crawl")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint {path}: {str(e)}")
+        return cls(path)
+
+    @staticmethod
+    def default_path(name: str) -> str:
+        return os.path.join(os.getenv('SCRAPER_CHECKPOINT_DIR', DEFAULT_CHECKPOINT_DIR), f"{name}.json")
+
+    def _source(self, source: str) -> Dict[str, Any]:
+        return self.state['sources'].setdefault(source, {
+            'last_page': 0,
+            'pending': [],
+            'completed': [],
+            'done': False
+        })
+
+    def next_page(self, source: str) -> int:
+        """First archive page not yet completed for the source"""
+        with self._lock:
+            return self._source(source)['last_page'] + 1
+
+    def is_done(self, source: str) -> bool:
+        with self._lock:
+            return self._source(source)['done']
+
+    def is_completed(self, source: str, url: str) -> bool:
+        with self._lock:
+            return url in self._source(source)['completed']
+
+    def remaining(self, source: str, urls: Iterable[str]) -> List[str]:
+        """Filter out URLs a previous attempt already completed"""
+        with self._lock:
+            completed = set(self._source(source)['completed'])
+        return [url for url in urls if url not in completed]
+
+    def start_page(self, source: str, page: int, urls: List[str]):
+        with self._lock:
+            progress = self._source(source)
+            progress['page'] = page
+            progress['pending'] = list(urls)
+        self.save()
+
+    def complete_url(self, source: str, url: str):
+        with self._lock:
+            progress = self._source(source)
+            if url not in progress['completed']:
+                progress['completed'].append(url)
+            if url in progress['pending']:
+                progress['pending'].remove(url)
+        self.save(force=False)
+
+    def complete_page(self, source: str, page: int):
+        with self._lock:
+            progress = self._source(source)
+            progress['last_page'] = max(progress['last_page'], page)
+            progress['pending'] = []
+        self.save()
+
+    def complete_source(self, source: str):
+        with self._lock:
+            progress = self._source(source)
+            progress['done'] = True
+            progress['pending'] = []
+        self.save()
+
+    def save(self, force: bool = True):
+        """Write the checkpoint atomically; unforced saves are throttled to min_interval"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_save < self.min_interval:
+                return
+            self._last_save = now
+            self.state['updated_at'] = datetime.now(timezone.utc).isoformat()
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.checkpoint-', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.state, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+    def clear(self):
+        """Remove the checkpoint after a run finished cleanly"""
+        with self._lock:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
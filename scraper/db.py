@@ -0,0 +1,82 @@
+import logging
+import os
+import threading
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+from supabase import Client, create_client
+
+logger = logging.getLogger(__name__)
+
+# Checked in order; the first pair with both values set wins. Server-side keys
+# come first so every entry point writes with the same (service role) key
+CREDENTIAL_ENV = (
+    ('SUPABASE_URL', 'SUPABASE_KEY'),
+    ('SUPABASE_URL', 'SUPABASE_SERVICE_KEY'),
+    ('VITE_SUPABASE_URL', 'VITE_SUPABASE_ANON_KEY'),
+)
+
+DB_POOL_SIZE = int(os.getenv('SCRAPER_DB_POOL_SIZE', '16'))
+DB_TIMEOUT = float(os.getenv('SCRAPER_DB_TIMEOUT', '120'))
+
+
+def resolve_credentials() -> Tuple[str, str]:
+    """Supabase URL and key from the environment or .env"""
+    load_dotenv()
+    for url_name, key_name in CREDENTIAL_ENV:
+        url, key = os.getenv(url_name), os.getenv(key_name)
+        if url and key:
+            return url, key
+    names = ' or '.join(f"{url_name} and {key_name}" for url_name, key_name in CREDENTIAL_ENV)
+    raise EnvironmentError(f"Missing Supabase environment variables, set {names} in your .env file")
+
+
+def _http_client():
+    """Keep-alive httpx client shared by the REST and storage APIs of the DB client"""
+    import httpx
+
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    return httpx.Client(
+        http2=http2,
+        timeout=DB_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=DB_POOL_SIZE, max_keepalive_connections=DB_POOL_SIZE)
+    )
+
+
+def _client_options():
+    try:
+        from supabase.lib.client_options import SyncClientOptions
+    except ImportError:
+        SyncClientOptions = None
+    if SyncClientOptions is None or 'httpx_client' not in SyncClientOptions.__dataclass_fields__:
+        # Older supabase-py builds its own transport per sub-client
+        logger.warning("Installed supabase-py cannot share an HTTP client, using its default connections")
+        return None
+    return SyncClientOptions(httpx_client=_http_client())
+
+
+def create_db_client() -> Client:
+    """New Supabase client on a pooled HTTP transport; most callers want get_supabase()"""
+    url, key = resolve_credentials()
+    options = _client_options()
+    if options is None:
+        return create_client(url, key)
+    return create_client(url, key, options=options)
+
+
+_supabase: Optional[Client] = None
+_supabase_lock = threading.Lock()
+
+
+def get_supabase() -> Client:
+    """Get the process-wide Supabase client, creating it on first use"""
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                _supabase = create_db_client()
+    return _supabase
@@ -0,0 +1,106 @@
+import gzip
+import logging
+import os
+import random
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DebugCapture:
+    """Opt-in capture of page HTML and screenshots for debugging extraction.
+
+    Pages are captured when sampled (sample_rate) or when extraction failed
+    (on_failure). Artifacts are gzipped and written by a background thread
+    into a run-scoped directory; old runs beyond `retention_runs` are pruned
+    and a run stops capturing once it has written `max_run_bytes`.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, on_failure: bool = False,
+                 base_dir: str = 'debug', retention_runs: int = 5,
+                 max_run_bytes: int = 200 * 1024 * 1024, run_id: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.on_failure = on_failure
+        self.base_dir = base_dir
+        self.retention_runs = retention_runs
+        self.max_run_bytes = max_run_bytes
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self.run_dir = os.path.join(base_dir, self.run_id)
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> 'DebugCapture':
+        """Configure from SCRAPER_DEBUG_SAMPLE_RATE, SCRAPER_DEBUG_ON_FAILURE and SCRAPER_DEBUG_DIR"""
+        return cls(
+            sample_rate=float(os.getenv('SCRAPER_DEBUG_SAMPLE_RATE', '0')),
+            on_failure=os.getenv('SCRAPER_DEBUG_ON_FAILURE', '').lower() in ('1', 'true', 'yes'),
+            base_dir=os.getenv('SCRAPER_DEBUG_DIR', 'debug'),
+            retention_runs=int(os.getenv('SCRAPER_DEBUG_RETENTION_RUNS', '5'))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.on_failure
+
+    def should_capture(self, failed: bool = False) -> bool:
+        """Decide whether this page is captured; cheap enough to call on every page"""
+        if not self.enabled or self.bytes_written >= self.max_run_bytes:
+            return False
+        if failed and self.on_failure:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def capture(self, label: str, html: str, screenshot: Optional[bytes] = None):
+        """Queue artifacts for a background write; returns immediately"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    os.makedirs(self.run_dir, exist_ok=True)
+                    self._prune()
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='debug-capture')
+        self._executor.submit(self._write, label, html, screenshot)
+
+    def _write(self, label: str, html: str, screenshot: Optional[bytes]):
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', label)[:100]
+        try:
+            html_path = os.path.join(self.run_dir, f"{name}.html.gz")
+            with gzip.open(html_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(html)
+            written = os.path.getsize(html_path)
+
+            if screenshot:
+                with open(os.path.join(self.run_dir, f"{name}.jpg"), 'wb') as f:
+                    f.write(screenshot)
+                written += len(screenshot)
+
+            with self._lock:
+                self.bytes_written += written
+        except Exception as e:
+            logger.warning(f"Failed to write debug capture {name}: {str(e)}")
+
+    def _prune(self):
+        """Keep only the newest `retention_runs` run directories, including this one"""
+        try:
+            runs = sorted(
+                (entry for entry in os.scandir(self.base_dir) if entry.is_dir()),
+                key=lambda entry: entry.stat().st_mtime,
+                reverse=True
+            )
+            for entry in runs[self.retention_runs:]:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError as e:
+            logger.warning(f"Failed to prune debug captures: {str(e)}")
+
+    def close(self):
+        """Flush pending writes"""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            logger.info(f"Wrote {self.bytes_written} bytes of debug captures to {self.run_dir}")
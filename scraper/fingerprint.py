@@ -0,0 +1,50 @@
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional
+
+_WHITESPACE = re.compile(r'\s+')
+_BLOCK_SEPARATOR = re.compile(r'\n\s*\n')
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Normalize text so cosmetic whitespace and unicode differences don't change the hash"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def content_hash(text: Optional[str]) -> str:
+    """Stable fingerprint of an article body"""
+    return _digest(normalize_text(text))
+
+
+def split_blocks(text: Optional[str]) -> List[str]:
+    """Split plain text content into the blank-line separated blocks the scrapers emit"""
+    if not text:
+        return []
+    return [block for block in _BLOCK_SEPARATOR.split(text) if block.strip()]
+
+
+def block_hashes(blocks: Iterable[Any]) -> List[str]:
+    """Hash each structured block, accepting ContentBlock objects or plain strings"""
+    hashes = []
+    for block in blocks:
+        if isinstance(block, str):
+            hashes.append(_digest(normalize_text(block)))
+        else:
+            hashes.append(_digest(f"{block.type}:{normalize_text(block.content)}"))
+    return hashes
+
+
+def fingerprint(text: Optional[str], blocks: Optional[Iterable[Any]] = None) -> Dict[str, Any]:
+    """Build the content_hash/block_hashes columns for an article"""
+    return {
+        'content_hash': content_hash(text),
+        'block_hashes': block_hashes(blocks if blocks is not None else split_blocks(text))
+    }
@@ -0,0 +1,259 @@
+import atexit
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'ref_src',
+    '_ga', '_gl', 'igshid', 'yclid',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> str:
+    """Normalize a URL for membership checks.
+
+    Resolves it against `base`, lowercases scheme and host, treats http as
+    https, drops default ports, fragments and tracking parameters, sorts the
+    remaining query and strips the trailing slash. The canonical form is only
+    a key; scrapers keep fetching the URL they found.
+    """
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url.strip())
+
+    scheme = parts.scheme.lower()
+    if scheme == 'http':
+        scheme = 'https'
+
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip('/') or '/'
+
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def dedupe_urls(urls: Iterable[Optional[str]], base: Optional[str] = None) -> List[str]:
+    """Drop empty and canonically duplicate URLs, keeping the first of each in order"""
+    seen = set()
+    unique = []
+    for url in urls:
+        if not url:
+            continue
+        key = canonicalize_url(url, base)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing"""
+
+    HEADER = struct.Struct('<QQI')
+
+    def __init__(self, capacity: int, error_rate: float = 0.01, bits: Optional[bytearray] = None,
+                 count: int = 0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def save(self, path: str):
+        """Write atomically so a crash never leaves a truncated filter"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.HEADER.pack(self.capacity, self.count, int(self.error_rate * 1_000_000)))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'BloomFilter':
+        with open(path, 'rb') as f:
+            capacity, count, error_ppm = cls.HEADER.unpack(f.read(cls.HEADER.size))
+            bits = bytearray(f.read())
+        bloom = cls(capacity, error_ppm / 1_000_000, bits, count)
+        if len(bits) != (bloom.size + 7) // 8:
+            raise ValueError(f"Corrupt Bloom filter at {path}")
+        return bloom
+
+
+class URLFrontier:
+    """Persistent record of stored article URLs shared by all scrapers and runs.
+
+    Canonical URLs and their last fetch time live in SQLite; a Bloom filter
+    (kept in memory and saved next to the database) answers the common
+    "never fetched" case without touching disk. The filter doubles its
+    capacity and is rebuilt from SQLite when it fills up.
+    """
+
+    def __init__(self, path: str, capacity: int = 1_000_000, error_rate: float = 0.01,
+                 max_age: Optional[float] = DEFAULT_MAX_AGE):
+        self.path = path
+        self.bloom_path = f"{path}.bloom"
+        self.error_rate = error_rate
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS urls ('
+            'canonical TEXT PRIMARY KEY, url TEXT NOT NULL, source TEXT, last_fetched REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self.bloom = self._load_bloom(capacity)
+
+    def _count(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM urls').fetchone()[0]
+
+    def _load_bloom(self, capacity: int) -> BloomFilter:
+        count = self._count()
+        try:
+            bloom = BloomFilter.load(self.bloom_path)
+            if bloom.count == count:
+                return bloom
+            logger.info("URL frontier Bloom filter is stale, rebuilding")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Discarding unreadable URL frontier Bloom filter: {str(e)}")
+        return self._rebuild(max(capacity, count * 2))
+
+    def _rebuild(self, capacity: int) -> BloomFilter:
+        bloom = BloomFilter(capacity, self.error_rate)
+        for (canonical,) in self.db.execute('SELECT canonical FROM urls'):
+            bloom.add(canonical)
+        self._dirty = True
+        return bloom
+
+    def __contains__(self, url: str) -> bool:
+        canonical = canonicalize_url(url)
+        if canonical not in self.bloom:
+            return False
+        with self._lock:
+            row = self.db.execute('SELECT 1 FROM urls WHERE canonical = ?', (canonical,)).fetchone()
+        return row is not None
+
+    def filter_unfetched(self, urls: Iterable[Optional[str]], max_age: Optional[float] = None,
+                         modified: Optional[Dict[str, float]] = None) -> List[str]:
+        """Dedupe `urls` canonically and drop those fetched within `max_age` seconds.
+
+        `modified` maps URLs to a last-modified timestamp (e.g. sitemap
+        lastmod); a URL modified after its last fetch is always kept. Only
+        Bloom filter hits are checked against SQLite, in one query per 500.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        candidates = {canonicalize_url(url): url for url in dedupe_urls(urls)}
+        maybe_known = [canonical for canonical in candidates if canonical in self.bloom]
+
+        recent = set()
+        if maybe_known and max_age:
+            cutoff = time.time() - max_age
+            with self._lock:
+                for start in range(0, len(maybe_known), 500):
+                    chunk = maybe_known[start:start + 500]
+                    rows = self.db.execute(
+                        f"SELECT canonical, last_fetched FROM urls WHERE last_fetched >= ? "
+                        f"AND canonical IN ({','.join('?' * len(chunk))})",
+                        [cutoff, *chunk]
+                    )
+                    for canonical, last_fetched in rows:
+                        if not modified or modified.get(candidates[canonical], 0) <= last_fetched:
+                            recent.add(canonical)
+
+        return [url for canonical, url in candidates.items() if canonical not in recent]
+
+    def should_fetch(self, url: str, max_age: Optional[float] = None) -> bool:
+        """True unless the URL was fetched within `max_age` seconds"""
+        return bool(self.filter_unfetched([url], max_age))
+
+    def mark_fetched(self, url: str, source: Optional[str] = None):
+        """Record a URL whose article is stored; call it only after the write succeeded"""
+        canonical = canonicalize_url(url)
+        with self._lock:
+            self.db.execute(
+                'INSERT INTO urls (canonical, url, source, last_fetched) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(canonical) DO UPDATE SET last_fetched = excluded.last_fetched',
+                (canonical, url, source, time.time())
+            )
+            if canonical not in self.bloom:
+                self.bloom.add(canonical)
+                self._dirty = True
+                if self.bloom.full:
+                    self.bloom = self._rebuild(self.bloom.capacity * 2)
+
+    def flush(self):
+        """Persist the Bloom filter if it changed"""
+        with self._lock:
+            if self._dirty:
+                self.bloom.save(self.bloom_path)
+                self._dirty = False
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self.db.close()
+
+
+_frontier: Optional[URLFrontier] = None
+_frontier_lock = threading.Lock()
+
+
+def get_frontier() -> Optional[URLFrontier]:
+    """Get the process-wide URL frontier, configured from the environment"""
+    global _frontier
+    if os.getenv('SCRAPER_FRONTIER_DISABLED'):
+        return None
+    if _frontier is None:
+        with _frontier_lock:
+            if _frontier is None:
+                _frontier = URLFrontier(
+                    os.getenv('SCRAPER_FRONTIER_PATH', os.path.join(os.getcwd(), '.scraper_frontier', 'urls.sqlite')),
+                    max_age=float(os.getenv('SCRAPER_FRONTIER_MAX_AGE_DAYS', '7')) * 24 * 3600
+                )
+                atexit.register(_frontier.close)
+    return _frontier
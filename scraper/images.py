@@ -0,0 +1,315 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import urljoin
+
+from scraper.metrics import UNKNOWN_SOURCE, count, timed
+from scraper.metrics import source as metrics_source
+from scraper.scrapers.http_client import get_client
+from scraper.scrapers.rate_limit import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Widths of the WebP variants; images narrower than a width get one at their own size instead
+DEFAULT_WIDTHS = tuple(int(width) for width in os.getenv("SCRAPER_IMAGE_WIDTHS", "320,640,1024,1600").split(","))
+DEFAULT_QUALITY = int(os.getenv("SCRAPER_IMAGE_QUALITY", "80"))
+DEFAULT_WORKERS = int(os.getenv("SCRAPER_IMAGE_WORKERS", "8"))
+DEFAULT_BUCKET = os.getenv("SCRAPER_IMAGE_BUCKET", "article-images")
+# Originals larger than this are not processed
+MAX_IMAGE_BYTES = 25 * 1024 * 1024
+# Rate limiter scope for downloads, see SCOPE_LIMITS
+RATE_LIMIT_SCOPE = "images"
+
+IMAGE_HEADERS = {"Accept": "image/avif,image/webp,image/png,image/jpeg,image/*;q=0.8,*/*;q=0.5"}
+
+
+def content_path(digest: str, name: str) -> str:
+    """Content-addressed location of one file derived from an image"""
+    return f"{digest[:2]}/{digest}/{name}"
+
+
+class LocalImageStore:
+    """Stores image variants under a local directory"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def read(self, path: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.root, path), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, path: str, data: bytes, content_type: str):
+        target = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class SupabaseImageStore:
+    """Stores image variants in a Supabase Storage bucket"""
+
+    def __init__(self, supabase, bucket: str = DEFAULT_BUCKET):
+        self.bucket = supabase.storage.from_(bucket)
+
+    def read(self, path: str) -> Optional[bytes]:
+        if not self.bucket.exists(path):
+            return None
+        return self.bucket.download(path)
+
+    def write(self, path: str, data: bytes, content_type: str):
+        # Paths are content addressed, so an object never changes once written
+        self.bucket.upload(path, data, {
+            "content-type": content_type,
+            "cache-control": "31536000",
+            "upsert": "true",
+        })
+
+
+def _load_pillow():
+    try:
+        from PIL import Image, ImageOps
+        return Image, ImageOps
+    except ImportError:
+        return None
+
+
+class ImagePipeline:
+    """Downloads article images and stores resized WebP variants by content hash.
+
+    Images are fetched through the shared HTTP client and rate limiter and
+    processed on a bounded thread pool; Pillow releases the GIL while
+    decoding, resizing and encoding, so the workers run in parallel. Each
+    distinct image is stored once under `<sha256[:2]>/<sha256>/`, next to a
+    manifest that later runs read instead of encoding it again.
+    """
+
+    def __init__(self, store, widths: Iterable[int] = DEFAULT_WIDTHS, quality: int = DEFAULT_QUALITY,
+                 max_workers: int = DEFAULT_WORKERS, max_bytes: int = MAX_IMAGE_BYTES):
+        pillow = _load_pillow()
+        if pillow is None:
+            raise ImportError("Pillow is required for the image pipeline")
+        self.Image, self.ImageOps = pillow
+        self.store = store
+        self.widths = sorted(set(widths))
+        self.quality = quality
+        self.max_bytes = max_bytes
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="images")
+        # url -> future of its record, so an image shared by several articles is fetched once
+        self._by_url: Dict[str, Future] = {}
+        # sha256 -> future of its variants, for the same bytes behind different URLs
+        self._by_hash: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"downloaded": 0, "deduplicated": 0, "encoded": 0, "variants": 0, "failed": 0,
+                      "bytes_in": 0, "bytes_out": 0}
+
+    def _add(self, name: str, value: int = 1):
+        with self._lock:
+            self.stats[name] += value
+
+    def process(self, urls: Iterable[str], source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Process images in parallel, returning a record per image that succeeded, in input order"""
+        futures = []
+        for url in dict.fromkeys(url for url in urls if url and url.startswith(("http://", "https://"))):
+            with self._lock:
+                future = self._by_url.get(url)
+                if future is None:
+                    future = self._by_url[url] = self.executor.submit(self._process_one, url, source)
+            futures.append(future)
+        records = []
+        for future in futures:
+            record = future.result()
+            if record is not None:
+                records.append(record)
+        return records
+
+    def annotate(self, article: Dict[str, Any], source: Optional[str] = None) -> Dict[str, Any]:
+        """Add `image_variants` for the main and additional images of a scraped article dict"""
+        main = article.get("image_url")
+        urls = [main] + list(article.get("additional_images") or [])
+        base = article.get("url")
+        if base:
+            urls = [urljoin(base, url) if url else url for url in urls]
+        records = self.process(urls, source or article.get("source"))
+        main = urljoin(base, main) if base and main else main
+        article["image_variants"] = [
+            {**record, "role": "main" if record["url"] == main else "additional"} for record in records
+        ]
+        return article
+
+    def _download(self, url: str, source: Optional[str]) -> bytes:
+        limiter = get_rate_limiter()
+        # Pool threads carry no source context, so attribute the wait explicitly
+        with metrics_source(source or UNKNOWN_SOURCE):
+            limiter.acquire(url, RATE_LIMIT_SCOPE)
+        with timed("image_fetch", source):
+            response = get_client().get(url, headers=IMAGE_HEADERS)
+        count("http_requests", source)
+        if response.status_code >= 400:
+            count("http_errors", source)
+            if response.status_code == 429:
+                limiter.penalize(url, response.headers.get("Retry-After"), RATE_LIMIT_SCOPE)
+            raise IOError(f"{response.status_code} Error for url: {url}")
+        data = response.content
+        if len(data) > self.max_bytes:
+            raise IOError(f"Image larger than {self.max_bytes} bytes: {url}")
+        return data
+
+    def _process_one(self, url: str, source: Optional[str]) -> Optional[Dict[str, Any]]:
+        try:
+            data = self._download(url, source)
+            self._add("downloaded")
+            self._add("bytes_in", len(data))
+            digest = hashlib.sha256(data).hexdigest()
+
+            # The first worker to see these bytes stores them; others wait for its result
+            with self._lock:
+                variants = self._by_hash.get(digest)
+                owner = variants is None
+                if owner:
+                    variants = self._by_hash[digest] = Future()
+            if owner:
+                try:
+                    variants.set_result(self._store_variants(digest, data, source))
+                except Exception as e:
+                    # Let a later copy of the same bytes try again
+                    with self._lock:
+                        del self._by_hash[digest]
+                    variants.set_exception(e)
+            else:
+                self._add("deduplicated")
+                count("images_deduplicated", source)
+            return {"url": url, **variants.result()}
+        except Exception as e:
+            self._add("failed")
+            count("image_errors", source)
+            logger.error(f"Error processing image {url}: {str(e)}")
+            return None
+
+    def _store_variants(self, digest: str, data: bytes, source: Optional[str]) -> Dict[str, Any]:
+        """Variants of an image, reusing those an earlier run stored"""
+        manifest = self.store.read(content_path(digest, "manifest.json"))
+        if manifest:
+            self._add("deduplicated")
+            count("images_deduplicated", source)
+            return json.loads(manifest)
+        with timed("image_processing", source):
+            record = self._encode(digest, data)
+        count("images_processed", source)
+        return record
+
+    def _encode(self, digest: str, data: bytes) -> Dict[str, Any]:
+        Image = self.Image
+        largest = self.widths[-1]
+        image = Image.open(io.BytesIO(data))
+        # Let the JPEG decoder downscale while decoding; a square box keeps
+        # both sides at least `largest`, whatever the EXIF orientation
+        image.draft("RGB", (largest, largest))
+        image = self.ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        width, height = image.size
+        targets = [target for target in self.widths if target <= width]
+        if width < largest and width not in targets:
+            targets.append(width)
+
+        variants = []
+        for target in targets:
+            size = (target, max(1, round(height * target / width)))
+            resized = image if size == image.size else image.resize(size, Image.LANCZOS, reducing_gap=2.0)
+            buffer = io.BytesIO()
+            resized.save(buffer, "WEBP", quality=self.quality, method=4)
+            path = content_path(digest, f"{target}.webp")
+            self.store.write(path, buffer.getvalue(), "image/webp")
+            variants.append({"width": size[0], "height": size[1], "path": path, "bytes": buffer.tell()})
+            self._add("variants")
+            self._add("bytes_out", buffer.tell())
+
+        record = {"sha256": digest, "variants": variants}
+        # Written last: its presence means every variant is in place
+        self.store.write(content_path(digest, "manifest.json"), json.dumps(record).encode("utf-8"),
+                         "application/json")
+        self._add("encoded")
+        return record
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        stats = self.stats
+        logger.info(
+            f"Images: {stats['downloaded']} downloaded, {stats['encoded']} encoded into {stats['variants']} variants, "
+            f"{stats['deduplicated']} duplicates, {stats['failed']} failed, "
+            f"{stats['bytes_in'] / 1024 / 1024:.1f} MB in, {stats['bytes_out'] / 1024 / 1024:.1f} MB out"
+        )
+
+
+def create_image_pipeline(supabase=None, directory: Optional[str] = None, **options) -> Optional[ImagePipeline]:
+    """Image pipeline writing to `directory`, or to the Supabase bucket; None without Pillow"""
+    if _load_pillow() is None:
+        logger.warning("Image processing needs Pillow (pip install Pillow), keeping source image URLs only")
+        return None
+    store = LocalImageStore(directory) if directory else SupabaseImageStore(supabase)
+    return ImagePipeline(store, **options)
+
+
+class ImageStage:
+    """Runs the image pipeline between the scrapers and the persistence queue.
+
+    `put` hands an article to a worker and returns, blocking only while
+    `max_pending` articles are already waiting for their images, and the
+    article is passed to `downstream(source, article)` once annotated.
+    Image failures never hold an article back: it is forwarded with the
+    variants that succeeded.
+    """
+
+    def __init__(self, images: ImagePipeline, downstream: Callable[[str, Dict[str, Any]], None],
+                 max_articles: int = 4, max_pending: int = 32):
+        self.images = images
+        self.downstream = downstream
+        self.executor = ThreadPoolExecutor(max_workers=max_articles, thread_name_prefix="image-stage")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def put(self, source: str, article: Dict[str, Any]):
+        self._slots.acquire()
+        future = self.executor.submit(self._run, source, article)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+
+    def _run(self, source: str, article: Dict[str, Any]):
+        try:
+            self.images.annotate(article, source)
+        except Exception as e:
+            logger.error(f"Error processing images for {article.get('url')}: {str(e)}")
+        self.downstream(source, article)
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def drain(self):
+        """Wait until every article put so far has been passed downstream"""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+
+    def close(self):
+        self.drain()
+        self.executor.shutdown(wait=True)
+        self.images.close()
@@ -0,0 +1,148 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Set
+
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class Watermark:
+    """How far a source has already been ingested"""
+    source: str
+    source_id: Optional[str] = None
+    last_scraped_at: Optional[datetime] = None
+    newest_published_at: Optional[datetime] = None
+
+
+class IncrementalCrawl:
+    """Stops a paginated crawl once it reaches already-ingested territory.
+
+    A page with no new URLs (or whose listed articles are all older than the
+    newest published_at already stored) ends the crawl. With full=True every
+    page is walked and every URL is fetched, as before.
+    """
+
+    def __init__(self, supabase: Client, source: str, full: bool = False):
+        self.supabase = supabase
+        self.source = source
+        self.full = full
+        self._watermark: Optional[Watermark] = None
+        self._known: Set[str] = set()
+        self._checked: Set[str] = set()
+        # Set when a page could not be fetched; commit() then keeps the watermark
+        self.incomplete = False
+
+    @property
+    def watermark(self) -> Watermark:
+        if self._watermark is None:
+            self._watermark = self.load_watermark()
+        return self._watermark
+
+    def load_watermark(self) -> Watermark:
+        """Read sources.last_scraped_at and the newest stored published_at for the source"""
+        watermark = Watermark(source=self.source)
+        try:
+            source = self.supabase.table('sources')\
+                .select('id, last_scraped_at')\
+                .eq('name', self.source)\
+                .limit(1)\
+                .execute()
+            if not source.data:
+                return watermark
+
+            watermark.source_id = source.data[0]['id']
+            watermark.last_scraped_at = _parse_timestamp(source.data[0].get('last_scraped_at'))
+
+            newest = self.supabase.table('articles')\
+                .select('published_at')\
+                .eq('source_id', watermark.source_id)\
+                .not_.is_('published_at', 'null')\
+                .order('published_at', desc=True)\
+                .limit(1)\
+                .execute()
+            if newest.data:
+                watermark.newest_published_at = _parse_timestamp(newest.data[0]['published_at'])
+
+        except Exception as e:
+            logger.error(f"Error loading watermark for {self.source}: {str(e)}")
+
+        logger.info(
+            f"{self.source} watermark: last scraped {watermark.last_scraped_at}, "
+            f"newest article {watermark.newest_published_at}"
+        )
+        return watermark
+
+    def add_known(self, urls: Iterable[str], checked: Iterable[str] = ()):
+        """Record URLs already known to be stored, e.g. from a freshness query"""
+        self._known.update(urls)
+        self._checked.update(checked)
+
+    def known_urls(self, urls: List[str]) -> Set[str]:
+        """Return which URLs are already stored, with one query for any not yet checked"""
+        unchecked = [url for url in dict.fromkeys(urls) if url not in self._checked]
+        if unchecked:
+            response = self.supabase.table('articles')\
+                .select('url')\
+                .in_('url', unchecked)\
+                .execute()
+            self._known.update(row['url'] for row in response.data or [])
+            self._checked.update(unchecked)
+        return {url for url in urls if url in self._known}
+
+    def new_urls(self, urls: List[str]) -> List[str]:
+        """Filter a page's URLs down to the ones to fetch (all of them in a full crawl)"""
+        if self.full:
+            return urls
+        known = self.known_urls(urls)
+        return [url for url in urls if url not in known]
+
+    def older_than_watermark(self, published_at: Iterable[Optional[str]]) -> bool:
+        """True when every dated listing entry predates the newest stored article"""
+        newest = self.watermark.newest_published_at
+        dates = [_parse_timestamp(value) for value in published_at]
+        if newest is None or not dates or any(date is None for date in dates):
+            return False
+        return all(date < newest for date in dates)
+
+    def should_stop(self, urls: List[str], published_at: Optional[Iterable[Optional[str]]] = None) -> bool:
+        """Decide whether pagination should end at this page"""
+        if self.full:
+            return False
+        if published_at is not None and self.older_than_watermark(published_at):
+            logger.info(f"{self.source}: page is older than the watermark, stopping pagination")
+            return True
+        if not self.new_urls(urls):
+            logger.info(f"{self.source}: page has no new URLs, stopping pagination")
+            return True
+        return False
+
+    def mark_incomplete(self):
+        """Record that the crawl missed pages, so the next run walks them again"""
+        self.incomplete = True
+
+    def commit(self):
+        """Advance sources.last_scraped_at after a successful crawl"""
+        if self.incomplete:
+            logger.warning(f"{self.source}: crawl was incomplete, keeping the watermark")
+            return
+        source_id = self.watermark.source_id
+        if not source_id:
+            return
+        now = datetime.now(timezone.utc)
+        self.supabase.table('sources').update({
+            'last_scraped_at': now.isoformat()
+        }).eq('id', source_id).execute()
+        self.watermark.last_scraped_at = now
@@ -0,0 +1,212 @@
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import logging
+
+from supabase import Client
+
+from scraper.fingerprint import fingerprint
+from scraper.frontier import URLFrontier, get_frontier
+from scraper.metrics import count, timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def chunked(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Split an iterable of results into lists of at most `size` items"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def resolve_source_ids(supabase: Client, names: Iterable[str]) -> Dict[str, str]:
+    """Look up source IDs for all given source names in a single query"""
+    names = sorted(set(name for name in names if name))
+    if not names:
+        return {}
+
+    response = supabase.table("sources").select("id, name").in_("name", names).execute()
+    source_ids = {row["name"]: row["id"] for row in response.data or []}
+
+    for name in names:
+        if name not in source_ids:
+            logger.error(f"Source not found: {name}")
+
+    return source_ids
+
+
+def build_article_row(result: Dict[str, Any], source_id: str) -> Dict[str, Any]:
+    """Map a scraper result dict onto an articles table row"""
+    fingerprints = fingerprint(result["content"])
+    if result.get("content_hash"):
+        fingerprints["content_hash"] = result["content_hash"]
+
+    row = {
+        "source_id": source_id,
+        "title": result["title"],
+        "url": result["url"],
+        "image_url": result.get("image_url"),
+        "author": result.get("author"),
+        "published_at": result.get("published_at"),
+        "original_content": result["content"],
+        "is_processed": False,
+        "is_subscriber_only": False,
+        "category": result.get("category", "Architecture"),
+        **fingerprints
+    }
+    # Only set by runs with the image pipeline, so other runs keep stored variants
+    if "image_variants" in result:
+        row["image_variants"] = result["image_variants"]
+    return row
+
+
+def row_unchanged(stored: Dict[str, Any], row: Dict[str, Any]) -> bool:
+    """True when writing `row` would not change the stored article.
+
+    Rows from runs with the image pipeline also carry image_variants, which
+    count as a change when they are new or differ from the stored ones.
+    """
+    if stored.get("content_hash") != row["content_hash"]:
+        return False
+    return "image_variants" not in row or stored.get("image_variants") == row["image_variants"]
+
+
+class BulkIngestor:
+    """Lands scraper results in Supabase with a handful of round trips per batch.
+
+    Source IDs are resolved once and cached, existing content hashes are fetched
+    with one query per batch and all new or changed rows go out in a single upsert.
+    URLs are recorded in the URL frontier only once their rows are stored.
+    """
+
+    def __init__(self, supabase: Client, batch_size: int = DEFAULT_BATCH_SIZE,
+                 frontier: Optional[URLFrontier] = None):
+        self.supabase = supabase
+        self.batch_size = batch_size
+        self.frontier = frontier or get_frontier()
+        self.source_ids: Dict[str, str] = {}
+        self.touched_sources: set = set()
+        self.stats = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+
+    def _resolve_sources(self, batch: List[Dict[str, Any]]):
+        missing = {result.get("source") for result in batch} - set(self.source_ids)
+        if missing:
+            self.source_ids.update(resolve_source_ids(self.supabase, missing))
+
+    def _fetch_existing(self, urls: List[str], image_variants: bool = False) -> Dict[str, Dict[str, Any]]:
+        columns = "url, content_hash, image_variants" if image_variants else "url, content_hash"
+        response = self.supabase.table("articles")\
+            .select(columns)\
+            .in_("url", urls)\
+            .execute()
+        return {row["url"]: row for row in response.data or []}
+
+    def ingest_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """Write one batch of results, returning the number of rows upserted"""
+        # A batch mixes sources, so its latency is recorded under 'all'
+        with timed("db_write", "all"):
+            return self._ingest_batch(batch)
+
+    def _ingest_batch(self, batch: List[Dict[str, Any]]) -> int:
+        self._resolve_sources(batch)
+
+        # Later duplicates of the same URL win, matching the old per-article loop
+        rows: Dict[str, Dict[str, Any]] = {}
+        sources: Dict[str, str] = {}
+        for result in batch:
+            source_id = self.source_ids.get(result.get("source"))
+            if not source_id or not result.get("url"):
+                self.stats["skipped"] += 1
+                continue
+            rows[result["url"]] = build_article_row(result, source_id)
+            sources[result["url"]] = result["source"]
+            self.touched_sources.add(source_id)
+
+        if not rows:
+            return 0
+
+        image_variants = any("image_variants" in row for row in rows.values())
+        existing = self._fetch_existing(list(rows), image_variants)
+        if image_variants:
+            # PostgREST upserts the union of the batch's columns, so rows the
+            # image stage did not annotate keep their stored variants, not NULL
+            for url, row in rows.items():
+                row.setdefault("image_variants", existing.get(url, {}).get("image_variants"))
+
+        # Counted locally, so a failed upsert is reported only as failed
+        outcome = {"inserted": 0, "updated": 0, "unchanged": 0}
+        changed = []
+        for url, row in rows.items():
+            current = existing.get(url)
+            if current is None:
+                outcome["inserted"] += 1
+            elif not row_unchanged(current, row):
+                outcome["updated"] += 1
+            else:
+                outcome["unchanged"] += 1
+                logger.debug(f"Article exists with same content: {row['title']}")
+                continue
+            changed.append(row)
+
+        if changed:
+            self.supabase.table("articles").upsert(changed, on_conflict="url").execute()
+            for row in changed:
+                count("articles_written", sources[row["url"]])
+            logger.info(f"Upserted {len(changed)} articles ({len(rows) - len(changed)} unchanged)")
+        for key, value in outcome.items():
+            self.stats[key] += value
+
+        # Unchanged rows are already stored, so every URL of the batch is done
+        if self.frontier:
+            for url in rows:
+                self.frontier.mark_fetched(url, sources[url])
+
+        return len(changed)
+
+    def ingest(self, results: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Write a stream of results in batches and stamp the touched sources"""
+        for batch in chunked(results, self.batch_size):
+            try:
+                self.ingest_batch(batch)
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                logger.error(f"Error ingesting batch of {len(batch)} articles: {str(e)}")
+
+        self.finish()
+        return self.stats
+
+    def finish(self):
+        """Update last_scraped_at once for every source seen in this run"""
+        if not self.touched_sources:
+            return
+
+        self.supabase.table("sources").update({
+            "last_scraped_at": datetime.utcnow().isoformat()
+        }).in_("id", sorted(self.touched_sources)).execute()
+        self.touched_sources.clear()
+
+
+def ingest_results(supabase: Client, results: Iterable[Dict[str, Any]],
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """Bulk ingest scraper results, returning insert/update/skip counts"""
+    return BulkIngestor(supabase, batch_size=batch_size).ingest(results)
+
+
+def ingest_batches(supabase: Client, batches: Iterable[List[Dict[str, Any]]],
+                   ingestor: Optional[BulkIngestor] = None) -> Dict[str, int]:
+    """Bulk ingest a stream of pre-built batches, e.g. one per scraped page"""
+    ingestor = ingestor or BulkIngestor(supabase)
+    for batch in batches:
+        try:
+            ingestor.ingest_batch(batch)
+        except Exception as e:
+            ingestor.stats["failed"] += len(batch)
+            logger.error(f"Error ingesting batch of {len(batch)} articles: {str(e)}")
+
+    ingestor.finish()
+    return ingestor.stats
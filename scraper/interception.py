@@ -0,0 +1,159 @@
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional, Pattern, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Rough transfer sizes used to estimate the bytes saved by an aborted request
+ESTIMATED_BYTES = {
+    'image': 150_000,
+    'media': 500_000,
+    'font': 40_000,
+    'stylesheet': 30_000,
+    'script': 60_000,
+    'xhr': 5_000,
+    'fetch': 5_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+TRACKER_DOMAINS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'googlesyndication.com', 'adservice.google.com', 'amazon-adsystem.com',
+    'facebook.net', 'facebook.com', 'hotjar.com', 'scorecardresearch.com',
+    'quantserve.com', 'chartbeat.com', 'taboola.com', 'outbrain.com',
+    'newrelic.com', 'nr-data.net', 'segment.io', 'pinterest.com', 'twitter.com',
+)
+
+HEAVY_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+
+@dataclass(frozen=True)
+class InterceptionPolicy:
+    """Which browser requests to abort for a source"""
+    blocked_resource_types: FrozenSet[str] = frozenset()
+    blocked_domains: Tuple[str, ...] = ()
+    blocked_url_patterns: Tuple[str, ...] = ()
+    # Abort every non-document request to a host outside the page's own site
+    block_third_party: bool = False
+    # Third-party hosts that are still allowed when block_third_party is set
+    allowed_domains: Tuple[str, ...] = ()
+    _patterns: Tuple[Pattern, ...] = field(init=False, repr=False, compare=False, default=())
+
+    def __post_init__(self):
+        object.__setattr__(self, '_patterns', tuple(re.compile(p) for p in self.blocked_url_patterns))
+
+    def block_reason(self, url: str, resource_type: str, first_party: str) -> Optional[str]:
+        """Return why a request should be aborted, or None to let it through"""
+        if resource_type == 'document':
+            return None
+        if resource_type in self.blocked_resource_types:
+            return f"type:{resource_type}"
+
+        host = urlparse(url).hostname or ''
+        if _matches_domain(host, self.blocked_domains):
+            return 'domain'
+        if any(pattern.search(url) for pattern in self._patterns):
+            return 'pattern'
+        if self.block_third_party and not _matches_domain(host, (first_party,) + self.allowed_domains):
+            return 'third-party'
+        return None
+
+def _matches_domain(host: str, domains: Tuple[str, ...]) -> bool:
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+def site_domain(url: str) -> str:
+    """Approximate the registrable domain of a URL (e.g. www.dezeen.com -> dezeen.com)"""
+    host = urlparse(url).hostname or ''
+    return '.'.join(host.split('.')[-2:])
+
+DEFAULT_POLICY = InterceptionPolicy(
+    blocked_resource_types=HEAVY_RESOURCE_TYPES,
+    blocked_domains=TRACKER_DOMAINS,
+    blocked_url_patterns=(r'\.(png|jpe?g|webp|gif|svg|css|woff2?|ttf|mp4)(\?|$)',),
+)
+
+POLICIES: Dict[str, InterceptionPolicy] = {
+    'default': DEFAULT_POLICY,
+    # Leibal renders its content from first-party markup, so everything else can go
+    'leibal': InterceptionPolicy(
+        blocked_resource_types=HEAVY_RESOURCE_TYPES,
+        blocked_domains=TRACKER_DOMAINS,
+        blocked_url_patterns=DEFAULT_POLICY.blocked_url_patterns,
+        block_third_party=True,
+        allowed_domains=('wp.com', 'ajax.googleapis.com', 'cdnjs.cloudflare.com', 'jsdelivr.net'),
+    ),
+    # Metropolis pulls listing widgets from third parties, so only known trackers are cut
+    'metropolis': DEFAULT_POLICY,
+}
+
+def get_policy(source: str) -> InterceptionPolicy:
+    """Look up the interception policy for a source name"""
+    return POLICIES.get(source.lower(), DEFAULT_POLICY)
+
+class InterceptionStats:
+    """Per-run counters of requests aborted and an estimate of the bytes saved"""
+
+    def __init__(self):
+        self.allowed = 0
+        self.blocked = 0
+        self.bytes_saved = 0
+        self.by_reason: Counter = Counter()
+
+    def record(self, resource_type: str, reason: Optional[str]):
+        if reason is None:
+            self.allowed += 1
+            return
+        self.blocked += 1
+        self.bytes_saved += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        self.by_reason[reason] += 1
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            'allowed_requests': self.allowed,
+            'blocked_requests': self.blocked,
+            'estimated_bytes_saved': self.bytes_saved,
+            'blocked_by_reason': dict(self.by_reason),
+        }
+
+    def log_summary(self, source: str):
+        if self.allowed or self.blocked:
+            logger.info(
+                f"{source} request interception: blocked {self.blocked} of {self.allowed + self.blocked} "
+                f"requests, ~{self.bytes_saved / 1_000_000:.1f} MB saved ({dict(self.by_reason)})"
+            )
+
+class RequestInterceptor:
+    """Applies an InterceptionPolicy to a Playwright page or context (sync or async API)"""
+
+    def __init__(self, policy: InterceptionPolicy, first_party: str,
+                 stats: Optional[InterceptionStats] = None):
+        self.policy = policy
+        self.first_party = first_party
+        self.stats = stats or InterceptionStats()
+
+    def _reason(self, request) -> Optional[str]:
+        reason = self.policy.block_reason(request.url, request.resource_type, self.first_party)
+        self.stats.record(request.resource_type, reason)
+        return reason
+
+    def handle(self, route):
+        if self._reason(route.request):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_async(self, route):
+        if self._reason(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def install(self, target):
+        """Route every request of a sync API page or context through the policy"""
+        target.route('**/*', self.handle)
+
+    async def install_async(self, target):
+        """Route every request of an async API page or context through the policy"""
+        await target.route('**/*', self.handle_async)
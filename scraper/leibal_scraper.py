@@ -1,43 +1,224 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from supabase import Client
 from scraper.base_scraper import BaseScraper, ScrapedArticle, ContentBlock
+import asyncio
 import logging
-from urllib.parse import urljoin
 from playwright.sync_api import TimeoutError as PlaywrightTimeout
+from playwright.async_api import TimeoutError as AsyncPlaywrightTimeout
+from scraper.scrapers.rate_limit import get_rate_limiter
+from scraper.incremental import IncrementalCrawl
+from scraper.frontier import dedupe_urls
+from scraper.checkpoint import CrawlCheckpoint
+from scraper.scrapers.discovery import discover_urls
+from scraper.metrics import count, timed
+from scraper.images import ImagePipeline
+from scraper.profiling import mark
+from bs4 import BeautifulSoup
+
+ARTICLE_LINK_SELECTOR = 'article a[href*="/architecture/"]'
+
+# Discovered URLs are processed in chunks the size of an archive page; the
+# chunks shift whenever the sitemap changes, so they are checkpointed by URL only
+DISCOVERY_PAGE_SIZE = 20
+
+# Collect article metadata in a single evaluate call
+META_SCRIPT = """
+() => {
+    const meta = (selector) => document.querySelector(selector)?.getAttribute('content') || '';
+    const text = (selector) => document.querySelector(selector)?.textContent.trim() || '';
+    const time = document.querySelector('.entry-meta time[datetime], time[datetime]');
+    return {
+        title: text('h1.entry-title') || meta('meta[property="og:title"]') || document.title,
+        meta_description: meta('meta[name="description"]') || meta('meta[property="og:description"]'),
+        author: text('.entry-meta a[rel="author"]') || meta('meta[name="author"]') || 'Leibal',
+        published_at: meta('meta[property="article:published_time"]')
+            || (time && time.getAttribute('datetime'))
+            || new Date().toISOString(),
+        tags: Array.from(document.querySelectorAll('a[rel="tag"]')).map(a => a.textContent.trim()),
+    };
+}
+"""
 
 class LeibalScraper(BaseScraper):
-    def __init__(self, source_id: str):
-        super().__init__('https://leibal.com', source_id)
+    source_name = 'Leibal'
+    http_first = True
+
+    def __init__(self, source_id: str, pool_size: int = 1, base_url: str = 'https://leibal.com',
+                 images: Optional[ImagePipeline] = None, supabase: Optional[Client] = None):
+        super().__init__(base_url, source_id, pool_size=pool_size, images=images, supabase=supabase)
         self.logger = logging.getLogger(__name__)
 
-    def get_article_urls(self, category: str = 'architecture', page: int = 1) -> List[str]:
-        """Get all article URLs from a category page"""
+    def get_article_urls_static(self, category: str = 'architecture', page: int = 1) -> Optional[List[str]]:
+        """Get article URLs from a plain GET of the category page, or None if the browser is needed"""
+        url = f"{self.base_url}/category/{category}/page/{page}"
+        soup = self.fetcher.fetch_static(url, [ARTICLE_LINK_SELECTOR], ttl=0, stage='discovery_fetch')
+        if soup is None:
+            return None
+
+        urls = [link.get('href') for link in soup.select(ARTICLE_LINK_SELECTOR)]
+        return dedupe_urls(url for url in urls if url and '/architecture/' in url)
+
+    def get_article_urls(self, category: str = 'architecture', page: int = 1) -> Optional[List[str]]:
+        """Get all article URLs from a category page, or None if it could not be fetched"""
         try:
+            urls = self.get_article_urls_static(category, page)
+            if urls is not None:
+                return urls
+
             url = f"{self.base_url}/category/{category}/page/{page}"
-            self.page.goto(url, wait_until='networkidle')
-            
-            # Wait for article links
-            self.page.wait_for_selector('article a[href*="/architecture/"]')
-            
+            self.ensure_browser()
+            get_rate_limiter().acquire(url)
+            with timed('browser_navigation', self.source_name):
+                self.page.goto(url, wait_until='networkidle')
+
+                # Wait for article links
+                self.page.wait_for_selector(ARTICLE_LINK_SELECTOR)
+
             # Extract URLs
-            links = self.page.query_selector_all('article a[href*="/architecture/"]')
+            links = self.page.query_selector_all(ARTICLE_LINK_SELECTOR)
             urls = [link.get_attribute('href') for link in links]
-            
+
             # Filter and deduplicate
-            return list(set([url for url in urls if url and '/architecture/' in url]))
+            return dedupe_urls(url for url in urls if url and '/architecture/' in url)
 
         except PlaywrightTimeout:
             self.logger.error(f"Timeout while fetching article list from page {page}")
-            return []
+            return None
         except Exception as e:
             self.logger.error(f"Error fetching article list: {str(e)}")
-            return []
+            return None
+
+    async def get_article_urls_async(self, page, category: str = 'architecture',
+                                     page_num: int = 1) -> Optional[List[str]]:
+        """Get all article URLs from a category page on a pooled page, or None if it could not be fetched"""
+        try:
+            url = f"{self.base_url}/category/{category}/page/{page_num}"
+            await get_rate_limiter().acquire_async(url)
+            with timed('browser_navigation', self.source_name):
+                await page.goto(url, wait_until='networkidle')
+                await page.wait_for_selector(ARTICLE_LINK_SELECTOR)
+
+            urls = await page.eval_on_selector_all(
+                ARTICLE_LINK_SELECTOR, 'links => links.map(link => link.getAttribute("href"))'
+            )
+            return dedupe_urls(url for url in urls if url and '/architecture/' in url)
+
+        except AsyncPlaywrightTimeout:
+            self.logger.error(f"Timeout while fetching article list from page {page_num}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error fetching article list: {str(e)}")
+            return None
+
+    def discover_article_pages(self, category: str = 'architecture', max_pages: int = 5,
+                               crawl: Optional[IncrementalCrawl] = None) -> Optional[List[List[str]]]:
+        """Discover article URLs from the sitemap or category feed, chunked like archive pages.
+
+        Returns None when neither exists. Incremental crawls only ask for URLs
+        modified since the last run.
+        """
+        since = crawl.watermark.last_scraped_at if crawl and not crawl.full else None
+        discovered = discover_urls(
+            self.base_url,
+            since=since,
+            url_filter=lambda url: f"/{category}/" in url,
+            limit=max_pages * DISCOVERY_PAGE_SIZE,
+            feeds=[f"{self.base_url}/category/{category}/feed/"]
+        )
+        if discovered is None:
+            return None
+
+        for entry in discovered:
+            if entry.lastmod:
+                self.lastmod[entry.url] = entry.lastmod
+        urls = [entry.url for entry in discovered]
+        return [urls[i:i + DISCOVERY_PAGE_SIZE] for i in range(0, len(urls), DISCOVERY_PAGE_SIZE)]
+
+    def extract_meta_info(self) -> Dict[str, Any]:
+        """Extract title, description, author, date and tags from the current page"""
+        return self.page.evaluate(META_SCRIPT)
+
+    def extract_meta_info_from_soup(self, soup: BeautifulSoup) -> Dict[str, Any]:
+        """Same fields as META_SCRIPT, read from a statically fetched page"""
+        def meta(selector):
+            el = soup.select_one(selector)
+            return (el.get('content') or '') if el else ''
+
+        def text(selector):
+            el = soup.select_one(selector)
+            return el.get_text().strip() if el else ''
+
+        time_el = soup.select_one('.entry-meta time[datetime], time[datetime]')
+        return {
+            'title': text('h1.entry-title') or meta('meta[property="og:title"]') or text('title'),
+            'meta_description': meta('meta[name="description"]') or meta('meta[property="og:description"]'),
+            'author': text('.entry-meta a[rel="author"]') or meta('meta[name="author"]') or 'Leibal',
+            'published_at': meta('meta[property="article:published_time"]')
+                or (time_el.get('datetime') if time_el else '')
+                or datetime.utcnow().isoformat(),
+            'tags': [a.get_text().strip() for a in soup.select('a[rel="tag"]')],
+        }
+
+    @staticmethod
+    def main_image_from_blocks(blocks: List[ContentBlock]) -> Optional[Dict[str, str]]:
+        """Use the first image block as the article's main image"""
+        for block in blocks:
+            if block.type == 'image':
+                return {
+                    'url': block.content,
+                    'alt': block.metadata.get('alt') or '',
+                    'caption': block.metadata.get('caption') or ''
+                }
+        return None
+
+    def build_article(self, url: str, original_content: str, structured_content: List[ContentBlock],
+                      meta_info: Dict[str, Any], main_image: Optional[Dict[str, str]]) -> ScrapedArticle:
+        """Assemble a ScrapedArticle from extracted page data"""
+        return ScrapedArticle(
+            url=url,
+            title=meta_info['title'],
+            meta_description=meta_info['meta_description'],
+            original_content=original_content,
+            processed_content=self.process_content(structured_content),
+            structured_content=structured_content,
+            main_image=main_image or {'url': '', 'alt': '', 'caption': ''},
+            author=meta_info['author'],
+            published_at=datetime.fromisoformat(meta_info['published_at'].replace('Z', '+00:00')),
+            tags=meta_info['tags'],
+            source_id=self.source_id
+        )
+
+    def scrape_article_static(self, url: str) -> Optional[ScrapedArticle]:
+        """Scrape an article from a plain GET, or return None if the browser is needed"""
+        soup = self.fetcher.fetch_static(url, ['div.entry-content'])
+        if soup is None:
+            return None
+
+        with timed('extraction', self.source_name):
+            article_element = soup.select_one('div.entry-content')
+            structured_content = self.extract_structured_content_from_soup(article_element)
+
+            return self.build_article(
+                url,
+                article_element.decode_contents(),
+                structured_content,
+                self.extract_meta_info_from_soup(soup),
+                self.main_image_from_blocks(structured_content)
+            )
 
     def scrape_article(self, url: str) -> Optional[ScrapedArticle]:
-        """Scrape a single article"""
+        """Scrape a single article, over plain HTTP when possible"""
         try:
-            self.page.goto(url, wait_until='networkidle')
-            self.page.wait_for_selector('div.entry-content')
+            article = self.scrape_article_static(url)
+            if article:
+                return article
+
+            self.ensure_browser()
+            get_rate_limiter().acquire(url)
+            with timed('browser_navigation', self.source_name):
+                self.page.goto(url, wait_until='networkidle')
+                self.page.wait_for_selector('div.entry-content')
 
             # Get the main article element
             article_element = self.page.query_selector('div.entry-content')
@@ -47,80 +228,235 @@ class LeibalScraper(BaseScraper):
             # Extract content
             original_content = article_element.inner_html()
             structured_content = self.extract_structured_content(article_element)
-            processed_content = self.process_content(structured_content)
 
             # Extract meta information
             meta_info = self.extract_meta_info()
 
             # Get main image
-            main_image = {
-                'url': '',
-                'alt': '',
-                'caption': ''
-            }
-            img_element = article_element.query_selector('img')
-            if img_element:
-                main_image = {
-                    'url': img_element.get_attribute('src') or '',
-                    'alt': img_element.get_attribute('alt') or '',
-                    'caption': img_element.get_attribute('title') or ''
-                }
+            main_image = self.main_image_from_blocks(structured_content)
 
             # Create article object
-            return ScrapedArticle(
-                url=url,
-                title=meta_info['title'],
-                meta_description=meta_info['meta_description'],
-                original_content=original_content,
-                processed_content=processed_content,
-                structured_content=structured_content,
-                main_image=main_image,
-                author=meta_info['author'],
-                published_at=datetime.fromisoformat(meta_info['published_at'].replace('Z', '+00:00')),
-                tags=meta_info['tags'],
-                source_id=self.source_id
-            )
+            return self.build_article(url, original_content, structured_content, meta_info, main_image)
 
         except Exception as e:
             self.logger.error(f"Error scraping article {url}: {str(e)}")
             return None
 
-    def scrape_category(self, category: str = 'architecture', max_pages: int = 5) -> List[Dict[str, Any]]:
-        """Scrape articles from a category"""
+    async def scrape_article_async(self, page, url: str) -> Optional[ScrapedArticle]:
+        """Scrape a single article on a pooled page"""
+        try:
+            await get_rate_limiter().acquire_async(url)
+            with timed('browser_navigation', self.source_name):
+                await page.goto(url, wait_until='networkidle')
+                await page.wait_for_selector('div.entry-content')
+
+            article_element = await page.query_selector('div.entry-content')
+            if not article_element:
+                raise ValueError("Could not find article content")
+
+            original_content = await article_element.inner_html()
+            structured_content = await self.extract_structured_content_async(article_element)
+            meta_info = await page.evaluate(META_SCRIPT)
+
+            main_image = self.main_image_from_blocks(structured_content)
+
+            return self.build_article(url, original_content, structured_content, meta_info, main_image)
+
+        except Exception as e:
+            self.logger.error(f"Error scraping article {url}: {str(e)}")
+            return None
+
+    def handle_scraped(self, url: str, article: Optional[ScrapedArticle], results: List[Dict[str, Any]]):
+        """Save a freshly scraped article unless its fingerprint is unchanged"""
+        if article:
+            count('articles', self.source_name)
+        if article and self.is_unchanged(article):
+            self.mark_scraped(url)
+            self.logger.info(f"Skipping unchanged article: {url}")
+        elif article:
+            result = self.save_article(article)
+            results.append(result)
+            self.mark_scraped(url)
+            self.logger.info(f"Successfully scraped and saved: {url}")
+
+    def scrape_category(self, category: str = 'architecture', max_pages: int = 5,
+                        workers: Optional[int] = None,
+                        crawl: Optional[IncrementalCrawl] = None,
+                        checkpoint: Optional[CrawlCheckpoint] = None,
+                        discovery: bool = False) -> List[Dict[str, Any]]:
+        """Scrape articles from a category.
+
+        Stops early at known pages when `crawl` is set, and records progress
+        to (and resumes from) `checkpoint` when one is given. With `discovery`,
+        URLs come from the sitemap or feed when the site has one instead of
+        archive pages.
+        """
+        workers = workers or self.pool_size
+        if workers > 1:
+            return asyncio.run(
+                self.scrape_category_async(category, max_pages, workers, crawl, checkpoint, discovery)
+            )
+
         results = []
-        
-        for page in range(1, max_pages + 1):
+        if checkpoint and checkpoint.is_done(self.source_name):
+            self.logger.info(f"{self.source_name} already completed in the checkpointed run")
+            return results
+
+        pages = self.discover_article_pages(category, max_pages, crawl) if discovery else None
+        last_page = len(pages) if pages is not None else max_pages
+        first_page = checkpoint.next_page(self.source_name) if checkpoint and pages is None else 1
+
+        complete = True
+        for page in range(first_page, last_page + 1):
             try:
-                urls = self.get_article_urls(category, page)
+                urls = pages[page - 1] if pages is not None else self.get_article_urls(category, page)
+                if urls is None:
+                    self.page_failed(page, crawl)
+                    complete = False
+                    break
                 self.logger.info(f"Found {len(urls)} articles on page {page}")
 
-                for url in urls:
+                # One freshness query for the whole page
+                try:
+                    self.load_freshness(urls)
+                except Exception as e:
+                    self.logger.error(f"Error checking freshness for page {page}: {str(e)}")
+
+                # Discovered URLs are already limited to changes since the last run
+                if pages is None:
+                    urls = self.incremental_urls(urls, crawl)
+                    if urls is None:
+                        break
+                mark('discovery', self.source_name)
+
+                for url in self.resume_urls(checkpoint, page, self.unfetched_urls(urls)):
                     try:
-                        # Check if article already exists and needs updating
-                        existing = self.supabase.table('articles')\
-                            .select('id, last_scraped_at')\
-                            .eq('url', url)\
-                            .single()\
-                            .execute()
-
-                        if existing.data:
-                            last_scraped = datetime.fromisoformat(existing.data['last_scraped_at'].replace('Z', '+00:00'))
-                            if (datetime.now() - last_scraped).days < 7:
-                                self.logger.info(f"Skipping recently scraped article: {url}")
-                                continue
+                        if self.is_recently_scraped(url):
+                            self.logger.info(f"Skipping recently scraped article: {url}")
+                            continue
 
                         article = self.scrape_article(url)
-                        if article:
-                            result = self.save_article(article)
-                            results.append(result)
-                            self.logger.info(f"Successfully scraped and saved: {url}")
+                        self.handle_scraped(url, article, results)
+                        if article and checkpoint:
+                            checkpoint.complete_url(self.source_name, url)
 
                     except Exception as e:
+                        count('article_errors', self.source_name)
                         self.logger.error(f"Error processing article {url}: {str(e)}")
                         continue
+                # Articles are saved as they are scraped, so this closes both stages
+                mark('persistence', self.source_name)
+
+                if checkpoint and pages is None:
+                    checkpoint.complete_page(self.source_name, page)
 
             except Exception as e:
                 self.logger.error(f"Error processing page {page}: {str(e)}")
-                continue
+                self.page_failed(page, crawl)
+                complete = False
+                break
+
+        if checkpoint and complete:
+            checkpoint.complete_source(self.source_name)
+        return results
+
+    async def scrape_category_async(self, category: str = 'architecture', max_pages: int = 5,
+                                    workers: int = 3,
+                                    crawl: Optional[IncrementalCrawl] = None,
+                                    checkpoint: Optional[CrawlCheckpoint] = None,
+                                    discovery: bool = False) -> List[Dict[str, Any]]:
+        """Scrape articles from a category with up to `workers` fetches in flight.
+
+        Pages are fetched over plain HTTP first; the browser pool is only
+        started for pages whose static HTML lacks the expected content.
+        """
+        results = []
+        if checkpoint and checkpoint.is_done(self.source_name):
+            self.logger.info(f"{self.source_name} already completed in the checkpointed run")
+            return results
+        semaphore = asyncio.Semaphore(workers)
+
+        async def scrape_static(url: str) -> Optional[ScrapedArticle]:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self.scrape_article_static, url)
+                except Exception as e:
+                    self.logger.error(f"Error scraping article {url}: {str(e)}")
+                    return None
+
+        pages = None
+        if discovery:
+            pages = await asyncio.to_thread(self.discover_article_pages, category, max_pages, crawl)
+        last_page = len(pages) if pages is not None else max_pages
+        first_page = checkpoint.next_page(self.source_name) if checkpoint and pages is None else 1
+
+        complete = True
+        try:
+            for page_num in range(first_page, last_page + 1):
+                try:
+                    if pages is not None:
+                        urls = pages[page_num - 1]
+                    else:
+                        urls = await asyncio.to_thread(self.get_article_urls_static, category, page_num)
+                    if urls is None:
+                        await self.ensure_pool(workers)
+                        async with self.page_pool.page() as page:
+                            urls = await self.get_article_urls_async(page, category, page_num)
+                    if urls is None:
+                        self.page_failed(page_num, crawl)
+                        complete = False
+                        break
+                    self.logger.info(f"Found {len(urls)} articles on page {page_num}")
+
+                    try:
+                        await asyncio.to_thread(self.load_freshness, urls)
+                    except Exception as e:
+                        self.logger.error(f"Error checking freshness for page {page_num}: {str(e)}")
+
+                    if pages is None:
+                        urls = await asyncio.to_thread(self.incremental_urls, urls, crawl)
+                        if urls is None:
+                            break
+
+                    urls = await asyncio.to_thread(self.unfetched_urls, urls)
+                    pending = []
+                    for url in self.resume_urls(checkpoint, page_num, urls):
+                        if self.is_recently_scraped(url):
+                            self.logger.info(f"Skipping recently scraped article: {url}")
+                        else:
+                            pending.append(url)
+                    mark('discovery', self.source_name)
+
+                    articles = dict(zip(pending, await asyncio.gather(*[scrape_static(url) for url in pending])))
+
+                    fallback = [url for url in pending if articles[url] is None]
+                    if fallback:
+                        await self.ensure_pool(workers)
+                        articles.update(zip(fallback, await self.map_pages(fallback, self.scrape_article_async)))
+                    mark('extraction', self.source_name)
+
+                    for url in pending:
+                        try:
+                            await asyncio.to_thread(self.handle_scraped, url, articles[url], results)
+                            if articles[url] and checkpoint:
+                                checkpoint.complete_url(self.source_name, url)
+                        except Exception as e:
+                            count('article_errors', self.source_name)
+                            self.logger.error(f"Error processing article {url}: {str(e)}")
+                    mark('persistence', self.source_name)
+
+                    if checkpoint and pages is None:
+                        checkpoint.complete_page(self.source_name, page_num)
+
+                except Exception as e:
+                    self.logger.error(f"Error processing page {page_num}: {str(e)}")
+                    self.page_failed(page_num, crawl)
+                    complete = False
+                    break
+
+        finally:
+            await self.close_pool()
 
-        return results
\ No newline at end of file
+        if checkpoint and complete:
+            checkpoint.complete_source(self.source_name)
+        return results
@@ -1,38 +1,161 @@
+import atexit
+import json
 import logging
-from datetime import datetime
+import logging.handlers
 import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+class RateLimitFilter(logging.Filter):
+    """Let at most `burst` identical messages through per `interval` seconds.
+
+    The first message after a window with suppressed repeats reports how many
+    were dropped, so nothing disappears silently.
+    """
+
+    def __init__(self, burst: int = 5, interval: float = 60.0, max_keys: int = 10000):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_keys = max_keys
+        self._seen: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._seen.get(key)
+            if state is None or now - state[0] > self.interval:
+                if len(self._seen) >= self.max_keys:
+                    self._seen.clear()
+                suppressed = state[2] if state else 0
+                self._seen[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.getMessage()} (suppressed {suppressed} repeats)"
+                    record.args = None
+                return True
+
+            state[1] += 1
+            if state[1] <= self.burst:
+                return True
+            state[2] += 1
+            return False
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """Parse "scraper.metropolis_scraper=DEBUG,urllib3=WARNING" into a dict"""
+    levels = {}
+    for item in filter(None, spec.split(',')):
+        name, _, level = item.partition('=')
+        if level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def configure_logging(level: Optional[str] = None, log_dir: Optional[str] = None,
+                      log_file: str = 'scraper.log', json_format: Optional[bool] = None,
+                      max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                      rotate_when: Optional[str] = None,
+                      module_levels: Optional[Dict[str, str]] = None,
+                      console: bool = True):
+    """Configure logging for the whole process, once.
+
+    Records go through a QueueHandler so callers never block on disk; a
+    background QueueListener writes JSON lines to a rotating file (by size,
+    or by time when rotate_when is set, e.g. 'midnight') and text to stdout.
+    Defaults can be overridden with SCRAPER_LOG_LEVEL, SCRAPER_LOG_DIR,
+    SCRAPER_LOG_FORMAT (json|text), SCRAPER_LOG_ROTATE_WHEN and
+    SCRAPER_LOG_LEVELS.
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        level = (level or os.getenv('SCRAPER_LOG_LEVEL', 'INFO')).upper()
+        log_dir = log_dir or os.getenv('SCRAPER_LOG_DIR', os.path.join(os.getcwd(), 'logs'))
+        if json_format is None:
+            json_format = os.getenv('SCRAPER_LOG_FORMAT', 'json').lower() == 'json'
+        rotate_when = rotate_when or os.getenv('SCRAPER_LOG_ROTATE_WHEN')
+        os.makedirs(log_dir, exist_ok=True)
+
+        # File handler
+        path = os.path.join(log_dir, log_file)
+        if rotate_when:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                path, when=rotate_when, backupCount=backup_count, encoding='utf-8'
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+        file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+        handlers = [file_handler]
+
+        # Console handler
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+            handlers.append(console_handler)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter())
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        levels = _parse_levels(os.getenv('SCRAPER_LOG_LEVELS', ''))
+        levels.update(module_levels or {})
+        for name, module_level in levels.items():
+            logging.getLogger(name).setLevel(module_level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush queued records and stop the background listener"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
 
 def setup_logger():
-    """Set up logger with both file and console handlers."""
-    # Create logs directory if it doesn't exist
-    logs_dir = os.path.join(os.getcwd(), 'logs')
-    os.makedirs(logs_dir, exist_ok=True)
-    
-    # Create logger
-    logger = logging.getLogger('scraper')
-    logger.setLevel(logging.INFO)
-    
-    # File handler
-    file_handler = logging.FileHandler(
-        os.path.join(logs_dir, f"scraper_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-    )
-    file_handler.setLevel(logging.INFO)
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
-    # Create formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
+    """Set up logging for the scraper package and return its logger."""
+    configure_logging()
+    return logging.getLogger('scraper')
 
 def get_logger(name):
     """Get a logger instance."""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
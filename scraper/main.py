@@ -1,32 +1,55 @@
+import argparse
 import os
 import sys
-from dotenv import load_dotenv
-from supabase import create_client, Client
-from scrapers import scrape_all_sources
-from logger import setup_logger
-from datetime import datetime
+from supabase import Client
+from scraper.scrapers import scrape_all_sources
+from scraper.logger import setup_logger
+from scraper.ingest import BulkIngestor
+from scraper.pipeline import StreamingPipeline
+from scraper.images import ImageStage, create_image_pipeline
+from scraper.incremental import IncrementalCrawl
+from scraper.checkpoint import CrawlCheckpoint
+from scraper.db import get_supabase
+from scraper.metrics import write_metrics
+from scraper.profiling import start_profiling, stop_profiling
+
+INGEST_BATCH_SIZE = int(os.getenv("SCRAPER_INGEST_BATCH_SIZE", "100"))
+# Per-source limit; a source still running after this is stopped and reported
+SOURCE_TIMEOUT = float(os.getenv("SCRAPER_SOURCE_TIMEOUT", "1800"))
+# Articles parsed but not yet written; scrapers wait when this many are queued
+PIPELINE_MAX_PENDING = int(os.getenv("SCRAPER_PIPELINE_MAX_PENDING", "500"))
 
 def init_supabase() -> Client:
-    # Load environment variables
-    load_dotenv()
-    
-    # Use VITE_ prefixed variables if they exist, fall back to non-VITE versions
-    supabase_url = os.getenv("VITE_SUPABASE_URL") or os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("VITE_SUPABASE_ANON_KEY") or os.getenv("SUPABASE_SERVICE_KEY")
-    
-    if not supabase_url or not supabase_key:
-        raise EnvironmentError(
-            "Missing Supabase environment variables. "
-            "Please ensure either VITE_SUPABASE_URL and VITE_SUPABASE_ANON_KEY "
-            "or SUPABASE_URL and SUPABASE_SERVICE_KEY are set in your .env file"
-        )
-    
+    # The process-wide client, so the scrapers share its connections
     try:
-        return create_client(supabase_url, supabase_key)
+        return get_supabase()
+    except EnvironmentError:
+        raise
     except Exception as e:
         raise ConnectionError(f"Failed to initialize Supabase client: {str(e)}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Scrape all sources and ingest the results')
+    parser.add_argument('--full', action='store_true',
+                        help='Walk every page instead of stopping at already-ingested articles')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip sources the last interrupted run already scraped and ingested. '
+                             'Progress is kept per source; within a source, articles already stored '
+                             'are skipped through the URL frontier and the watermark')
+    parser.add_argument('--no-discovery', dest='discovery', action='store_false',
+                        help='Crawl archive pages even when the site has a sitemap or feed')
+    parser.add_argument('--metrics-dir', type=str, default=None,
+                        help='Write a JSON summary and Prometheus textfile of stage timings here (default: $SCRAPER_METRICS_DIR)')
+    parser.add_argument('--profile', type=str, default=None, metavar='DIR',
+                        help='Write a sampling CPU profile (collapsed stacks) and a tracemalloc report per stage to DIR')
+    parser.add_argument('--images', action='store_true',
+                        help='Store resized WebP variants of article images (needs Pillow)')
+    parser.add_argument('--image-dir', type=str, default=None,
+                        help='Write image variants to this directory instead of the Supabase article-images bucket')
+    args = parser.parse_args()
+    if args.profile:
+        start_profiling(args.profile, 'main')
+
     logger = setup_logger()
     
     try:
@@ -43,69 +66,68 @@ def main():
             raise ConnectionError(f"Supabase connection test failed: {str(e)}")
         
         # Start scraping
-        results = scrape_all_sources()
-        logger.info(f"Scraping completed. Found {len(results)} articles")
+        # Paginated sources stop at the first page with nothing new. Leibal
+        # and Metropolis read one listing page, so their crawls only carry
+        # the sources.last_scraped_at stamp, made once a source is written
+        crawls = {
+            name: IncrementalCrawl(supabase, name, full=args.full)
+            for name in ('Dezeen', 'Leibal', 'Metropolis')
+        }
+        checkpoint = CrawlCheckpoint.open(CrawlCheckpoint.default_path('main'), resume=args.resume)
         
-        # Process results
-        for result in results:
+        # Stream articles to the database while the scrapers are still
+        # fetching; a source counts as done in the checkpoint only once
+        # everything it produced has been written
+        ingestor = BulkIngestor(supabase, batch_size=INGEST_BATCH_SIZE)
+        pipeline = StreamingPipeline(
+            ingestor.ingest_batch,
+            batch_size=INGEST_BATCH_SIZE,
+            max_pending=PIPELINE_MAX_PENDING
+        )
+        
+        # Optional stage between the scrapers and persistence: articles wait
+        # for their images to be resized and stored before they are queued
+        images = create_image_pipeline(supabase, args.image_dir) if args.images else None
+        stage = ImageStage(images, pipeline.put) if images else None
+        
+        def flush_source(source, _results):
+            if stage:
+                stage.drain()
+            if not pipeline.flush():
+                raise RuntimeError(f"Some articles could not be written, leaving {source} open")
+            # Keeps the watermark when the crawl missed pages
+            crawls[source].commit()
+        
+        with pipeline:
             try:
-                # Get source ID
-                source_response = supabase.table("sources").select("*").eq("name", result["source"]).execute()
-                
-                if not source_response.data or len(source_response.data) == 0:
-                    logger.error(f"Source not found: {result['source']}")
-                    continue
-                
-                source_id = source_response.data[0]['id']
-                
-                # Prepare article data
-                article_data = {
-                    "source_id": source_id,
-                    "title": result["title"],
-                    "url": result["url"],
-                    "image_url": result["image_url"],
-                    "author": result["author"],
-                    "published_at": result["published_at"],
-                    "original_content": result["content"],
-                    "is_processed": False,
-                    "is_subscriber_only": False,
-                    "category": result.get("category", "Architecture")
-                }
-                
-                # Check if article exists
-                existing_article = supabase.table("articles") \
-                    .select("*") \
-                    .eq("url", result["url"]) \
-                    .execute()
-                
-                if existing_article.data and len(existing_article.data) > 0:
-                    # Update existing article if content has changed
-                    existing = existing_article.data[0]
-                    if existing["original_content"] != result["content"]:
-                        logger.info(f"Updating article with new content: {result['title']}")
-                        supabase.table("articles") \
-                            .update(article_data) \
-                            .eq("id", existing["id"]) \
-                            .execute()
-                    else:
-                        logger.info(f"Article exists with same content: {result['title']}")
-                else:
-                    # Insert new article
-                    logger.info(f"Inserting new article: {result['title']}")
-                    supabase.table("articles").insert(article_data).execute()
-                
-                # Update source last_scraped_at
-                supabase.table("sources").update({
-                    "last_scraped_at": datetime.utcnow().isoformat()
-                }).eq("id", source_id).execute()
-                
-            except Exception as e:
-                logger.error(f"Error processing article: {str(e)}")
-                continue
+                scrape_all_sources(
+                    crawls,
+                    checkpoint=checkpoint,
+                    discovery=args.discovery,
+                    timeout=SOURCE_TIMEOUT,
+                    on_results=flush_source,
+                    sink=stage.put if stage else pipeline.put
+                )
+            finally:
+                if stage:
+                    stage.close()
+        logger.info(f"Scraping completed. Found {pipeline.stats['received']} articles")
+        
+        stats = ingestor.stats
+        logger.info(
+            f"Ingest completed. Inserted {stats['inserted']}, updated {stats['updated']}, "
+            f"unchanged {stats['unchanged']}, skipped {stats['skipped']}, "
+            f"failed {stats['failed'] + pipeline.stats['failed']}"
+        )
+        if all(checkpoint.is_done(name) for name in crawls):
+            checkpoint.clear()
     
     except Exception as e:
         logger.critical(f"Fatal error: {str(e)}")
         sys.exit(1)
+    finally:
+        write_metrics(args.metrics_dir, 'main')
+        stop_profiling()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,283 @@
+import contextvars
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stages every scrape run reports, in pipeline order
+STAGES = ('rate_limit_wait', 'discovery_fetch', 'article_fetch', 'browser_navigation', 'parse',
+          'extraction', 'image_fetch', 'image_processing', 'db_write')
+
+# Histogram bucket upper bounds in seconds, Prometheus style
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 0.75,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+UNKNOWN_SOURCE = 'unknown'
+
+_current_source: contextvars.ContextVar = contextvars.ContextVar('scraper_source', default=UNKNOWN_SOURCE)
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed buckets"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: Dict[str, Any]):
+        for i, value in enumerate(other['counts']):
+            self.counts[i] += value
+        self.count += other['count']
+        self.sum += other['sum']
+        self.max = max(self.max, other['max'])
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if bucket_count and seen + bucket_count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+            lower = upper
+        return self.max
+
+    def state(self) -> Dict[str, Any]:
+        return {'counts': list(self.counts), 'count': self.count, 'sum': self.sum, 'max': self.max}
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'total_s': round(self.sum, 6),
+            'mean_s': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50_s': round(self.quantile(0.5), 6),
+            'p90_s': round(self.quantile(0.9), 6),
+            'p99_s': round(self.quantile(0.99), 6),
+            'max_s': round(self.max, 6),
+        }
+
+
+class Metrics:
+    """Process-wide counters and per-stage latency histograms, split by source.
+
+    The source label comes from the explicit argument, else from the
+    `source()` context the caller runs in, so shared helpers such as
+    parse_html are attributed to whichever scraper called them.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, source: Optional[str] = None):
+        key = (stage, source or _current_source.get())
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, event: str, source: Optional[str] = None, value: float = 1):
+        key = (event, source or _current_source.get())
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def timed(self, stage: str, source: Optional[str] = None) -> Iterator[None]:
+        """Time the block as one observation of `stage`, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, source)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Raw state that another process can merge into its own registry"""
+        with self._lock:
+            return {
+                'histograms': {key: histogram.state() for key, histogram in self.histograms.items()},
+                'counters': dict(self.counters),
+            }
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Fold in a snapshot from a source process"""
+        with self._lock:
+            for key, state in snapshot['histograms'].items():
+                self.histograms.setdefault(tuple(key), Histogram()).merge(state)
+            for key, value in snapshot['counters'].items():
+                key = tuple(key)
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-ready run summary: stages and counters grouped by source"""
+        with self._lock:
+            histograms = sorted(self.histograms.items(), key=lambda item: (_stage_order(item[0][0]), item[0]))
+            counters = sorted(self.counters.items())
+        sources: Dict[str, Dict[str, Any]] = {}
+        for (stage, source), histogram in histograms:
+            sources.setdefault(source, {'stages': {}, 'counters': {}})['stages'][stage] = histogram.summary()
+        for (event, source), value in counters:
+            sources.setdefault(source, {'stages': {}, 'counters': {}})['counters'][event] = value
+        duration = time.time() - self.started
+        for source in sources.values():
+            articles = source['counters'].get('articles', 0)
+            source['articles_per_second'] = round(articles / duration, 3) if duration else 0.0
+        return {
+            'started_at': self.started,
+            'duration_s': round(duration, 3),
+            'sources': sources,
+        }
+
+    def prometheus(self, prefix: str = 'scraper') -> str:
+        """Render the registry in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        lines: List[str] = [
+            f"# HELP {prefix}_stage_duration_seconds Time spent in each scrape stage",
+            f"# TYPE {prefix}_stage_duration_seconds histogram",
+        ]
+        for (stage, source), histogram in histograms:
+            labels = f'stage="{_escape(stage)}",source="{_escape(source)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{prefix}_stage_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_duration_seconds_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{prefix}_stage_duration_seconds_count{{{labels}}} {histogram.count}')
+
+        lines += [
+            f"# HELP {prefix}_events_total Events counted during the run",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        for (event, source), value in counters:
+            lines.append(f'{prefix}_events_total{{event="{_escape(event)}",source="{_escape(source)}"}} {value}')
+
+        lines += [
+            f"# HELP {prefix}_run_duration_seconds Wall time of the last run",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {time.time() - self.started}",
+            f"# HELP {prefix}_run_timestamp_seconds When the last run finished",
+            f"# TYPE {prefix}_run_timestamp_seconds gauge",
+            f"{prefix}_run_timestamp_seconds {time.time()}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, directory: str, name: str) -> Tuple[str, str]:
+        """Write `<name>.json` and `<name>.prom` to `directory`, returning both paths.
+
+        Files are replaced atomically, so a node_exporter textfile collector
+        never reads a partial file.
+        """
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{name}.json")
+        prom_path = os.path.join(directory, f"{name}.prom")
+        _write_atomic(json_path, json.dumps(self.summary(), indent=2))
+        _write_atomic(prom_path, self.prometheus())
+        logger.info(f"Wrote run metrics to {json_path} and {prom_path}")
+        return json_path, prom_path
+
+    def log_summary(self):
+        """Log total time and p50/p99 per stage and source"""
+        for source, data in self.summary()['sources'].items():
+            for stage, stats in data['stages'].items():
+                logger.info(
+                    f"{source} {stage}: {stats['count']} calls, {stats['total_s']:.1f}s total, "
+                    f"p50 {stats['p50_s'] * 1000:.0f}ms, p99 {stats['p99_s'] * 1000:.0f}ms"
+                )
+
+
+def _stage_order(stage: str) -> int:
+    return STAGES.index(stage) if stage in STAGES else len(STAGES)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _write_atomic(path: str, text: str):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.metrics-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Get the process-wide metrics registry"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+    return _metrics
+
+
+def timed(stage: str, source: Optional[str] = None):
+    """Shortcut for get_metrics().timed(stage, source)"""
+    return get_metrics().timed(stage, source)
+
+
+def count(event: str, source: Optional[str] = None, value: float = 1):
+    """Shortcut for get_metrics().count(event, source, value)"""
+    get_metrics().count(event, source, value)
+
+
+@contextmanager
+def source(name: str) -> Iterator[None]:
+    """Attribute metrics recorded in this thread or task to `name`"""
+    token = _current_source.set(name)
+    try:
+        yield
+    finally:
+        _current_source.reset(token)
+
+
+def write_metrics(directory: Optional[str], name: str):
+    """Log the run's stage timings and write them to `directory` (or SCRAPER_METRICS_DIR), if set"""
+    metrics = get_metrics()
+    metrics.log_summary()
+    directory = directory or os.getenv('SCRAPER_METRICS_DIR')
+    if not directory:
+        return
+    try:
+        metrics.write(directory, name)
+    except OSError as e:
+        logger.error(f"Error writing metrics to {directory}: {str(e)}")
@@ -1,49 +1,56 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from supabase import Client
 from scraper.base_scraper import BaseScraper, ScrapedArticle, ContentBlock
 import logging
-from playwright.sync_api import TimeoutError as PlaywrightTimeout
-from bs4 import BeautifulSoup
+from scraper.scrapers.rate_limit import get_rate_limiter
+from scraper.parsing import parse_html
+from scraper.debug_capture import DebugCapture
+from scraper.incremental import IncrementalCrawl
+from scraper.frontier import canonicalize_url
+from scraper.checkpoint import CrawlCheckpoint
+from scraper.metrics import count, timed
+from scraper.images import ImagePipeline
+from scraper.profiling import mark
 import time
 
 class MetropolisScraper(BaseScraper):
-    def __init__(self, source_id: str):
-        super().__init__('https://metropolismag.com/projects/', source_id)
+    source_name = 'Metropolis'
+
+    def __init__(self, source_id: str, debug_capture: Optional[DebugCapture] = None,
+                 base_url: str = 'https://metropolismag.com/projects/',
+                 images: Optional[ImagePipeline] = None, supabase: Optional[Client] = None):
+        super().__init__(base_url, source_id, debug_capture=debug_capture, images=images, supabase=supabase)
         self.logger = logging.getLogger(__name__)
 
-    def get_article_urls(self, page: int = 1) -> List[Dict[str, str]]:
-        """Get all article URLs and titles from a page"""
+    def get_article_urls(self, page: int = 1) -> Optional[List[Dict[str, str]]]:
+        """Get all article URLs and titles from a page, or None if it could not be fetched"""
         try:
             # Navigate to the projects page
             url = f"{self.base_url}page/{page}/" if page > 1 else self.base_url
             self.logger.info(f"Navigating to: {url}")
             
             # Navigate and wait for content
-            response = self.page.goto(url)
+            get_rate_limiter().acquire(url)
+            with timed('browser_navigation', self.source_name):
+                response = self.page.goto(url)
             if not response.ok:
                 raise ValueError(f"Failed to load page: {response.status}")
                 
             # Give page time to load dynamic content
             time.sleep(5)
             
-            # Save a screenshot for debugging
-            self.page.screenshot(path='page_debug.png')
-            
             # Get all content
             content = self.page.content()
             self.logger.info("Got page content, length: %d", len(content))
             
-            # Save HTML for debugging
-            with open('page_debug.html', 'w', encoding='utf-8') as f:
-                f.write(content)
-            
             # Parse with BeautifulSoup
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = parse_html(content)
             
-            # Log the overall structure
-            self.logger.info("Page structure:")
-            for tag in soup.find_all(['header', 'main', 'article', 'div'], class_=True):
-                self.logger.info(f"Found element: <{tag.name} class='{tag.get('class', [])}'>")
+            # Log the overall structure only when debugging
+            if self.logger.isEnabledFor(logging.DEBUG):
+                for tag in soup.find_all(['header', 'main', 'article', 'div'], class_=True):
+                    self.logger.debug(f"Found element: <{tag.name} class='{tag.get('class', [])}'>")
             
             # Find all article links using different approaches
             articles = []
@@ -72,13 +79,13 @@ class MetropolisScraper(BaseScraper):
                         
                     self.logger.info(f"Found article: {title} at {href}")
                     
-                    if href not in seen_urls:
+                    if canonicalize_url(href, url) not in seen_urls:
                         articles.append({
                             'url': href,
                             'title': title,
                             'html': str(post)
                         })
-                        seen_urls.add(href)
+                        seen_urls.add(canonicalize_url(href, url))
                         
                 except Exception as e:
                     self.logger.error(f"Error processing post element: {str(e)}")
@@ -93,7 +100,7 @@ class MetropolisScraper(BaseScraper):
                 for link in links:
                     try:
                         href = link.get('href')
-                        if not href or href in seen_urls:
+                        if not href or canonicalize_url(href, url) in seen_urls:
                             continue
                             
                         # Only process links that look like articles
@@ -117,7 +124,7 @@ class MetropolisScraper(BaseScraper):
                             'title': title,
                             'html': html
                         })
-                        seen_urls.add(href)
+                        seen_urls.add(canonicalize_url(href, url))
                         
                     except Exception as e:
                         self.logger.error(f"Error processing link: {str(e)}")
@@ -125,7 +132,11 @@ class MetropolisScraper(BaseScraper):
             
             self.logger.info(f"Found {len(articles)} unique articles")
             for article in articles:
-                self.logger.info(f"Final article: {article['title']} at {article['url']}")
+                self.logger.debug(f"Final article: {article['title']} at {article['url']}")
+            
+            # Sampled or on-failure debug capture, written off the critical path
+            if self.debug.should_capture(failed=not articles):
+                self.debug.capture(f"page_{page}", content, self.capture_screenshot())
                 
             return articles
 
@@ -133,7 +144,9 @@ class MetropolisScraper(BaseScraper):
             self.logger.error(f"Error fetching article list: {str(e)}")
             import traceback
             self.logger.error(traceback.format_exc())
-            return []
+            if self.page and self.debug.should_capture(failed=True):
+                self.debug.capture(f"page_{page}_error", self.page.content(), self.capture_screenshot())
+            return None
 
     def scrape_article(self, article_info: Dict[str, str]) -> Optional[ScrapedArticle]:
         """Extract article content from stored HTML"""
@@ -141,7 +154,7 @@ class MetropolisScraper(BaseScraper):
             self.logger.info(f"Processing article: {article_info['title']}")
             
             # Parse the stored HTML
-            soup = BeautifulSoup(article_info['html'], 'html.parser')
+            soup = parse_html(article_info['html'])
             
             # Extract basic content
             main_content = soup.get_text(strip=True)
@@ -210,42 +223,80 @@ class MetropolisScraper(BaseScraper):
             self.logger.error(f"Error processing article {article_info['title']}: {str(e)}")
             return None
 
-    def scrape_category(self, max_pages: int = 5) -> List[Dict[str, Any]]:
-        """Scrape articles from Metropolis Magazine"""
+    def scrape_category(self, max_pages: int = 5,
+                        crawl: Optional[IncrementalCrawl] = None,
+                        checkpoint: Optional[CrawlCheckpoint] = None) -> List[Dict[str, Any]]:
+        """Scrape articles from Metropolis Magazine.
+
+        Stops early at known pages when `crawl` is set, and records progress
+        to (and resumes from) `checkpoint` when one is given.
+        """
         results = []
+        if checkpoint and checkpoint.is_done(self.source_name):
+            self.logger.info(f"{self.source_name} already completed in the checkpointed run")
+            return results
         
-        for page in range(1, max_pages + 1):
+        complete = True
+        for page in range(checkpoint.next_page(self.source_name) if checkpoint else 1, max_pages + 1):
             try:
                 articles = self.get_article_urls(page)
+                if articles is None:
+                    self.page_failed(page, crawl)
+                    complete = False
+                    break
                 self.logger.info(f"Found {len(articles)} articles on page {page}")
 
+                # One freshness query for the whole page
+                try:
+                    self.load_freshness([article['url'] for article in articles])
+                except Exception as e:
+                    self.logger.error(f"Error checking freshness for page {page}: {str(e)}")
+
+                urls = self.incremental_urls([article['url'] for article in articles], crawl)
+                if urls is None:
+                    break
+                wanted = set(self.resume_urls(checkpoint, page, self.unfetched_urls(urls)))
+                articles = [article for article in articles if article['url'] in wanted]
+                mark('discovery', self.source_name)
+
                 for article in articles:
                     try:
-                        # Check if article already exists and needs updating
-                        existing = self.supabase.table('articles')\
-                            .select('id, last_scraped_at')\
-                            .eq('url', article['url'])\
-                            .single()\
-                            .execute()
-
-                        if existing.data:
-                            last_scraped = datetime.fromisoformat(existing.data['last_scraped_at'].replace('Z', '+00:00'))
-                            if (datetime.now() - last_scraped).days < 7:
-                                self.logger.info(f"Skipping recently scraped article: {article['title']}")
-                                continue
-
-                        scraped = self.scrape_article(article)
+                        if self.is_recently_scraped(article['url']):
+                            self.logger.info(f"Skipping recently scraped article: {article['title']}")
+                            continue
+
+                        with timed('extraction', self.source_name):
+                            scraped = self.scrape_article(article)
                         if scraped:
+                            count('articles', self.source_name)
+                        if scraped and self.is_unchanged(scraped):
+                            self.mark_scraped(article['url'])
+                            self.logger.info(f"Skipping unchanged article: {article['title']}")
+                        elif scraped:
                             result = self.save_article(scraped)
                             results.append(result)
+                            self.mark_scraped(article['url'])
                             self.logger.info(f"Successfully scraped and saved: {article['title']}")
 
+                        if scraped and checkpoint:
+                            checkpoint.complete_url(self.source_name, article['url'])
+
                     except Exception as e:
+                        count('article_errors', self.source_name)
                         self.logger.error(f"Error processing article {article['title']}: {str(e)}")
                         continue
+                # Articles are saved as they are scraped, so this closes both stages
+                mark('persistence', self.source_name)
+
+                if checkpoint:
+                    checkpoint.complete_page(self.source_name, page)
 
             except Exception as e:
                 self.logger.error(f"Error processing page {page}: {str(e)}")
-                continue
+                self.page_failed(page, crawl)
+                complete = False
+                break
 
+        if checkpoint and complete:
+            checkpoint.complete_source(self.source_name)
         return results
\ No newline at end of file
@@ -0,0 +1,250 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from scraper.metrics import get_metrics, source
+from scraper.profiling import profile_process, stop_profiling
+
+logger = logging.getLogger(__name__)
+
+THREAD = 'thread'
+PROCESS = 'process'
+
+
+@dataclass
+class SourceJob:
+    """One source to scrape.
+
+    I/O-bound sources run in a thread; browser-bound ones run in their own
+    process, so a hung or crashed Chromium only takes its own source down
+    and can be terminated on timeout. Process targets must be importable
+    module-level functions. Targets return a list of articles, or yield
+    them when the orchestrator streams to a sink.
+    """
+    name: str
+    target: Callable[..., List[Dict[str, Any]]]
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    mode: str = THREAD
+    timeout: Optional[float] = None
+
+
+@dataclass
+class SourceResult:
+    name: str
+    status: str  # 'ok', 'error' or 'timeout'
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    duration: float = 0.0
+    error: Optional[str] = None
+    # Articles produced; equals len(results) unless they were streamed to a sink
+    count: int = 0
+
+
+def _process_main(name: str, target: Callable, kwargs: Dict[str, Any], conn, stream: bool):
+    """Entry point of a source process: run the scraper and send back its results"""
+    from scraper.logger import configure_logging
+
+    configure_logging(log_file=f"scraper_{name.lower()}.log")
+    # Profiles itself when the parent run is being profiled
+    profile_process(name)
+    try:
+        with source(name):
+            if stream:
+                count = 0
+                for item in target(**kwargs):
+                    conn.send(('item', item))
+                    count += 1
+                outcome = ('ok', count)
+            else:
+                outcome = ('ok', list(target(**kwargs)))
+    except BaseException as e:
+        outcome = ('error', f"{type(e).__name__}: {str(e)}")
+    stop_profiling()
+    try:
+        # The parent folds this process's stage timings into its own registry
+        conn.send(('metrics', get_metrics().snapshot()))
+        conn.send(outcome)
+    finally:
+        conn.close()
+
+
+class _Running:
+    """A started job and the future that receives its outcome"""
+
+    def __init__(self, job: SourceJob, default_timeout: Optional[float],
+                 sink: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.job = job
+        self.sink = sink
+        self.count = 0
+        self.future: Future = Future()
+        self.started = time.monotonic()
+        timeout = job.timeout if job.timeout is not None else default_timeout
+        self.deadline = self.started + timeout if timeout else None
+        self.process = None
+
+    def start(self, context):
+        if self.job.mode == PROCESS:
+            receiver, sender = context.Pipe(duplex=False)
+            self.process = context.Process(
+                target=_process_main,
+                args=(self.job.name, self.job.target, self.job.kwargs, sender, self.sink is not None),
+                name=f"scrape-{self.job.name}",
+                daemon=True
+            )
+            self.process.start()
+            sender.close()
+            target = self._await_process
+            args = (receiver,)
+        else:
+            target = self._run_inline
+            args = ()
+        threading.Thread(target=target, args=args, name=f"scrape-{self.job.name}", daemon=True).start()
+
+    def _emit(self, item: Dict[str, Any]):
+        # The sink may block on a full queue, which in turn pauses the producer
+        self.sink(self.job.name, item)
+        self.count += 1
+
+    def _run_inline(self):
+        try:
+            with source(self.job.name):
+                outcome = self._produce()
+        except BaseException as e:
+            outcome = ('error', f"{type(e).__name__}: {str(e)}")
+        if not self.future.done():
+            self.future.set_result(outcome)
+
+    def _produce(self):
+        if self.sink is not None:
+            for item in self.job.target(**self.job.kwargs):
+                if self.future.done():
+                    break  # Timed out; stop producing
+                self._emit(item)
+            return ('ok', self.count)
+        return ('ok', list(self.job.target(**self.job.kwargs)))
+
+    def _await_process(self, receiver):
+        # Read before joining: a large result would otherwise fill the pipe and block the child
+        outcome = None
+        try:
+            while outcome is None:
+                kind, payload = receiver.recv()
+                if kind == 'item':
+                    self._emit(payload)
+                elif kind == 'metrics':
+                    get_metrics().merge(payload)
+                else:
+                    outcome = (kind, payload)
+        except (EOFError, OSError):
+            pass
+        finally:
+            receiver.close()
+        self.process.join()
+        if outcome is None:
+            outcome = ('error', f"process exited with code {self.process.exitcode}")
+        if not self.future.done():
+            self.future.set_result(outcome)
+
+    def stop(self):
+        """Terminate a process job; a thread job is left to finish in the background"""
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(5)
+            if self.process.is_alive():
+                self.process.kill()
+
+
+class Orchestrator:
+    """Run several sources at once so a run takes as long as its slowest source.
+
+    Each source is isolated: an exception, crash or timeout in one is
+    recorded in its SourceResult and the others carry on.
+    """
+
+    def __init__(self, default_timeout: Optional[float] = None, start_method: str = 'spawn'):
+        self.default_timeout = default_timeout
+        # Spawned children never inherit the parent's threads or browser handles
+        self.context = multiprocessing.get_context(start_method)
+
+    def run(self, jobs: List[SourceJob],
+            on_result: Optional[Callable[[SourceResult], None]] = None,
+            sink: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> List[SourceResult]:
+        """Run all jobs concurrently; `on_result` is called as each one finishes.
+
+        With a `sink`, targets are iterated and every article is passed to
+        `sink(source, article)` as soon as it is produced instead of being
+        collected into SourceResult.results.
+        """
+        running = [_Running(job, self.default_timeout, sink) for job in jobs]
+        for job in running:
+            logger.info(f"Starting {job.job.name} in a {job.job.mode}")
+            job.start(self.context)
+
+        outcomes: Dict[str, SourceResult] = {}
+        pending = {job.future: job for job in running}
+        while pending:
+            deadlines = [job.deadline for job in pending.values() if job.deadline]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            now = time.monotonic()
+            for future in done:
+                job = pending.pop(future)
+                status, payload = future.result()
+                results = payload if status == 'ok' and sink is None else []
+                outcomes[job.job.name] = self._report(SourceResult(
+                    name=job.job.name,
+                    status=status,
+                    results=results,
+                    duration=now - job.started,
+                    error=None if status == 'ok' else payload,
+                    count=len(results) if sink is None else job.count
+                ), on_result)
+            for future, job in list(pending.items()):
+                if job.deadline and now >= job.deadline:
+                    pending.pop(future)
+                    job.stop()
+                    job.future.set_result(('timeout', None))
+                    outcomes[job.job.name] = self._report(SourceResult(
+                        name=job.job.name,
+                        status='timeout',
+                        duration=now - job.started,
+                        error=f"timed out after {now - job.started:.0f}s",
+                        count=job.count
+                    ), on_result)
+
+        results = [outcomes[job.name] for job in jobs]
+        log_summary(results)
+        return results
+
+    def _report(self, result: SourceResult,
+                on_result: Optional[Callable[[SourceResult], None]]) -> SourceResult:
+        if result.status == 'ok':
+            logger.info(f"{result.name} finished in {result.duration:.1f}s with {result.count} articles")
+        else:
+            logger.error(f"{result.name} failed ({result.status}) after {result.duration:.1f}s: {result.error}")
+        if on_result:
+            try:
+                on_result(result)
+            except Exception as e:
+                logger.error(f"Error handling results from {result.name}: {str(e)}")
+        return result
+
+
+def log_summary(results: List[SourceResult]):
+    """Log one line per source and the combined totals"""
+    for result in results:
+        error = f"  {result.error}" if result.error else ""
+        logger.info(
+            f"  {result.name:<12} {result.status:<8} {result.count:>5} articles "
+            f"{result.duration:>7.1f}s{error}"
+        )
+    total = sum(result.count for result in results)
+    failed = ", ".join(result.name for result in results if result.status != 'ok')
+    wall = max((result.duration for result in results), default=0.0)
+    logger.info(
+        f"Scraped {total} articles from {len(results)} sources in {wall:.1f}s"
+        + (f", failed: {failed}" if failed else "")
+    )
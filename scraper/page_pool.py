@@ -0,0 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+from playwright.async_api import BrowserContext, Page
+
+
+class PagePool:
+    """A fixed set of pages from one browser context, handed out to async workers"""
+
+    def __init__(self, context: BrowserContext, size: int, timeout: int = 60000):
+        self.context = context
+        self.size = size
+        self.timeout = timeout
+        self.pages: List[Page] = []
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def _new_page(self) -> Page:
+        page = await self.context.new_page()
+        page.set_default_timeout(self.timeout)
+        page.set_default_navigation_timeout(self.timeout)
+        self.pages.append(page)
+        return page
+
+    async def start(self):
+        """Open all pages up front so workers never pay for page creation"""
+        for page in await asyncio.gather(*[self._new_page() for _ in range(self.size)]):
+            self._queue.put_nowait(page)
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page, waiting until one is free; crashed pages are replaced on return"""
+        page = await self._queue.get()
+        try:
+            yield page
+        finally:
+            if page.is_closed():
+                self.pages.remove(page)
+                page = await self._new_page()
+            self._queue.put_nowait(page)
+
+    async def close(self):
+        for page in self.pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self.pages.clear()
@@ -0,0 +1,49 @@
+import logging
+import os
+import threading
+from typing import Optional
+from bs4 import BeautifulSoup, FeatureNotFound
+from scraper.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoup tree builders, fastest first
+PARSER_BACKENDS = ('lxml', 'html.parser', 'html5lib')
+
+_backend: Optional[str] = None
+_backend_lock = threading.Lock()
+
+
+def _resolve_backend(name: str) -> str:
+    """Fall back to the stdlib parser when the requested builder is not installed"""
+    try:
+        BeautifulSoup('', name)
+        return name
+    except FeatureNotFound:
+        logger.warning(f"HTML parser backend '{name}' is not installed, using html.parser")
+        return 'html.parser'
+
+
+def get_backend() -> str:
+    """Get the parser backend for this deployment (SCRAPER_HTML_PARSER, default lxml)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _resolve_backend(os.getenv('SCRAPER_HTML_PARSER', 'lxml'))
+    return _backend
+
+
+def set_backend(name: str):
+    """Override the parser backend, e.g. from a benchmark or a test"""
+    global _backend
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {name}")
+    with _backend_lock:
+        _backend = _resolve_backend(name)
+
+
+def parse_html(markup, backend: Optional[str] = None) -> BeautifulSoup:
+    """Parse HTML with the configured backend; every scraper goes through here"""
+    with timed('parse'):
+        return BeautifulSoup(markup, backend or get_backend())
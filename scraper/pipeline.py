@@ -0,0 +1,115 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from scraper.profiling import mark
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PENDING = 500
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+_CLOSE = object()
+
+
+class StreamingPipeline:
+    """Feeds articles from running scrapers to a persistence consumer thread.
+
+    Producers `put` articles as they are parsed; a single consumer groups
+    them into batches and hands each to `write_batch` (usually
+    BulkIngestor.ingest_batch) while scraping continues. The queue is
+    bounded, so a slow database pauses the scrapers instead of letting
+    results pile up in memory. A partial batch is written once it has
+    waited `flush_interval` seconds, so articles land promptly even when
+    sources produce slowly.
+    """
+
+    def __init__(self, write_batch: Callable[[List[Dict[str, Any]]], Any], batch_size: int = 100,
+                 max_pending: int = DEFAULT_MAX_PENDING, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.stats = {"received": 0, "written": 0, "failed": 0, "batches": 0}
+        self.counts: Dict[str, int] = {}
+        self._consumer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self):
+        if self._consumer is None:
+            self._consumer = threading.Thread(target=self._consume, name="persistence", daemon=True)
+            self._consumer.start()
+
+    def put(self, source: str, article: Dict[str, Any]):
+        """Queue an article for writing, blocking while the queue is full"""
+        with self._lock:
+            self.stats["received"] += 1
+            self.counts[source] = self.counts.get(source, 0) + 1
+        self.queue.put(article)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every article queued so far has been written.
+
+        Returns False if any write has failed so far in the run.
+        """
+        done = threading.Event()
+        self.queue.put(done)
+        if not done.wait(timeout):
+            raise TimeoutError(f"Pipeline did not flush within {timeout}s")
+        return self.stats["failed"] == 0
+
+    def close(self):
+        """Write everything still queued and stop the consumer"""
+        if self._consumer is None:
+            return
+        self.queue.put(_CLOSE)
+        self._consumer.join()
+        self._consumer = None
+        logger.info(
+            f"Pipeline wrote {self.stats['written']} of {self.stats['received']} articles "
+            f"in {self.stats['batches']} batches ({self.stats['failed']} failed)"
+        )
+
+    def _consume(self):
+        batch: List[Dict[str, Any]] = []
+        deadline = None
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if deadline else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            marker = item is None or item is _CLOSE or isinstance(item, threading.Event)
+            if not marker:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+
+            if batch and (marker or len(batch) >= self.batch_size):
+                self._write(batch)
+                batch = []
+                deadline = None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _CLOSE:
+                return
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            self.write_batch(batch)
+            self.stats["written"] += len(batch)
+            mark("persistence")
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            logger.error(f"Error writing batch of {len(batch)} articles: {str(e)}")
+        self.stats["batches"] += 1
@@ -0,0 +1,335 @@
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.01
+DEFAULT_FRAMES = 10
+# Share of run time memory snapshots may take before boundaries are skipped
+DEFAULT_MARK_OVERHEAD = 0.1
+MAX_STACK_DEPTH = 128
+
+# Where allocations come from, by the first matching frame of their traceback
+ALLOCATION_CATEGORIES = (
+    ('bs4_tree', ('/bs4/',)),
+    ('html_text', ('/requests/', '/httpx/', '/aiohttp/', '/playwright/', '/urllib3/')),
+    ('response_cache', ('/scraper/scrapers/cache.py',)),
+    ('lxml', ('/lxml/',)),
+)
+
+
+@dataclass
+class MemoryMark:
+    """Summary of one tracemalloc snapshot taken at a stage boundary"""
+    stage: str
+    source: str
+    elapsed: float
+    traced: int
+    peak: int
+    categories: Dict[str, int]
+    soups: int
+    tags: int
+    top: List[Tuple[str, int, int]] = field(default_factory=list)
+    tracebacks: List[Tuple[tuple, Tuple[int, int]]] = field(default_factory=list)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _running_threads() -> Optional[set]:
+    """Native IDs of threads currently on a CPU, from /proc; None where unavailable"""
+    try:
+        running = set()
+        for task in os.listdir('/proc/self/task'):
+            with open(f'/proc/self/task/{task}/stat', 'rb') as f:
+                # The state follows the parenthesised command name
+                if f.read().rsplit(b')', 1)[1].split()[0] == b'R':
+                    running.add(int(task))
+        return running
+    except OSError:
+        return None
+
+
+def _file_category(filename: str) -> Optional[str]:
+    filename = filename.replace(os.sep, '/')
+    for category, patterns in ALLOCATION_CATEGORIES:
+        if any(pattern in filename for pattern in patterns):
+            return category
+    return None
+
+
+def _summarize(snapshot) -> Tuple[Dict[str, int], Dict, Dict]:
+    """Bytes per category, and (bytes, blocks) per allocation site and per traceback.
+
+    Allocations made by the profiler itself are left out.
+    """
+    grouped: Dict[tuple, List[int]] = {}
+    for stat in snapshot.statistics('traceback'):
+        # Tracebacks iterate oldest call first; sites want the most recent
+        frames = tuple((frame.filename, frame.lineno) for frame in reversed(stat.traceback))
+        grouped[frames] = [stat.size, stat.count]
+
+    categories: Counter = Counter()
+    sites: Dict[Tuple[str, int], List[int]] = {}
+    tracebacks: Dict[tuple, List[int]] = {}
+    # Few distinct files, so categorize each once
+    files: Dict[str, Optional[str]] = {}
+    for frames, entry in grouped.items():
+        if any(filename == __file__ for filename, _lineno in frames):
+            continue
+        category = 'other'
+        for filename, _lineno in frames:
+            if filename not in files:
+                files[filename] = _file_category(filename)
+            if files[filename]:
+                category = files[filename]
+                break
+        categories[category] += entry[0]
+        tracebacks[frames] = entry
+        # Frames are stored most recent first
+        site = sites.setdefault(frames[0], [0, 0])
+        site[0] += entry[0]
+        site[1] += entry[1]
+    return dict(categories), sites, tracebacks
+
+
+def _largest(stats: Dict, limit: int) -> List:
+    return sorted(stats.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+
+
+def _live_soup_objects() -> Tuple[int, int]:
+    """Count BeautifulSoup documents and tags still reachable"""
+    try:
+        from bs4 import BeautifulSoup, Tag
+    except ImportError:
+        return 0, 0
+    soups = tags = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, BeautifulSoup):
+            soups += 1
+        elif isinstance(obj, Tag):
+            tags += 1
+    return soups, tags
+
+
+class Profiler:
+    """Sampling CPU profiler plus tracemalloc snapshots at stage boundaries.
+
+    A background thread samples every thread's Python stack each `interval`
+    seconds. All samples go to `<name>.wall.folded`; on Linux, samples of
+    threads that were on a CPU also go to `<name>.cpu.folded`. Both are
+    collapsed stacks that flamegraph.pl, inferno or speedscope read directly.
+    Scrapers call `mark(stage, source)` after discovery, extraction and
+    persistence; each call records traced memory, its split between
+    BeautifulSoup trees, response text and the cache, the number of live
+    soup objects and the top allocation sites, written to `<name>.memory.txt`.
+    """
+
+    def __init__(self, directory: str, name: str, interval: float = DEFAULT_INTERVAL,
+                 memory: bool = True, frames: int = DEFAULT_FRAMES, top: int = 25,
+                 mark_overhead: float = DEFAULT_MARK_OVERHEAD):
+        self.directory = directory
+        self.name = name
+        self.interval = interval
+        self.memory = memory
+        self.frames = frames
+        self.top = top
+        self.mark_overhead = mark_overhead
+        self.wall: Counter = Counter()
+        self.cpu: Counter = Counter()
+        self.samples = 0
+        self.marks: List[MemoryMark] = []
+        self.skipped_marks = 0
+        self._last_marks: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._first_sites: Optional[Dict[Tuple[str, int], List[int]]] = None
+        self._last_sites: Optional[Dict[Tuple[str, int], List[int]]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mark_lock = threading.Lock()
+        self._started = 0.0
+
+    def start(self):
+        self._started = time.monotonic()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._thread = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+        self._thread.start()
+        logger.info(f"Profiling {self.name} every {self.interval * 1000:.0f}ms into {self.directory}")
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            running = _running_threads()
+            threads = {thread.ident: thread for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                thread = threads.get(ident)
+                stack.append(thread.name if thread else f"thread-{ident}")
+                folded = ';'.join(reversed(stack))
+                self.wall[folded] += 1
+                if running is not None and thread is not None and thread.native_id in running:
+                    self.cpu[folded] += 1
+            self.samples += 1
+
+    def mark(self, stage: str, source: Optional[str] = None):
+        """Record memory at a stage boundary.
+
+        A snapshot costs time proportional to the live allocations, so a
+        boundary that already recorded is skipped until the time since its
+        last snapshot is large against what that snapshot cost.
+        """
+        if not self.memory or not tracemalloc.is_tracing():
+            return
+        key = (stage, source or '-')
+        with self._mark_lock:
+            started = time.monotonic()
+            last = self._last_marks.get(key)
+            if last is not None and started - last[0] < last[1] / self.mark_overhead:
+                self.skipped_marks += 1
+                return
+            snapshot = tracemalloc.take_snapshot()
+            traced, peak = tracemalloc.get_traced_memory()
+            categories, sites, tracebacks = _summarize(snapshot)
+            del snapshot
+            soups, tags = _live_soup_objects()
+            self.marks.append(MemoryMark(
+                stage=stage,
+                source=key[1],
+                elapsed=started - self._started,
+                traced=traced,
+                peak=peak,
+                categories=categories,
+                soups=soups,
+                tags=tags,
+                top=[(f"{filename}:{lineno}", size, blocks)
+                     for (filename, lineno), (size, blocks) in _largest(sites, self.top)],
+                tracebacks=_largest(tracebacks, 5)
+            ))
+            # Per-site totals of the first boundary, for the growth section
+            if self._first_sites is None:
+                self._first_sites = sites
+            self._last_sites = sites
+            self._last_marks[key] = (started, time.monotonic() - started)
+
+    def stop(self):
+        """Stop sampling and write the flamegraph input and the memory report"""
+        if self._thread is None:
+            return
+        self.mark('end')
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_folded(f"{self.name}.wall.folded", self.wall)
+            if self.cpu:
+                self._write_folded(f"{self.name}.cpu.folded", self.cpu)
+            if self.memory:
+                self._write_memory_report(os.path.join(self.directory, f"{self.name}.memory.txt"))
+        except OSError as e:
+            logger.error(f"Error writing profile to {self.directory}: {str(e)}")
+        finally:
+            if self.memory and tracemalloc.is_tracing():
+                tracemalloc.stop()
+        logger.info(f"Wrote profile of {self.name} ({self.samples} samples) to {self.directory}")
+
+    def _write_folded(self, filename: str, stacks: Counter):
+        with open(os.path.join(self.directory, filename), 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _write_memory_report(self, path: str):
+        mb = 1024 * 1024
+        category_names = [category for category, _ in ALLOCATION_CATEGORIES] + ['other']
+        lines = [
+            f"Memory profile for {self.name} (tracemalloc, {self.frames} frames)",
+            "",
+            f"Stage boundaries in MB, {self.skipped_marks} more skipped to keep snapshots under "
+            f"{self.mark_overhead:.0%} of run time. Traced includes the profiler's own allocations; "
+            "categories exclude them and attribute each allocation to its first matching frame.",
+            f"{'elapsed':>8} {'stage':<12} {'source':<12} {'traced':>8} {'peak':>8} "
+            + ' '.join(f"{name:>14}" for name in category_names)
+            + f" {'soups':>6} {'tags':>8}",
+        ]
+        for mark in self.marks:
+            lines.append(
+                f"{mark.elapsed:>7.1f}s {mark.stage:<12} {mark.source:<12} {mark.traced / mb:>8.1f} "
+                f"{mark.peak / mb:>8.1f} "
+                + ' '.join(f"{mark.categories.get(name, 0) / mb:>14.1f}" for name in category_names)
+                + f" {mark.soups:>6} {mark.tags:>8}"
+            )
+
+        peak = max(self.marks, key=lambda mark: mark.traced, default=None)
+        if peak is not None:
+            lines += ["", f"Top allocations at the largest boundary ({peak.stage} {peak.source}, "
+                          f"{peak.traced / mb:.1f} MB)"]
+            for location, size, count in peak.top:
+                lines.append(f"{size / 1024:>10.1f} KB {count:>8} blocks  {location}")
+
+        if self._first_sites is not None and self._last_sites is not self._first_sites:
+            growth = {
+                site: (size - self._first_sites.get(site, (0, 0))[0], blocks - self._first_sites.get(site, (0, 0))[1])
+                for site, (size, blocks) in self._last_sites.items()
+            }
+            lines += ["", "Growth from the first to the last boundary"]
+            for (filename, lineno), (size, blocks) in _largest(growth, self.top):
+                lines.append(f"{size / 1024:>+10.1f} KB {blocks:>+8} blocks  {filename}:{lineno}")
+
+        if peak is not None and peak.tracebacks:
+            lines += ["", "Largest allocation tracebacks at the largest boundary (most recent call first)"]
+            for frames, (size, blocks) in peak.tracebacks:
+                lines.append(f"{size / 1024:.1f} KB in {blocks} blocks")
+                lines += [f"    {filename}:{lineno}" for filename, lineno in frames]
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+_active: Optional[Profiler] = None
+
+
+def start_profiling(directory: str, name: str, **options) -> Profiler:
+    """Profile this process; source processes started afterwards profile themselves too"""
+    global _active
+    # Spawned children read these in profile_process
+    os.environ['SCRAPER_PROFILE_DIR'] = directory
+    os.environ['SCRAPER_PROFILE_NAME'] = name
+    _active = Profiler(directory, name, **options)
+    _active.start()
+    return _active
+
+
+def profile_process(source: str) -> Optional[Profiler]:
+    """Start profiling a source process if its parent is being profiled"""
+    directory = os.getenv('SCRAPER_PROFILE_DIR')
+    if not directory or _active is not None:
+        return None
+    return start_profiling(directory, f"{os.getenv('SCRAPER_PROFILE_NAME', 'run')}-{source.lower()}")
+
+
+def stop_profiling():
+    """Stop the active profiler and write its output"""
+    global _active
+    if _active is not None:
+        _active.stop()
+        _active = None
+
+
+def mark(stage: str, source: Optional[str] = None):
+    """Record a stage boundary ('discovery', 'extraction' or 'persistence') when profiling"""
+    if _active is not None:
+        _active.mark(stage, source)
@@ -2,35 +2,69 @@ import logging
 import argparse
 import sys
 from dotenv import load_dotenv
+from scraper.logger import configure_logging
 from scraper.metropolis_scraper import MetropolisScraper
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('metropolis_scraper.log')
-    ]
-)
+from scraper.debug_capture import DebugCapture
+from scraper.incremental import IncrementalCrawl
+from scraper.checkpoint import CrawlCheckpoint
+from scraper.metrics import source, write_metrics
+from scraper.images import create_image_pipeline
+from scraper.db import get_supabase
+from scraper.profiling import start_profiling, stop_profiling
 
 def main():
     # Load environment variables
     load_dotenv()
+    configure_logging(log_file='metropolis_scraper.log')
 
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Run the Metropolis Magazine scraper')
     parser.add_argument('--pages', type=int, default=5,
                         help='Number of pages to scrape (default: 5)')
+    parser.add_argument('--debug-sample-rate', type=float, default=0.0,
+                        help='Fraction of pages to capture HTML and screenshots for (default: 0, off)')
+    parser.add_argument('--debug-on-failure', action='store_true',
+                        help='Capture pages where article extraction failed')
+    parser.add_argument('--debug-dir', type=str, default='debug',
+                        help='Directory for run-scoped debug captures (default: debug)')
+    parser.add_argument('--full', action='store_true',
+                        help='Walk every page instead of stopping at already-ingested articles')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue from the checkpoint left by an interrupted run')
+    parser.add_argument('--metrics-dir', type=str, default=None,
+                        help='Write a JSON summary and Prometheus textfile of stage timings here (default: $SCRAPER_METRICS_DIR)')
+    parser.add_argument('--profile', type=str, default=None, metavar='DIR',
+                        help='Write a sampling CPU profile (collapsed stacks) and a tracemalloc report per stage to DIR')
+    parser.add_argument('--images', action='store_true',
+                        help='Store resized WebP variants of article images (needs Pillow)')
+    parser.add_argument('--image-dir', type=str, default=None,
+                        help='Write image variants to this directory instead of the Supabase article-images bucket')
     args = parser.parse_args()
+    if args.profile:
+        start_profiling(args.profile, 'run_metropolis')
 
     logger = logging.getLogger(__name__)
     logger.info(f"Starting Metropolis scraper for {args.pages} pages")
 
+    images = None
     try:
         # Initialize and run scraper
-        with MetropolisScraper('metropolis') as scraper:
-            results = scraper.scrape_category(max_pages=args.pages)
+        debug_capture = DebugCapture(
+            sample_rate=args.debug_sample_rate,
+            on_failure=args.debug_on_failure,
+            base_dir=args.debug_dir
+        )
+        if args.images:
+            images = create_image_pipeline(get_supabase(), args.image_dir)
+        # Attribute stages recorded without an explicit source, e.g. rate limiter waits
+        with source('Metropolis'), MetropolisScraper('metropolis', debug_capture=debug_capture, images=images) as scraper:
+            crawl = IncrementalCrawl(scraper.supabase, 'Metropolis', full=args.full)
+            checkpoint = CrawlCheckpoint.open(CrawlCheckpoint.default_path('run_metropolis'), resume=args.resume)
+            results = scraper.scrape_category(max_pages=args.pages, crawl=crawl, checkpoint=checkpoint)
+            crawl.commit()
+            # An incomplete crawl keeps its checkpoint for --resume
+            if checkpoint.is_done('Metropolis'):
+                checkpoint.clear()
             
             # Log results
             logger.info(f"Scraping completed. Processed {len(results)} articles")
@@ -40,6 +74,11 @@ def main():
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}")
         sys.exit(1)
+    finally:
+        if images:
+            images.close()
+        write_metrics(args.metrics_dir, 'run_metropolis')
+        stop_profiling()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -2,22 +2,62 @@ import logging
 import argparse
 import sys
 from dotenv import load_dotenv
+from scraper.incremental import IncrementalCrawl
+from scraper.checkpoint import CrawlCheckpoint
+from scraper.logger import configure_logging
 from scraper.leibal_scraper import LeibalScraper
-from scraper.scrapers.dezeen import scrape_dezeen
+from scraper.scrapers.dezeen import scrape_dezeen, scrape_dezeen_concurrent
+from scraper.orchestrator import PROCESS, Orchestrator, SourceJob
+from scraper.metrics import write_metrics
+from scraper.images import create_image_pipeline
+from scraper.db import get_supabase
+from scraper.profiling import start_profiling, stop_profiling
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('scraper.log')
-    ]
-)
+def run_leibal(category: str, max_pages: int, workers: int, full: bool, resume: bool, discovery: bool,
+               images: bool = False, image_dir: str = None):
+    """Scrape and save a Leibal category; runs in its own process because it may drive Chromium"""
+    checkpoint = CrawlCheckpoint.open(CrawlCheckpoint.default_path('run_scraper_leibal'), resume=resume)
+    image_pipeline = None
+    if images:
+        image_pipeline = create_image_pipeline(get_supabase(), image_dir)
+    try:
+        with LeibalScraper('leibal', pool_size=workers, images=image_pipeline) as scraper:
+            crawl = IncrementalCrawl(scraper.supabase, 'Leibal', full=full)
+            results = scraper.scrape_category(
+                category=category,
+                max_pages=max_pages,
+                crawl=crawl,
+                checkpoint=checkpoint,
+                discovery=discovery
+            )
+            crawl.commit()
+    finally:
+        if image_pipeline:
+            image_pipeline.close()
+    # An incomplete crawl keeps its checkpoint for --resume
+    if checkpoint.is_done('Leibal'):
+        checkpoint.clear()
+    return results
+
+def run_dezeen(max_pages: int, workers: int, full: bool, resume: bool, discovery: bool):
+    """Scrape Dezeen over plain HTTP"""
+    checkpoint = CrawlCheckpoint.open(CrawlCheckpoint.default_path('run_scraper_dezeen'), resume=resume)
+    crawl = IncrementalCrawl(get_supabase(), 'Dezeen', full=full)
+    if workers > 1:
+        results = scrape_dezeen_concurrent(
+            max_pages=max_pages, max_workers=workers, crawl=crawl, checkpoint=checkpoint,
+            discovery=discovery
+        )
+    else:
+        results = scrape_dezeen(max_pages=max_pages, crawl=crawl, checkpoint=checkpoint, discovery=discovery)
+    if checkpoint.is_done('Dezeen'):
+        checkpoint.clear()
+    return results
 
 def main():
     # Load environment variables
     load_dotenv()
+    configure_logging(log_file='scraper.log')
 
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Run architecture scrapers')
@@ -28,40 +68,61 @@ def main():
                       help='Source to scrape (default: all)')
     parser.add_argument('--category', type=str, default='architecture',
                       help='Category to scrape (default: architecture)')
+    parser.add_argument('--workers', type=int, default=1,
+                      help='Concurrent article fetches or browser pages per source (default: 1, sequential)')
+    parser.add_argument('--full', action='store_true',
+                      help='Walk every page instead of stopping at already-ingested articles')
+    parser.add_argument('--resume', action='store_true',
+                      help='Continue from the checkpoint left by an interrupted run')
+    parser.add_argument('--no-discovery', dest='discovery', action='store_false',
+                      help='Crawl archive pages even when the site has a sitemap or feed')
+    parser.add_argument('--timeout', type=float, default=None,
+                      help='Stop a source still running after this many seconds (default: no limit)')
+    parser.add_argument('--metrics-dir', type=str, default=None,
+                      help='Write a JSON summary and Prometheus textfile of stage timings here (default: $SCRAPER_METRICS_DIR)')
+    parser.add_argument('--profile', type=str, default=None, metavar='DIR',
+                      help='Write a sampling CPU profile (collapsed stacks) and a tracemalloc report per stage to DIR')
+    parser.add_argument('--images', action='store_true',
+                      help='Store resized WebP variants of article images (needs Pillow)')
+    parser.add_argument('--image-dir', type=str, default=None,
+                      help='Write image variants to this directory instead of the Supabase article-images bucket')
     args = parser.parse_args()
+    if args.profile:
+        start_profiling(args.profile, 'run_scraper')
 
     logger = logging.getLogger(__name__)
     logger.info(f"Starting scraper for {args.pages} pages from {args.source}")
 
     try:
-        results = []
-
-        # Run Leibal scraper
+        options = {'max_pages': args.pages, 'workers': args.workers, 'full': args.full,
+                   'resume': args.resume, 'discovery': args.discovery}
+        jobs = []
         if args.source in ['all', 'leibal']:
-            logger.info("Starting Leibal scraper...")
-            with LeibalScraper('leibal') as scraper:
-                leibal_results = scraper.scrape_category(
-                    category=args.category,
-                    max_pages=args.pages
-                )
-                results.extend(leibal_results)
-                logger.info(f"Completed Leibal scraping. Found {len(leibal_results)} articles")
-
-        # Run Dezeen scraper
+            jobs.append(SourceJob('Leibal', run_leibal, {'category': args.category, 'images': args.images,
+                                                      'image_dir': args.image_dir, **options},
+                                  mode=PROCESS, timeout=args.timeout))
         if args.source in ['all', 'dezeen']:
-            logger.info("Starting Dezeen scraper...")
-            dezeen_results = scrape_dezeen(max_pages=args.pages)
-            results.extend(dezeen_results)
-            logger.info(f"Completed Dezeen scraping. Found {len(dezeen_results)} articles")
-            
+            jobs.append(SourceJob('Dezeen', run_dezeen, options, timeout=args.timeout))
+
+        # Sources hit different hosts, so run them side by side
+        outcomes = Orchestrator().run(jobs)
+        results = [result for outcome in outcomes for result in outcome.results]
+
         # Log final results
         logger.info(f"Scraping completed. Processed {len(results)} total articles")
         for result in results:
-            logger.info(f"Saved article: {result.get('title', 'Unknown')} from {result.get('source', 'Unknown')}")
+            if isinstance(result, dict):
+                logger.info(f"Saved article: {result.get('title', 'Unknown')} from {result.get('source', 'Unknown')}")
+
+        if any(outcome.status != 'ok' for outcome in outcomes):
+            sys.exit(1)
 
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}")
         sys.exit(1)
+    finally:
+        write_metrics(args.metrics_dir, 'run_scraper')
+        stop_profiling()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
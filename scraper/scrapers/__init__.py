@@ -1,12 +1,57 @@
-from scraper.scrapers.dezeen import scrape_dezeen
-from scraper.scrapers.leibal import scrape_leibal
+from scraper.scrapers.dezeen import iter_dezeen, scrape_dezeen
+from scraper.scrapers.leibal import iter_leibal, scrape_leibal
+from scraper.scrapers.metropolis import iter_metropolis, scrape_metropolis
+from scraper.logger import get_logger
+from scraper.orchestrator import PROCESS, Orchestrator, SourceJob
 
-def scrape_all_sources():
-    """Run all scrapers and combine results."""
-    results = []
+logger = get_logger(__name__)
+
+def scrape_all_sources(crawls=None, checkpoint=None, on_results=None, discovery=False, timeout=None,
+                       sink=None):
+    """Run all scrapers in parallel and combine results.
+
+    Dezeen and Metropolis are plain HTTP and run in threads; Leibal may fall
+    back to Chromium and runs in its own process. A source that fails or
+    exceeds `timeout` seconds is reported and skipped without affecting the
+    others.
+
+    `crawls` maps source names to IncrementalCrawl instances for paginated sources;
+    `discovery` lets them read sitemaps and feeds instead of archive pages.
+    `on_results(source, results)` is called as each source finishes; with a
+    CrawlCheckpoint, a source counts as done once that call returns and its
+    crawl (if any) read every page, and sources done in an earlier attempt
+    are skipped. The checkpoint tracks whole sources only: articles are
+    handed to `sink` before they are written, so per-URL progress recorded
+    by the scrapers could skip articles that never reached the database.
+
+    With a `sink`, the scrapers' iterator variants are used and each article
+    is passed to `sink(source, article)` as soon as it is parsed; results are
+    then not collected, and `on_results` receives an empty list.
+    """
+    crawls = crawls or {}
+    streaming = sink is not None
+    jobs = [
+        SourceJob("Dezeen", iter_dezeen if streaming else scrape_dezeen,
+                  {"crawl": crawls.get("Dezeen"), "discovery": discovery}),
+        SourceJob("Leibal", iter_leibal if streaming else scrape_leibal, mode=PROCESS),
+        SourceJob("Metropolis", iter_metropolis if streaming else scrape_metropolis),
+    ]
+    
+    if checkpoint:
+        for job in jobs:
+            if checkpoint.is_done(job.name):
+                logger.info(f"{job.name} already completed in the checkpointed run")
+        jobs = [job for job in jobs if not checkpoint.is_done(job.name)]
     
-    # Add results from each scraper
-    results.extend(scrape_dezeen())
-    results.extend(scrape_leibal())
+    def handle(outcome):
+        # Failed sources stay open in the checkpoint so --resume retries them
+        if outcome.status != "ok":
+            return
+        if on_results:
+            on_results(outcome.name, outcome.results)
+        crawl = crawls.get(outcome.name)
+        if checkpoint and not (crawl and crawl.incomplete):
+            checkpoint.complete_source(outcome.name)
     
-    return results
\ No newline at end of file
+    outcomes = Orchestrator(default_timeout=timeout).run(jobs, on_result=handle, sink=sink)
+    return [article for outcome in outcomes for article in outcome.results]
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+from scraper.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds a cached article page is served without revalidation, per host.
+# Archive/listing pages are fetched with ttl=0 so they are always revalidated.
+DEFAULT_TTLS = {
+    'www.dezeen.com': 7 * 24 * 3600,
+    'leibal.com': 24 * 3600,
+    'metropolismag.com': 24 * 3600,
+}
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+class ResponseCache:
+    """On-disk HTTP response cache keyed by URL with ETag/Last-Modified revalidation"""
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024,
+                 default_ttl: float = 0, ttls: Optional[Dict[str, float]] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def ttl_for(self, url: str) -> float:
+        """Get the freshness lifetime configured for the URL's host"""
+        return self.ttls.get(urlparse(url).netloc, self.default_ttl)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Load a cached response, or None when the URL has not been stored"""
+        path = self._path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = CachedResponse(**json.load(f))
+            # Bump mtime so eviction drops the least recently used entries first
+            os.utime(path, None)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry for {url}: {str(e)}")
+            self._remove(path)
+            return None
+
+    def is_fresh(self, entry: CachedResponse, ttl: Optional[float] = None) -> bool:
+        """Check whether the entry can be served without contacting the origin"""
+        ttl = self.ttl_for(entry.url) if ttl is None else ttl
+        return ttl > 0 and time.time() - entry.stored_at < ttl
+
+    def conditional_headers(self, entry: CachedResponse) -> Dict[str, str]:
+        """Build If-None-Match/If-Modified-Since headers for revalidation"""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def put(self, url: str, body: str, headers: Mapping[str, str]) -> Optional[CachedResponse]:
+        """Store a 200 response unless the origin forbids it"""
+        if 'no-store' in (headers.get('Cache-Control') or ''):
+            return None
+
+        entry = CachedResponse(
+            url=url,
+            body=body,
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            stored_at=time.time()
+        )
+        self._write(entry)
+        return entry
+
+    def refresh(self, entry: CachedResponse, headers: Mapping[str, str]) -> CachedResponse:
+        """Restart the entry's lifetime after a 304 Not Modified"""
+        entry.etag = headers.get('ETag') or entry.etag
+        entry.last_modified = headers.get('Last-Modified') or entry.last_modified
+        entry.stored_at = time.time()
+        self._write(entry)
+        return entry
+
+    def _write(self, entry: CachedResponse):
+        path = self._path(entry.url)
+        data = json.dumps(asdict(entry)).encode('utf-8')
+
+        with self._lock:
+            old_size = self._size(path)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                self._remove(tmp_path)
+                logger.warning(f"Failed to cache {entry.url}: {str(e)}")
+                return
+
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data) - old_size
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is under 90% of max_bytes"""
+        entries = []
+        for item in os.scandir(self.directory):
+            if item.name.endswith('.json'):
+                stat = item.stat()
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+        entries.sort()
+
+        target = self.max_bytes * 0.9
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+
+        self._total_bytes = total
+        logger.info(f"Evicted {removed} cached responses, {total} bytes remain")
+
+    def _scan_size(self) -> int:
+        return sum(item.stat().st_size for item in os.scandir(self.directory) if item.name.endswith('.json'))
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> Optional[ResponseCache]:
+    """Get the process-wide response cache, configured from the environment"""
+    global _cache
+    if os.getenv('SCRAPER_CACHE_DISABLED'):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    os.getenv('SCRAPER_CACHE_DIR', os.path.join(os.getcwd(), '.scraper_cache')),
+                    max_bytes=int(os.getenv('SCRAPER_CACHE_MAX_MB', '512')) * 1024 * 1024
+                )
+    return _cache
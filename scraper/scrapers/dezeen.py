@@ -1,26 +1,36 @@
-import requests
-from bs4 import BeautifulSoup
-from scraper.scrapers.utils import extract_date
+from scraper.parsing import parse_html
+from scraper.scrapers.utils import extract_date, fetch_text
+from scraper.fingerprint import content_hash
 from scraper.logger import get_logger
 import time
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+from scraper.scrapers.rate_limit import get_rate_limiter
+from scraper.frontier import dedupe_urls, get_frontier
+from scraper.scrapers.discovery import discover_urls, parse_timestamp
+from scraper.metrics import count, source, timed
+from scraper.profiling import mark
 
 logger = get_logger(__name__)
 
-def get_page_with_retry(url, max_retries=3, delay=1):
-    """Get page content with retry mechanism"""
+# Statuses worth another attempt; any other failure (404, 403, ...) is final
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+def get_page_with_retry(url, max_retries=3, delay=1, ttl=None, stage="article_fetch"):
+    """Get page content, retrying errors and retryable statuses with exponential backoff"""
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-            if response.status_code == 200:
-                return BeautifulSoup(response.text, 'html.parser')
-            elif response.status_code == 429:  # Too many requests
-                time.sleep(delay * (attempt + 1))  # Exponential backoff
-            else:
-                logger.warning(f"Failed to get page: {url}, status: {response.status_code}")
+            status, text = fetch_text(url, ttl=ttl, stage=stage)
+            if status == 200:
+                return parse_html(text)
+            logger.warning(f"Failed to get page: {url}, status: {status}")
+            if status not in RETRY_STATUSES:
+                return None
         except Exception as e:
             logger.error(f"Error getting page {url}: {str(e)}")
-            if attempt < max_retries - 1:
-                time.sleep(delay)
+        if attempt < max_retries - 1:
+            # On a 429 the shared rate limiter also holds the host for its Retry-After
+            time.sleep(delay * 2 ** attempt)
     return None
 
 def get_article_content(article_soup):
@@ -55,81 +65,318 @@ def get_pagination_urls(base_url, soup):
         return [link["href"] for link in page_links if "page" in link["href"]]
     return []
 
-def scrape_dezeen(max_pages=5):
-    """Scrape articles from Dezeen with improved content extraction and pagination."""
-    BASE_URL = "https://www.dezeen.com/architecture/"
-    articles = []
+BASE_URL = "https://www.dezeen.com/architecture/"
+# The site-wide sitemap mixes every category, so discovery reads the category feed
+FEED_URL = "https://www.dezeen.com/architecture/feed/"
+# Discovered entries are processed in chunks the size of an archive page; the
+# chunks shift whenever the feed changes, so they are checkpointed by URL only
+DISCOVERY_PAGE_SIZE = 20
+
+def set_base_url(base_url):
+    """Point the scraper at another host, e.g. a local stand-in from a benchmark"""
+    global BASE_URL, FEED_URL
+    BASE_URL = urljoin(base_url, "/architecture/")
+    FEED_URL = urljoin(BASE_URL, "feed/")
+
+def get_archive_url(page):
+    """Build the archive URL for a listing page"""
+    return BASE_URL if page == 1 else f"{BASE_URL}page/{page}/"
+
+def get_article_elements(soup):
+    """Find all article elements on a listing page (trying different selectors)"""
+    return soup.select(".dezeen-article") or \
+           soup.select(".article") or \
+           soup.select("article") or \
+           soup.select(".post")
+
+def parse_listing_entry(article):
+    """Extract listing data for one article element, or None if it has no link or title"""
+    link = article.select_one("a") or article.find("a")
+    title = article.select_one("h3") or article.find("h2") or article.find("h1")
+    image = article.select_one("img")
+    author = article.select_one(".author-name") or article.select_one(".author")
+    date = article.select_one("time") or article.select_one(".date")
+
+    if not (link and title):
+        logger.warning(f"Skipping article - missing link or title")
+        return None
+
+    article_url = urljoin(BASE_URL, link.get("href"))
+
+    return {
+        "title": title.get_text(strip=True),
+        "url": article_url,
+        "image_url": image["src"] if image and "src" in image.attrs else None,
+        "author": author.get_text(strip=True) if author else None,
+        "published_at": extract_date(date["datetime"]) if date and date.get("datetime") else None,
+    }
+
+def get_article_metadata(article_soup):
+    """Publication date and lead image from an article page's meta tags"""
+    published = article_soup.select_one('meta[property="article:published_time"]')
+    time_elem = article_soup.select_one("time[datetime]")
+    image = article_soup.select_one('meta[property="og:image"]')
+    published_at = parse_timestamp(
+        published.get("content") if published else time_elem.get("datetime") if time_elem else None
+    )
+    return {
+        "published_at": published_at.isoformat() if published_at else None,
+        "image_url": image.get("content") if image else None,
+    }
+
+def build_article(entry, content):
+    """Build the result dict for a listing entry and its article content"""
+    return {
+        "source": "Dezeen",
+        "title": entry["title"],
+        "url": entry["url"],
+        "image_url": entry["image_url"],
+        "author": entry["author"],
+        "published_at": entry["published_at"],
+        "content": content,
+        "content_hash": content_hash(content),
+        "category": "Architecture"
+    }
+
+def fetch_article(entry):
+    """Fetch an article page and build its result dict; raises if the page could not be fetched"""
+    # Runs on pool threads too, so attribute its metrics explicitly
+    with source("Dezeen"):
+        article_soup = get_page_with_retry(entry["url"])
+        # An empty article would overwrite the stored content and be checkpointed as done
+        if article_soup is None:
+            raise RuntimeError(f"Failed to fetch article {entry['url']}")
+        with timed("extraction"):
+            content = get_article_content(article_soup)
+            if not entry["title"] and article_soup.find("h1"):
+                entry = {**entry, "title": article_soup.find("h1").get_text(strip=True)}
+            # Discovered entries carry neither; listing values win where present
+            metadata = get_article_metadata(article_soup)
+            entry = {**entry, **{key: value for key, value in metadata.items() if value and not entry[key]}}
+        return build_article(entry, content)
+
+def unfetched_entries(entries):
+    """Drop canonically duplicate entries and those the URL frontier saw fetched recently"""
+    frontier = get_frontier()
+    urls = [entry["url"] for entry in entries]
+    wanted = set(frontier.filter_unfetched(urls) if frontier else dedupe_urls(urls))
+    selected = []
+    for entry in entries:
+        if entry["url"] in wanted:
+            wanted.discard(entry["url"])
+            selected.append(entry)
+    return selected
+
+def incremental_entries(entries, crawl):
+    """Return the listing entries to fetch, or None once the crawl reaches known territory"""
+    if crawl is None:
+        return entries
+
+    urls = [entry['url'] for entry in entries]
+    if crawl.should_stop(urls, [entry['published_at'] for entry in entries]):
+        return None
+    wanted = set(crawl.new_urls(urls))
+    return [entry for entry in entries if entry['url'] in wanted]
+
+def discover_entries(max_pages=5, crawl=None):
+    """Listing entries from the architecture feed, or None if it is unavailable"""
+    since = crawl.watermark.last_scraped_at if crawl and not crawl.full else None
+    discovered = discover_urls(BASE_URL, since=since, limit=max_pages * DISCOVERY_PAGE_SIZE,
+                               sitemaps=[], feeds=[FEED_URL])
+    if discovered is None:
+        return None
+    # lastmod is when the entry last changed, not when it was published, so
+    # the date and image are read from the article page instead
+    return [{
+        "title": entry.title,
+        "url": entry.url,
+        "image_url": None,
+        "author": entry.author,
+        "published_at": None,
+    } for entry in discovered]
+
+def resume_entries(entries, checkpoint, page):
+    """Drop entries a previous attempt completed and record the page as in progress"""
+    if checkpoint is None:
+        return entries
+    wanted = set(checkpoint.remaining("Dezeen", [entry["url"] for entry in entries]))
+    entries = [entry for entry in entries if entry["url"] in wanted]
+    checkpoint.start_page("Dezeen", page, [entry["url"] for entry in entries])
+    return entries
+
+def finish_crawl(complete, crawl=None, checkpoint=None):
+    """Close the source only if every page was read; otherwise keep the watermark and leave it open to resume"""
+    if not complete:
+        if crawl:
+            crawl.mark_incomplete()
+    elif checkpoint:
+        checkpoint.complete_source("Dezeen")
+
+def iter_dezeen(max_pages=5, crawl=None, checkpoint=None, discovery=False):
+    """Yield articles from Dezeen as each one is fetched and parsed.
+
+    With an IncrementalCrawl, only new articles are fetched and pagination
+    stops at the first page with nothing new. With a CrawlCheckpoint,
+    progress is recorded per page and URL and a resumed run skips both.
+    With discovery, entries come from the architecture feed when it is
+    available instead of archive pages.
+    """
+    found = 0
+    if checkpoint and checkpoint.is_done("Dezeen"):
+        logger.info("Dezeen already completed in the checkpointed run")
+        return
     
+    complete = True
     try:
         logger.info(f"Starting to scrape {BASE_URL}")
-        current_page = 1
+        discovered = discover_entries(max_pages, crawl) if discovery else None
+        current_page = checkpoint.next_page("Dezeen") if checkpoint and discovered is None else 1
         
         while current_page <= max_pages:
-            page_url = BASE_URL if current_page == 1 else f"{BASE_URL}page/{current_page}/"
-            soup = get_page_with_retry(page_url)
-            
-            if not soup:
-                logger.error(f"Failed to get page {current_page}")
-                break
-            
-            # Find all article elements (trying different selectors)
-            article_elements = soup.select(".dezeen-article") or \
-                             soup.select(".article") or \
-                             soup.select("article") or \
-                             soup.select(".post")
-            
-            logger.info(f"Found {len(article_elements)} potential articles on page {current_page}")
+            if discovered is not None:
+                # Feed entries are already limited to changes since the last run
+                entries = discovered[(current_page - 1) * DISCOVERY_PAGE_SIZE:current_page * DISCOVERY_PAGE_SIZE]
+                if not entries:
+                    break
+            else:
+                page_url = get_archive_url(current_page)
+                # Archive pages change daily, so always revalidate them
+                soup = get_page_with_retry(page_url, ttl=0, stage="discovery_fetch")
+                
+                if not soup:
+                    logger.error(f"Failed to get page {current_page}")
+                    complete = False
+                    break
+                
+                article_elements = get_article_elements(soup)
+                
+                logger.info(f"Found {len(article_elements)} potential articles on page {current_page}")
+                
+                entries = incremental_entries(
+                    [entry for entry in map(parse_listing_entry, article_elements) if entry], crawl
+                )
+                if entries is None:
+                    break
+            mark("discovery", "Dezeen")
             
             # Process each article
-            for article in article_elements:
+            for entry in resume_entries(unfetched_entries(entries), checkpoint, current_page):
                 try:
-                    # Extract article data
-                    link = article.select_one("a") or article.find("a")
-                    title = article.select_one("h3") or article.find("h2") or article.find("h1")
-                    image = article.select_one("img")
-                    author = article.select_one(".author-name") or article.select_one(".author")
-                    date = article.select_one("time") or article.select_one(".date")
-                    
-                    if not (link and title):
-                        logger.warning(f"Skipping article - missing link or title")
-                        continue
-                    
-                    article_title = title.get_text(strip=True)
-                    logger.info(f"Processing article: {article_title}")
+                    logger.info(f"Processing article: {entry['title']}")
                     
                     # Get full article content
-                    article_url = link.get("href")
-                    if not article_url.startswith("http"):
-                        article_url = f"https://www.dezeen.com{article_url}"
-                        
-                    article_soup = get_page_with_retry(article_url)
-                    content = get_article_content(article_soup) if article_soup else ""
+                    article = fetch_article(entry)
+                    found += 1
+                    count("articles", "Dezeen")
+                    yield article
+                    if checkpoint:
+                        checkpoint.complete_url("Dezeen", entry["url"])
                     
                     # Add a delay to avoid hitting rate limits
                     time.sleep(1)
                     
-                    articles.append({
-                        "source": "Dezeen",
-                        "title": article_title,
-                        "url": article_url,
-                        "image_url": image["src"] if image and "src" in image.attrs else None,
-                        "author": author.get_text(strip=True) if author else None,
-                        "published_at": extract_date(date["datetime"]) if date and date.get("datetime") else None,
-                        "content": content,
-                        "category": "Architecture"
-                    })
-                    
-                    logger.info(f"Successfully processed article: {article_title}")
+                    logger.info(f"Successfully processed article: {entry['title']}")
                     
                 except Exception as e:
+                    count("article_errors", "Dezeen")
                     logger.error(f"Error processing Dezeen article: {str(e)}")
                     continue
+            mark("extraction", "Dezeen")
             
+            if checkpoint and discovered is None:
+                checkpoint.complete_page("Dezeen", current_page)
             current_page += 1
             time.sleep(2)  # Rate limiting between pages
                 
     except Exception as e:
         logger.error(f"Error scraping Dezeen: {str(e)}")
-        
-    logger.info(f"Finished scraping Dezeen. Found {len(articles)} articles")
-    return articles
+        complete = False
+    
+    finish_crawl(complete, crawl, checkpoint)
+    logger.info(f"Finished scraping Dezeen. Found {found} articles")
+
+def scrape_dezeen(max_pages=5, crawl=None, checkpoint=None, discovery=False):
+    """Scrape articles from Dezeen with improved content extraction and pagination"""
+    return list(iter_dezeen(max_pages, crawl=crawl, checkpoint=checkpoint, discovery=discovery))
+
+def iter_dezeen_concurrent(max_pages=5, max_workers=4, requests_per_second=None, burst=None,
+                           crawl=None, checkpoint=None, discovery=False):
+    """Yield Dezeen articles fetched by a bounded thread pool, paced by the shared per-host rate limiter.
+
+    Yields the same result dicts as iter_dezeen, in listing order, holding
+    at most one page of articles in memory.
+    """
+    found = 0
+    if checkpoint and checkpoint.is_done("Dezeen"):
+        logger.info("Dezeen already completed in the checkpointed run")
+        return
+
+    if requests_per_second:
+        get_rate_limiter().configure(BASE_URL, requests_per_second, burst or max_workers)
+
+    logger.info(f"Starting to scrape {BASE_URL} with {max_workers} workers")
+
+    discovered = discover_entries(max_pages, crawl) if discovery else None
+
+    complete = True
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        first_page = checkpoint.next_page("Dezeen") if checkpoint and discovered is None else 1
+        for current_page in range(first_page, max_pages + 1):
+            try:
+                if discovered is not None:
+                    entries = discovered[(current_page - 1) * DISCOVERY_PAGE_SIZE:current_page * DISCOVERY_PAGE_SIZE]
+                    if not entries:
+                        break
+                else:
+                    page_url = get_archive_url(current_page)
+                    soup = get_page_with_retry(page_url, ttl=0, stage="discovery_fetch")
+
+                    if not soup:
+                        logger.error(f"Failed to get page {current_page}")
+                        complete = False
+                        break
+
+                    article_elements = get_article_elements(soup)
+                    logger.info(f"Found {len(article_elements)} potential articles on page {current_page}")
+
+                    entries = incremental_entries(
+                        [entry for entry in map(parse_listing_entry, article_elements) if entry], crawl
+                    )
+                    if entries is None:
+                        break
+                mark("discovery", "Dezeen")
+                entries = resume_entries(unfetched_entries(entries), checkpoint, current_page)
+                futures = [(entry, executor.submit(fetch_article, entry)) for entry in entries]
+
+                for entry, future in futures:
+                    try:
+                        article = future.result()
+                        found += 1
+                        count("articles", "Dezeen")
+                        yield article
+                        if checkpoint:
+                            checkpoint.complete_url("Dezeen", entry["url"])
+                        logger.info(f"Successfully processed article: {entry['title']}")
+                    except Exception as e:
+                        count("article_errors", "Dezeen")
+                        logger.error(f"Error processing Dezeen article {entry['url']}: {str(e)}")
+                mark("extraction", "Dezeen")
+
+                if checkpoint and discovered is None:
+                    checkpoint.complete_page("Dezeen", current_page)
+
+            except Exception as e:
+                logger.error(f"Error scraping Dezeen page {current_page}: {str(e)}")
+                complete = False
+                break
+
+    finish_crawl(complete, crawl, checkpoint)
+    logger.info(f"Finished scraping Dezeen. Found {found} articles")
+
+def scrape_dezeen_concurrent(max_pages=5, max_workers=4, requests_per_second=None, burst=None,
+                             crawl=None, checkpoint=None, discovery=False):
+    """Scrape Dezeen with a bounded thread pool; returns the same result dicts as scrape_dezeen"""
+    return list(iter_dezeen_concurrent(
+        max_pages, max_workers, requests_per_second, burst,
+        crawl=crawl, checkpoint=checkpoint, discovery=discovery
+    ))
@@ -0,0 +1,231 @@
+import heapq
+import io
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, List, Optional
+from urllib.parse import urljoin, urlsplit
+from scraper.frontier import canonicalize_url
+from scraper.logger import get_logger
+from scraper.scrapers.utils import fetch_text
+
+logger = get_logger(__name__)
+
+# Where WordPress sites (all current sources) publish sitemaps and feeds
+SITEMAP_PATHS = ['/sitemap_index.xml', '/wp-sitemap.xml', '/sitemap.xml']
+FEED_PATHS = ['/feed/', '/feed/atom/']
+
+# Child sitemaps that never list articles
+SKIP_SITEMAPS = ('category', 'tag', 'author', 'page-sitemap', 'attachment', 'taxonomies', 'users')
+
+@dataclass
+class DiscoveredURL:
+    url: str
+    lastmod: Optional[datetime] = None
+    title: Optional[str] = None
+    author: Optional[str] = None
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse W3C (sitemap, Atom) or RFC 822 (RSS) timestamps into aware datetimes"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+def fetch_xml(url: str) -> Optional[bytes]:
+    """Fetch an XML document, revalidating any cached copy; None if it is missing"""
+    try:
+        status, text = fetch_text(url, ttl=0, stage='discovery_fetch')
+    except Exception as e:
+        logger.warning(f"Error fetching {url}: {str(e)}")
+        return None
+    if status != 200 or not text.lstrip().startswith('<'):
+        return None
+    return text.encode('utf-8')
+
+def iter_sitemap_entries(data: bytes) -> Iterator[tuple]:
+    """Stream (kind, loc, lastmod) from a sitemap or sitemap index, freeing each entry once read"""
+    for _, elem in ET.iterparse(io.BytesIO(data), events=('end',)):
+        kind = _local(elem.tag)
+        if kind not in ('url', 'sitemap'):
+            continue
+        loc = lastmod = None
+        for child in elem:
+            name = _local(child.tag)
+            if name == 'loc':
+                loc = (child.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = parse_timestamp(child.text)
+        elem.clear()
+        if loc:
+            yield kind, loc, lastmod
+
+def iter_feed_entries(data: bytes) -> Iterator[DiscoveredURL]:
+    """Stream entries from an RSS 2.0 or Atom feed"""
+    for _, elem in ET.iterparse(io.BytesIO(data), events=('end',)):
+        if _local(elem.tag) not in ('item', 'entry'):
+            continue
+        fields = {}
+        for child in elem:
+            name = _local(child.tag)
+            if name == 'link':
+                # RSS has the URL as text, Atom as href on the alternate link
+                if child.get('rel', 'alternate') == 'alternate':
+                    fields.setdefault('link', (child.text or child.get('href') or '').strip())
+            elif name in ('pubDate', 'updated', 'published'):
+                fields.setdefault('date', child.text)
+            elif name in ('title', 'creator'):
+                fields[name] = (child.text or '').strip()
+            elif name == 'author':
+                fields['creator'] = ''.join(child.itertext()).strip()
+        elem.clear()
+        if fields.get('link'):
+            yield DiscoveredURL(
+                url=fields['link'],
+                lastmod=parse_timestamp(fields.get('date')),
+                title=fields.get('title') or None,
+                author=fields.get('creator') or None
+            )
+
+def sitemaps_from_robots(root: str) -> List[str]:
+    """Read Sitemap: lines from robots.txt"""
+    try:
+        status, text = fetch_text(urljoin(root, '/robots.txt'), ttl=24 * 3600, stage='discovery_fetch')
+    except Exception as e:
+        logger.warning(f"Error fetching robots.txt for {root}: {str(e)}")
+        return []
+    if status != 200:
+        return []
+    return [
+        line.split(':', 1)[1].strip()
+        for line in text.splitlines()
+        if line.lower().startswith('sitemap:')
+    ]
+
+def walk_sitemap(url: str, data: bytes, since: Optional[datetime] = None, max_depth: int = 2,
+                 covered: Optional[Callable[[Optional[datetime]], bool]] = None) -> Iterator[DiscoveredURL]:
+    """Yield article URLs from a sitemap, descending into index children modified after `since`.
+
+    Children are walked newest first; `covered` is asked before each one is
+    fetched and skips it when nothing it lists could still be wanted.
+    """
+    children = []
+    for kind, loc, lastmod in iter_sitemap_entries(data):
+        if since and lastmod and lastmod <= since:
+            continue
+        if kind == 'url':
+            yield DiscoveredURL(loc, lastmod)
+        elif not any(skip in loc for skip in SKIP_SITEMAPS):
+            children.append((loc, lastmod))
+
+    if children and max_depth <= 0:
+        logger.warning(f"Sitemap {url} nests too deeply, ignoring {len(children)} child sitemaps")
+        return
+    # Undated children sort last and are always walked, nothing bounds what they list
+    children.sort(key=lambda child: (child[1] is not None, child[1] or datetime.min), reverse=True)
+    skipped = 0
+    for child, lastmod in children:
+        if covered and covered(lastmod):
+            skipped += 1
+            continue
+        if child.endswith('.gz'):
+            logger.info(f"Skipping compressed sitemap {child}")
+            continue
+        child_data = fetch_xml(child)
+        if child_data is not None:
+            yield from walk_sitemap(child, child_data, since, max_depth - 1, covered)
+    if skipped:
+        logger.info(f"Skipped {skipped} child sitemaps of {url} older than the newest entries found")
+
+def discover_urls(base_url: str, since: Optional[datetime] = None,
+                  url_filter: Optional[Callable[[str], bool]] = None, limit: Optional[int] = None,
+                  sitemaps: Optional[List[str]] = None,
+                  feeds: Optional[List[str]] = None) -> Optional[List[DiscoveredURL]]:
+    """Discover article URLs from the site's sitemaps, then its feeds.
+
+    Entries last modified before `since` are skipped (whole child sitemaps
+    included), and with a `limit` child sitemaps older than the `limit`
+    newest entries found so far are never fetched. `sitemaps` and `feeds`
+    override the locations to try; pass an empty list to skip one kind.
+    Returns URLs newest first, or None when the site has neither, so callers
+    can fall back to archive pages.
+    """
+    parts = urlsplit(base_url)
+    root = f"{parts.scheme}://{parts.netloc}"
+    if sitemaps is None:
+        sitemaps = sitemaps_from_robots(root) or [urljoin(root, path) for path in SITEMAP_PATHS]
+    if feeds is None:
+        feeds = [urljoin(root, path) for path in FEED_PATHS]
+
+    seen = set()
+    unique = []
+    # Min-heap of the `limit` newest lastmods kept so far
+    newest: List[datetime] = []
+
+    def collect(entries: Iterator[DiscoveredURL]) -> List[DiscoveredURL]:
+        """Keep wanted entries not seen before, in the order they arrive"""
+        seen.clear()
+        unique.clear()
+        newest.clear()
+        for entry in entries:
+            key = canonicalize_url(entry.url)
+            if key in seen or (url_filter and not url_filter(entry.url)):
+                continue
+            seen.add(key)
+            unique.append(entry)
+            if limit and entry.lastmod:
+                if len(newest) < limit:
+                    heapq.heappush(newest, entry.lastmod)
+                else:
+                    heapq.heappushpop(newest, entry.lastmod)
+        return unique
+
+    def covered(lastmod: Optional[datetime]) -> bool:
+        """True once `limit` entries newer than anything in a child sitemap are known"""
+        return bool(limit) and lastmod is not None and len(newest) >= limit and lastmod < newest[0]
+
+    discovered = None
+    for sitemap in sitemaps:
+        data = fetch_xml(sitemap)
+        if data is None:
+            continue
+        try:
+            discovered = collect(walk_sitemap(sitemap, data, since, covered=covered))
+            logger.info(f"Discovered {len(discovered)} URLs from sitemap {sitemap}")
+            break
+        except ET.ParseError as e:
+            logger.warning(f"Invalid sitemap {sitemap}: {str(e)}")
+
+    if discovered is None:
+        for feed in feeds:
+            data = fetch_xml(feed)
+            if data is None:
+                continue
+            try:
+                discovered = collect(
+                    entry for entry in iter_feed_entries(data)
+                    if not (since and entry.lastmod and entry.lastmod <= since)
+                )
+                logger.info(f"Discovered {len(discovered)} URLs from feed {feed}")
+                break
+            except ET.ParseError as e:
+                logger.warning(f"Invalid feed {feed}: {str(e)}")
+
+    if discovered is None:
+        logger.info(f"No sitemap or feed found for {root}, falling back to archive pages")
+        return None
+
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    unique.sort(key=lambda entry: entry.lastmod or oldest, reverse=True)
+    return unique[:limit] if limit else unique
@@ -0,0 +1,92 @@
+import os
+import threading
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from scraper.logger import get_logger
+
+logger = get_logger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+def _accept_encoding() -> str:
+    """Only advertise brotli when a decoder is installed"""
+    try:
+        import brotli  # noqa: F401
+        return 'gzip, deflate, br'
+    except ImportError:
+        return 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': _accept_encoding(),
+}
+
+DEFAULT_TIMEOUT = float(os.getenv('SCRAPER_HTTP_TIMEOUT', '30'))
+POOL_SIZE = int(os.getenv('SCRAPER_HTTP_POOL_SIZE', '16'))
+
+class HttpClient:
+    """Process-wide pooled HTTP client shared by every requests-based scraper.
+
+    Uses a keep-alive requests.Session by default, or an httpx client with
+    HTTP/2 when SCRAPER_HTTP2 is set and httpx[http2] is installed.
+    """
+
+    def __init__(self, pool_size: int = POOL_SIZE, timeout: float = DEFAULT_TIMEOUT,
+                 http2: bool = False):
+        self.timeout = timeout
+        self.http2 = False
+        self._client = None
+
+        if http2:
+            try:
+                import httpx
+                self._client = httpx.Client(
+                    http2=True,
+                    headers=DEFAULT_HEADERS,
+                    timeout=timeout,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+                )
+                self.http2 = True
+            except ImportError:
+                logger.warning("SCRAPER_HTTP2 is set but httpx[http2] is not installed, using HTTP/1.1")
+
+        if self._client is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._client = session
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None):
+        """Issue a GET on the pooled connection; the response has status_code, text and headers"""
+        return self._client.get(url, headers=headers, timeout=timeout or self.timeout)
+
+    def close(self):
+        self._client.close()
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> HttpClient:
+    """Get the shared HTTP client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient(http2=bool(os.getenv('SCRAPER_HTTP2')))
+    return _client
+
+def create_async_session(limit_per_host: int = POOL_SIZE, timeout: float = DEFAULT_TIMEOUT):
+    """Create an aiohttp session with the same headers, timeouts and per-host pooling"""
+    import aiohttp
+
+    return aiohttp.ClientSession(
+        headers=DEFAULT_HEADERS,
+        connector=aiohttp.TCPConnector(limit_per_host=limit_per_host, keepalive_timeout=30),
+        timeout=aiohttp.ClientTimeout(total=timeout)
+    )
@@ -0,0 +1,61 @@
+from typing import List, Optional
+from bs4 import BeautifulSoup
+from scraper.parsing import parse_html
+from scraper.scrapers.utils import fetch_text
+from scraper.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FetchStats:
+    """Per-run counts of pages served by plain HTTP versus the browser fallback"""
+
+    def __init__(self):
+        self.http = 0
+        self.fallback = 0
+
+    def summary(self):
+        total = self.http + self.fallback
+        return {
+            'http_pages': self.http,
+            'browser_fallbacks': self.fallback,
+            'fallback_rate': self.fallback / total if total else 0.0,
+        }
+
+    def log_summary(self, source: str):
+        total = self.http + self.fallback
+        if total:
+            logger.info(
+                f"{source} fetches: {self.http} of {total} pages served over HTTP, "
+                f"browser fallback fired {self.fallback} times ({self.fallback / total:.0%})"
+            )
+
+
+class HybridFetcher:
+    """Try a static HTTP fetch first and only ask for a browser when the expected markup is missing"""
+
+    def __init__(self, stats: Optional[FetchStats] = None):
+        self.stats = stats or FetchStats()
+
+    def fetch_static(self, url: str, expected_selectors: List[str],
+                     ttl: Optional[float] = None, stage: str = 'article_fetch') -> Optional[BeautifulSoup]:
+        """Return the parsed page if a plain GET contains any expected selector.
+
+        A None return means the caller should fall back to the browser; it is
+        counted as a fallback here so callers only have to handle the result.
+        """
+        try:
+            status, text = fetch_text(url, ttl=ttl, stage=stage)
+            if status == 200:
+                soup = parse_html(text)
+                if any(soup.select_one(selector) for selector in expected_selectors):
+                    self.stats.http += 1
+                    return soup
+                logger.info(f"Static fetch of {url} is missing {expected_selectors}, using browser")
+            else:
+                logger.info(f"Static fetch of {url} returned {status}, using browser")
+        except Exception as e:
+            logger.warning(f"Static fetch of {url} failed, using browser: {str(e)}")
+
+        self.stats.fallback += 1
+        return None
@@ -1,70 +1,126 @@
-from bs4 import BeautifulSoup
+from scraper.parsing import parse_html
 from scraper.scrapers.utils import extract_date
+from scraper.fingerprint import content_hash
 from scraper.logger import get_logger
 from playwright.sync_api import sync_playwright
+from scraper.scrapers.rate_limit import get_rate_limiter
+from scraper.interception import RequestInterceptor, get_policy, site_domain
+from scraper.scrapers.hybrid_fetch import HybridFetcher
+from scraper.frontier import canonicalize_url, get_frontier
+from scraper.metrics import count, timed
+from scraper.profiling import mark
 import time
 
 logger = get_logger(__name__)
 
-def scrape_leibal():
-    """Scrape articles from Leibal."""
+LISTING_SELECTORS = ['.post-card', '.main__content article', 'article.type-post']
+
+class LazyBrowser:
+    """Launches Chromium on first use, so runs served entirely over HTTP never start it"""
+
+    def __init__(self, interceptor):
+        self.interceptor = interceptor
+        self.playwright = None
+        self.browser = None
+        self.page = None
+
+    def get_page(self):
+        if self.page is None:
+            self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch()
+            self.page = self.browser.new_page()
+            # Set viewport size
+            self.page.set_viewport_size({"width": 1280, "height": 800})
+            self.interceptor.install(self.page)
+        return self.page
+
+    def close(self):
+        if self.browser:
+            self.browser.close()
+        if self.playwright:
+            self.playwright.stop()
+
+def iter_leibal():
+    """Yield articles from Leibal as each one is fetched and parsed"""
     BASE_URL = "https://leibal.com/category/architecture/"
-    articles = []
+    found = 0
     
     logger.info(f"Starting to scrape {BASE_URL}")
     
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        
-        try:
-            # Set viewport size
-            page.set_viewport_size({"width": 1280, "height": 800})
+    # Skip images, fonts, trackers and third-party scripts per the Leibal policy
+    interceptor = RequestInterceptor(get_policy('leibal'), site_domain(BASE_URL))
+    browser = LazyBrowser(interceptor)
+    fetcher = HybridFetcher()
+    limiter = get_rate_limiter()
+    frontier = get_frontier()
+    seen = set()
+    
+    try:
+        # Try the archive over plain HTTP before rendering it
+        soup = fetcher.fetch_static(BASE_URL, LISTING_SELECTORS, ttl=0, stage='discovery_fetch')
+        if soup is None:
+            page = browser.get_page()
             
             # Navigate to the page
-            page.goto(BASE_URL, wait_until='networkidle')
+            limiter.acquire(BASE_URL)
+            with timed('browser_navigation', 'Leibal'):
+                page.goto(BASE_URL, wait_until='networkidle')
+                
+                # Wait for content to load
+                page.wait_for_selector('.main__content', timeout=10000)
             
-            # Wait for content to load and scroll to trigger lazy loading
-            page.wait_for_selector('.main__content', timeout=10000)
+            # Scroll to trigger lazy loading
             for _ in range(3):
                 page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
                 time.sleep(2)
             
             # Get page content
-            content = page.content()
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Try to find article elements
-            article_elements = soup.select('.post-card') or \
-                             soup.select('.main__content article') or \
-                             soup.select('article.type-post')
-            
-            logger.info(f"Found {len(article_elements)} potential articles")
-            
-            for article in article_elements:
-                try:
-                    # Extract article data
-                    title_elem = article.select_one('.entry-title') or \
-                                article.select_one('h2') or \
-                                article.select_one('h1')
-                    link = article.select_one('a[href*="/architecture/"]')
-                    image = article.select_one('img')
-                    
-                    if not (title_elem and link):
-                        logger.warning("Skipping article - missing title or link")
-                        continue
-                    
-                    article_url = link['href']
-                    article_title = title_elem.get_text(strip=True)
-                    
-                    logger.info(f"Processing article: {article_title}")
-                    
-                    # Navigate to article page
-                    page.goto(article_url, wait_until='networkidle')
-                    page.wait_for_selector('.entry-content', timeout=10000)
-                    article_content = page.content()
-                    article_soup = BeautifulSoup(article_content, 'html.parser')
-                    
+            soup = parse_html(page.content())
+        
+        # Try to find article elements
+        article_elements = soup.select('.post-card') or \
+                         soup.select('.main__content article') or \
+                         soup.select('article.type-post')
+        
+        logger.info(f"Found {len(article_elements)} potential articles")
+        mark('discovery', 'Leibal')
+        
+        for article in article_elements:
+            try:
+                # Extract article data
+                title_elem = article.select_one('.entry-title') or \
+                            article.select_one('h2') or \
+                            article.select_one('h1')
+                link = article.select_one('a[href*="/architecture/"]')
+                image = article.select_one('img')
+                
+                if not (title_elem and link):
+                    logger.warning("Skipping article - missing title or link")
+                    continue
+                
+                article_url = link['href']
+                article_title = title_elem.get_text(strip=True)
+                
+                # Skip listing duplicates and articles fetched recently by any run
+                key = canonicalize_url(article_url, BASE_URL)
+                if key in seen or (frontier and not frontier.should_fetch(article_url)):
+                    logger.info(f"Skipping already fetched article: {article_url}")
+                    continue
+                seen.add(key)
+                
+                logger.info(f"Processing article: {article_title}")
+                
+                # Fetch the article page, rendering it only if the static HTML lacks content
+                article_soup = fetcher.fetch_static(article_url, ['.entry-content'])
+                if article_soup is None:
+                    page = browser.get_page()
+                    limiter.acquire(article_url)
+                    with timed('browser_navigation', 'Leibal'):
+                        page.goto(article_url, wait_until='networkidle')
+                        page.wait_for_selector('.entry-content', timeout=10000)
+                    article_soup = parse_html(page.content())
+                
+                with timed('extraction', 'Leibal'):
                     # Extract content
                     content_div = article_soup.select_one('.entry-content')
                     content = ""
@@ -75,30 +131,40 @@ def scrape_leibal():
                     # Extract date
                     date_elem = article_soup.select_one('.entry-date') or \
                                article_soup.select_one('time')
-                    
-                    articles.append({
-                        "source": "Leibal",
-                        "title": article_title,
-                        "url": article_url,
-                        "image_url": image['src'] if image and 'src' in image.attrs else None,
-                        "author": "Leibal",
-                        "published_at": extract_date(date_elem.get_text()) if date_elem else None,
-                        "content": content,
-                        "category": "Architecture"
-                    })
-                    
-                    logger.info(f"Successfully processed article: {article_title}")
-                    time.sleep(1)  # Be nice to their server
-                    
-                except Exception as e:
-                    logger.error(f"Error processing Leibal article: {str(e)}")
-                    continue
-            
-            browser.close()
-            
-        except Exception as e:
-            logger.error(f"Error scraping Leibal: {str(e)}")
-            browser.close()
+                
+                article = {
+                    "source": "Leibal",
+                    "title": article_title,
+                    "url": article_url,
+                    "image_url": image['src'] if image and 'src' in image.attrs else None,
+                    "author": "Leibal",
+                    "published_at": extract_date(date_elem.get_text()) if date_elem else None,
+                    "content": content,
+                    "content_hash": content_hash(content),
+                    "category": "Architecture"
+                }
+                
+                logger.info(f"Successfully processed article: {article_title}")
+                found += 1
+                count('articles', 'Leibal')
+                yield article
+                time.sleep(1)  # Be nice to their server
+                
+            except Exception as e:
+                count('article_errors', 'Leibal')
+                logger.error(f"Error processing Leibal article: {str(e)}")
+                continue
+        mark('extraction', 'Leibal')
+        
+    except Exception as e:
+        logger.error(f"Error scraping Leibal: {str(e)}")
+    finally:
+        browser.close()
     
-    logger.info(f"Finished scraping Leibal. Found {len(articles)} articles")
-    return articles
\ No newline at end of file
+    interceptor.stats.log_summary('Leibal')
+    fetcher.stats.log_summary('Leibal')
+    logger.info(f"Finished scraping Leibal. Found {found} articles")
+
+def scrape_leibal():
+    """Scrape articles from Leibal."""
+    return list(iter_leibal())
@@ -1,22 +1,31 @@
-import requests
-from bs4 import BeautifulSoup
 from .utils import get_page, extract_date
+from ..fingerprint import content_hash
+from ..frontier import dedupe_urls, get_frontier
 from ..logger import get_logger
+from ..metrics import count, timed
+from ..profiling import mark
 
 logger = get_logger(__name__)
 
-def scrape_metropolis():
-    """Scrape articles from Metropolis Magazine."""
+def iter_metropolis():
+    """Yield articles from Metropolis Magazine as each one is fetched and parsed"""
     BASE_URL = "https://metropolismag.com/sustainability/"
-    articles = []
     
     try:
-        soup = get_page(BASE_URL)
+        soup = get_page(BASE_URL, ttl=0, stage="discovery_fetch")
         if not soup:
-            return articles
+            return
+        mark("discovery", "Metropolis")
+        
+        # Skip listing duplicates and articles any run stored recently
+        article_elements = soup.select("article.article")
+        links = [article.select_one("a") for article in article_elements]
+        urls = [link["href"] for link in links if link and link.get("href")]
+        frontier = get_frontier()
+        wanted = set(frontier.filter_unfetched(urls) if frontier else dedupe_urls(urls))
             
         # Find all article elements
-        for article in soup.select("article.article"):
+        for article in article_elements:
             try:
                 # Extract article data
                 link = article.select_one("a")
@@ -27,16 +36,22 @@ def scrape_metropolis():
                 
                 if not (link and title):
                     continue
+                if link.get("href") not in wanted:
+                    logger.info(f"Skipping already fetched article: {link.get('href')}")
+                    continue
+                wanted.discard(link["href"])
                     
                 # Get full article content
                 article_soup = get_page(link["href"])
                 content = ""
                 if article_soup:
-                    content_div = article_soup.select_one(".article-body")
-                    if content_div:
-                        content = content_div.get_text(strip=True)
+                    with timed("extraction", "Metropolis"):
+                        content_div = article_soup.select_one(".article-body")
+                        if content_div:
+                            content = content_div.get_text(strip=True)
                 
-                articles.append({
+                count("articles", "Metropolis")
+                yield {
                     "source": "Metropolis",
                     "title": title.get_text(strip=True),
                     "url": link["href"],
@@ -44,14 +59,19 @@ def scrape_metropolis():
                     "author": author.get_text(strip=True) if author else None,
                     "published_at": extract_date(date["datetime"]) if date else None,
                     "content": content,
+                    "content_hash": content_hash(content),
                     "category": "Architecture"
-                })
+                }
                 
             except Exception as e:
+                count("article_errors", "Metropolis")
                 logger.error(f"Error processing Metropolis article: {str(e)}")
                 continue
+        mark("extraction", "Metropolis")
                 
     except Exception as e:
         logger.error(f"Error scraping Metropolis: {str(e)}")
-        
-    return articles
\ No newline at end of file
+
+def scrape_metropolis():
+    """Scrape articles from Metropolis Magazine."""
+    return list(iter_metropolis())
\ No newline at end of file
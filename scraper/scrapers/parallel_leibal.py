@@ -1,75 +1,66 @@
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional, Set
-from datetime import datetime, timedelta
-import time
-from .leibal import LeibalScraper
-from ..logger import setup_logger
+from ..parsing import parse_html
+from typing import Dict, List, Optional
+from ..logger import get_logger
+from ..fingerprint import content_hash
+from .utils import fetch_text_async
+from .http_client import create_async_session
+from .rate_limit import get_rate_limiter
+from ..frontier import dedupe_urls, get_frontier
+from ..metrics import count, timed
 
-logger = setup_logger()
+logger = get_logger(__name__)
 
-class AsyncRateLimiter:
-    def __init__(self, requests_per_minute: int):
-        self.requests_per_minute = requests_per_minute
-        self.min_interval = 60.0 / requests_per_minute
-        self._last_request_time = {}
-        self._lock = asyncio.Lock()
+class ParallelLeibalScraper:
+    """Leibal scraper over aiohttp with a bounded number of requests in flight"""
 
-    async def acquire(self, key: str = 'default'):
-        async with self._lock:
-            now = time.time()
-            if key in self._last_request_time:
-                time_since_last = now - self._last_request_time[key]
-                if time_since_last < self.min_interval:
-                    await asyncio.sleep(self.min_interval - time_since_last)
-            self._last_request_time[key] = time.time()
-
-class ParallelLeibalScraper(LeibalScraper):
     def __init__(self, base_url: str = "https://leibal.com", max_concurrent: int = 3):
-        super().__init__(base_url)
-        self.rate_limiter = AsyncRateLimiter(requests_per_minute=10)
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = get_rate_limiter()
         self.max_concurrent = max_concurrent
-        self.seen_urls: Set[str] = set()
+        self.frontier = get_frontier()
 
-    async def _async_make_request(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
-        """Make a rate-limited async request with error handling."""
+    async def _async_make_request(self, session: aiohttp.ClientSession, url: str,
+                                  ttl: Optional[float] = None, stage: str = 'article_fetch') -> Optional[str]:
+        """Make a rate-limited, cached async request with error handling."""
         try:
-            await self.rate_limiter.acquire()
-            async with session.get(url) as response:
-                response.raise_for_status()
-                return await response.text()
+            status, text = await fetch_text_async(session, url, ttl=ttl, stage=stage)
+            if status >= 400:
+                raise aiohttp.ClientError(f"{status} Error for url: {url}")
+            return text
         except Exception as e:
             logger.error(f"Error fetching {url}: {str(e)}")
             return None
 
     async def parse_article_async(self, session: aiohttp.ClientSession, url: str) -> Optional[Dict]:
         """Asynchronously parse a single article page."""
-        if url in self.seen_urls:
-            return None
-        
-        self.seen_urls.add(url)
         html = await self._async_make_request(session, url)
         if not html:
             return None
 
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = parse_html(html)
             
-            # Extract article metadata (same as synchronous version)
-            title = soup.find('h1', class_='entry-title').text.strip()
-            content = soup.find('div', class_='entry-content')
-            images = [img['src'] for img in content.find_all('img') if 'src' in img.attrs]
-            
-            meta = soup.find('div', class_='entry-meta')
-            author = meta.find('a', rel='author').text if meta else "Unknown"
-            date_str = meta.find('time')['datetime'] if meta else None
+            with timed('extraction', 'Leibal'):
+                # Extract article metadata (same as synchronous version)
+                title = soup.find('h1', class_='entry-title').text.strip()
+                content = soup.find('div', class_='entry-content')
+                images = [img['src'] for img in content.find_all('img') if 'src' in img.attrs]
+                
+                meta = soup.find('div', class_='entry-meta')
+                author = meta.find('a', rel='author').text if meta else "Unknown"
+                date_str = meta.find('time')['datetime'] if meta else None
+
+                text = content.get_text(separator='\n\n')
 
+            count('articles', 'Leibal')
             return {
                 "source": "Leibal",
                 "url": url,
                 "title": title,
-                "content": content.get_text(separator='\n\n'),
+                "content": text,
+                "content_hash": content_hash(text),
                 "image_url": images[0] if images else None,
                 "additional_images": images[1:],
                 "author": author,
@@ -77,18 +68,19 @@ class ParallelLeibalScraper(LeibalScraper):
                 "tags": [tag.text for tag in soup.find_all('a', rel='tag')]
             }
         except Exception as e:
+            count('article_errors', 'Leibal')
             logger.error(f"Error parsing article {url}: {str(e)}")
             return None
 
     async def get_article_urls_async(self, session: aiohttp.ClientSession, page: int = 1) -> List[str]:
         """Asynchronously get article URLs from the archive page."""
         archive_url = f"{self.base_url}/architecture/page/{page}"
-        html = await self._async_make_request(session, archive_url)
+        html = await self._async_make_request(session, archive_url, ttl=0, stage='discovery_fetch')
         if not html:
             return []
 
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = parse_html(html)
             articles = soup.find_all('article')
             return [article.find('a')['href'] for article in articles if article.find('a')]
         except Exception as e:
@@ -97,7 +89,7 @@ class ParallelLeibalScraper(LeibalScraper):
 
     async def scrape_articles_async(self, urls: List[str]) -> List[Dict]:
         """Scrape multiple articles concurrently with rate limiting."""
-        async with aiohttp.ClientSession(headers=self.session.headers) as session:
+        async with create_async_session(limit_per_host=self.max_concurrent) as session:
             tasks = []
             semaphore = asyncio.Semaphore(self.max_concurrent)
             
@@ -114,7 +106,7 @@ class ParallelLeibalScraper(LeibalScraper):
 
     async def scrape_recent_articles_async(self, num_pages: int = 3) -> List[Dict]:
         """Scrape recent articles from multiple pages asynchronously."""
-        async with aiohttp.ClientSession(headers=self.session.headers) as session:
+        async with create_async_session(limit_per_host=self.max_concurrent) as session:
             # Get all URLs first
             url_tasks = [
                 asyncio.create_task(self.get_article_urls_async(session, page))
@@ -122,6 +114,11 @@ class ParallelLeibalScraper(LeibalScraper):
             ]
             url_lists = await asyncio.gather(*url_tasks)
             all_urls = [url for urls in url_lists for url in urls]
+            # Canonical dedupe, skipping articles any run fetched recently
+            if self.frontier:
+                all_urls = self.frontier.filter_unfetched(all_urls)
+            else:
+                all_urls = dedupe_urls(all_urls)
             
             logger.info(f"Found {len(all_urls)} articles to scrape")
             return await self.scrape_articles_async(all_urls)
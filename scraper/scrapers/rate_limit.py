@@ -0,0 +1,159 @@
+import asyncio
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from scraper.logger import get_logger
+from scraper.metrics import timed
+
+logger = get_logger(__name__)
+
+# host -> (requests per second, burst capacity)
+HOST_LIMITS: Dict[str, Tuple[float, float]] = {
+    'www.dezeen.com': (2.0, 4),
+    'leibal.com': (10 / 60, 3),
+    'metropolismag.com': (1.0, 2),
+}
+DEFAULT_LIMIT = (1.0, 2)
+
+# Defaults for buckets kept apart from page fetches, keyed "<scope>:<host>".
+# Images come from CDN hosts listed nowhere above; their own buckets keep
+# downloads concurrent without delaying page fetches to the same host
+SCOPE_LIMITS: Dict[str, Tuple[float, float]] = {
+    'images': (8.0, 8),
+}
+
+# Used when a 429 carries no usable Retry-After header
+DEFAULT_RETRY_AFTER = 30.0
+
+def _limits_from_env() -> Dict[str, Tuple[float, float]]:
+    """Parse SCRAPER_RATE_LIMITS, e.g. "leibal.com=0.5:2,www.dezeen.com=4:8,images:static.dezeen.com=4:4" """
+    limits = {}
+    for item in filter(None, os.getenv('SCRAPER_RATE_LIMITS', '').split(',')):
+        try:
+            host, spec = item.split('=')
+            rate, _, burst = spec.partition(':')
+            limits[host.strip()] = (float(rate), float(burst or 1))
+        except ValueError:
+            logger.warning(f"Ignoring malformed rate limit: {item}")
+    return limits
+
+def parse_retry_after(value: Optional[str], default: float = DEFAULT_RETRY_AFTER) -> float:
+    """Convert a Retry-After header (seconds or HTTP-date) into seconds to wait"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+class TokenBucket:
+    """Token bucket with burst capacity and FIFO reservations.
+
+    reserve() takes a token under the lock and returns how long the caller
+    must wait before using it. The balance may go negative, so each caller
+    queues behind everyone who reserved before it, and nobody sleeps while
+    holding the lock.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so the next reservation waits at least `seconds`"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+def _key(url: str, scope: Optional[str] = None) -> str:
+    host = urlparse(url).netloc or url
+    return f"{scope}:{host}" if scope else host
+
+class RateLimiter:
+    """Per-host token buckets shared by every sync and async fetch path.
+
+    A `scope` gives a kind of request, such as image downloads, buckets of
+    its own next to the host's page bucket.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 default: Tuple[float, float] = DEFAULT_LIMIT):
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self.default = default
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str, scope: Optional[str] = None) -> TokenBucket:
+        key = _key(url, scope)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate, capacity = self.limits.get(key, SCOPE_LIMITS.get(scope, self.default))
+                bucket = self._buckets[key] = TokenBucket(rate, capacity)
+            return bucket
+
+    def configure(self, url: str, rate: float, capacity: float):
+        """Override the limit for the URL's host"""
+        host = urlparse(url).netloc or url
+        with self._lock:
+            self.limits[host] = (rate, capacity)
+            self._buckets[host] = TokenBucket(rate, capacity)
+
+    def acquire(self, url: str, scope: Optional[str] = None):
+        """Block the calling thread until a request to the URL's host is allowed"""
+        # Recorded as its own stage, so fetch latency excludes throttling
+        with timed('rate_limit_wait'):
+            delay = self.bucket(url, scope).reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+    async def acquire_async(self, url: str, scope: Optional[str] = None):
+        """Wait without blocking the event loop until a request to the URL's host is allowed"""
+        with timed('rate_limit_wait'):
+            delay = self.bucket(url, scope).reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def penalize(self, url: str, retry_after: Optional[str] = None, scope: Optional[str] = None):
+        """Back off a host after a 429, honoring its Retry-After header"""
+        seconds = parse_retry_after(retry_after)
+        logger.warning(f"Rate limited by {urlparse(url).netloc}, backing off {seconds:.1f}s")
+        self.bucket(url, scope).penalize(seconds)
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter({**HOST_LIMITS, **_limits_from_env()})
+    return _limiter
@@ -1,19 +1,82 @@
 import requests
-from bs4 import BeautifulSoup
+from scraper.parsing import parse_html
 from datetime import datetime
 from scraper.logger import get_logger
+from scraper.scrapers.cache import get_cache
+from scraper.scrapers.http_client import get_client
+from scraper.scrapers.rate_limit import get_rate_limiter
+from scraper.metrics import count, timed
 
 logger = get_logger(__name__)
 
-def get_page(url):
+def fetch_text(url, headers=None, timeout=None, ttl=None, stage='article_fetch'):
+    """Fetch a page through the response cache, returning (status_code, text).
+
+    Fresh entries are served without a request; stale ones are revalidated
+    with a conditional GET and reused on 304 Not Modified. Network requests
+    go through the shared per-host rate limiter, and only the request itself
+    is timed as `stage`.
+    """
+    cache = get_cache()
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry, ttl):
+        count('cache_hits')
+        return 200, entry.body
+
+    request_headers = dict(headers or {})
+    if entry:
+        request_headers.update(cache.conditional_headers(entry))
+
+    limiter = get_rate_limiter()
+    limiter.acquire(url)
+    with timed(stage):
+        response = get_client().get(url, headers=request_headers, timeout=timeout)
+    count('http_requests')
+    if response.status_code >= 400:
+        count('http_errors')
+    if response.status_code == 429:
+        limiter.penalize(url, response.headers.get('Retry-After'))
+    if response.status_code == 304 and entry:
+        cache.refresh(entry, response.headers)
+        return 200, entry.body
+    if response.status_code == 200 and cache:
+        cache.put(url, response.text, response.headers)
+    return response.status_code, response.text
+
+async def fetch_text_async(session, url, ttl=None, stage='article_fetch'):
+    """Async variant of fetch_text for an aiohttp session"""
+    cache = get_cache()
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry, ttl):
+        count('cache_hits')
+        return 200, entry.body
+
+    headers = cache.conditional_headers(entry) if entry else {}
+    limiter = get_rate_limiter()
+    await limiter.acquire_async(url)
+    with timed(stage):
+        async with session.get(url, headers=headers) as response:
+            status, response_headers = response.status, response.headers
+            text = await response.text()
+    count('http_requests')
+    if status >= 400:
+        count('http_errors')
+    if status == 429:
+        limiter.penalize(url, response_headers.get('Retry-After'))
+    if status == 304 and entry:
+        cache.refresh(entry, response_headers)
+        return 200, entry.body
+    if status == 200 and cache:
+        cache.put(url, text, response_headers)
+    return status, text
+
+def get_page(url, ttl=None, stage='article_fetch'):
     """Fetch and parse a webpage."""
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, "html.parser")
+        status, text = fetch_text(url, ttl=ttl, stage=stage)
+        if status >= 400:
+            raise requests.HTTPError(f"{status} Error for url: {url}")
+        return parse_html(text)
     except Exception as e:
         logger.error(f"Error fetching {url}: {str(e)}")
         return None
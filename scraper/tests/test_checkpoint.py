@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+from scraper import checkpoint as checkpoint_module
+from scraper.checkpoint import CrawlCheckpoint
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "checkpoints" / "run.json")
+
+
+def test_fresh_checkpoint_starts_at_the_first_page(path):
+    checkpoint = CrawlCheckpoint.open(path, resume=True)
+    assert checkpoint.next_page("Leibal") == 1
+    assert not checkpoint.is_done("Leibal")
+
+
+def test_resume_restores_pages_urls_and_finished_sources(path):
+    checkpoint = CrawlCheckpoint.open(path)
+    checkpoint.start_page("Leibal", 1, ["https://leibal.com/a", "https://leibal.com/b"])
+    checkpoint.complete_url("Leibal", "https://leibal.com/a")
+    checkpoint.complete_url("Leibal", "https://leibal.com/b")
+    checkpoint.complete_page("Leibal", 1)
+    checkpoint.start_page("Leibal", 2, ["https://leibal.com/c", "https://leibal.com/d"])
+    checkpoint.complete_url("Leibal", "https://leibal.com/c")
+    checkpoint.complete_source("Dezeen")
+    checkpoint.save()
+
+    resumed = CrawlCheckpoint.open(path, resume=True)
+    assert resumed.next_page("Leibal") == 2
+    assert resumed.remaining("Leibal", ["https://leibal.com/c", "https://leibal.com/d"]) == ["https://leibal.com/d"]
+    assert resumed.is_completed("Leibal", "https://leibal.com/a")
+    assert resumed.is_done("Dezeen")
+    assert not resumed.is_done("Leibal")
+
+
+def test_open_without_resume_ignores_the_saved_checkpoint(path):
+    checkpoint = CrawlCheckpoint.open(path)
+    checkpoint.complete_page("Leibal", 3)
+    assert CrawlCheckpoint.open(path).next_page("Leibal") == 1
+
+
+def test_unreadable_checkpoint_starts_fresh(path):
+    checkpoint = CrawlCheckpoint.open(path)
+    checkpoint.save()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"sources": ')
+    assert CrawlCheckpoint.open(path, resume=True).next_page("Leibal") == 1
+
+
+def test_complete_page_never_moves_backwards(path):
+    checkpoint = CrawlCheckpoint.open(path)
+    checkpoint.complete_page("Leibal", 3)
+    checkpoint.complete_page("Leibal", 2)
+    assert checkpoint.next_page("Leibal") == 4
+
+
+def test_unforced_saves_are_throttled(path):
+    checkpoint = CrawlCheckpoint(path, min_interval=3600)
+    checkpoint.save()
+    checkpoint.complete_url("Leibal", "https://leibal.com/a")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["sources"] == {}
+    checkpoint.save()
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["sources"]["Leibal"]["completed"] == ["https://leibal.com/a"]
+
+
+def test_failed_save_keeps_the_previous_checkpoint(path, monkeypatch):
+    checkpoint = CrawlCheckpoint.open(path)
+    checkpoint.complete_page("Leibal", 1)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(checkpoint_module.os, "replace", fail)
+    with pytest.raises(OSError):
+        checkpoint.complete_page("Leibal", 2)
+    monkeypatch.undo()
+
+    assert CrawlCheckpoint.open(path, resume=True).next_page("Leibal") == 2
+    assert os.listdir(os.path.dirname(path)) == ["run.json"]
+
+
+def test_clear_removes_the_checkpoint(path):
+    checkpoint = CrawlCheckpoint.open(path)
+    checkpoint.save()
+    checkpoint.clear()
+    checkpoint.clear()
+    assert CrawlCheckpoint.open(path, resume=True).next_page("Leibal") == 1
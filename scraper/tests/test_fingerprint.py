@@ -0,0 +1,36 @@
+from scraper.base_scraper import ContentBlock
+from scraper.fingerprint import block_hashes, content_hash, fingerprint, normalize_text, split_blocks
+
+
+def test_normalize_text_collapses_whitespace_and_unicode_forms():
+    assert normalize_text("  Concrete house\n\n in\tOslo ") == "Concrete house in Oslo"
+    assert normalize_text("ﬁve") == "five"
+    assert normalize_text(None) == ""
+
+
+def test_content_hash_ignores_cosmetic_differences():
+    assert content_hash("A house  in Oslo") == content_hash("A house\nin Oslo ")
+    assert content_hash("A house in Oslo") != content_hash("A house in Bergen")
+
+
+def test_content_hash_of_missing_text_matches_empty_text():
+    assert content_hash(None) == content_hash("")
+
+
+def test_split_blocks_drops_blank_blocks():
+    assert split_blocks("First\n\n  \n\nSecond\nline\n\n") == ["First", "Second\nline"]
+    assert split_blocks("") == []
+
+
+def test_block_hashes_include_block_type():
+    paragraph = ContentBlock(type="paragraph", content="Brutalist")
+    heading = ContentBlock(type="heading", content="Brutalist")
+    assert block_hashes([paragraph])[0] != block_hashes([heading])[0]
+    assert block_hashes(["Brutalist"]) == [content_hash("Brutalist")]
+
+
+def test_fingerprint_splits_text_when_no_blocks_are_given():
+    result = fingerprint("First\n\nSecond")
+    assert result["content_hash"] == content_hash("First\n\nSecond")
+    assert result["block_hashes"] == [content_hash("First"), content_hash("Second")]
+    assert fingerprint("First\n\nSecond", blocks=[])["block_hashes"] == []
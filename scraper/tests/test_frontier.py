@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from scraper.frontier import BloomFilter, URLFrontier, canonicalize_url, dedupe_urls
+
+
+@pytest.fixture
+def frontier(tmp_path):
+    frontier = URLFrontier(str(tmp_path / "urls.sqlite"), capacity=100)
+    yield frontier
+    frontier.close()
+
+
+def test_canonicalize_url_normalizes_equivalent_forms():
+    expected = "https://dezeen.com/2024/01/house?a=1&b=2"
+    assert canonicalize_url("http://WWW.Dezeen.com:80/2024/01/house/?b=2&a=1#comments") == expected
+    assert canonicalize_url("https://dezeen.com/2024/01/house?utm_source=x&a=1&fbclid=y&b=2") == expected
+
+
+def test_canonicalize_url_keeps_meaningful_differences():
+    assert canonicalize_url("https://leibal.com:8443/a") == "https://leibal.com:8443/a"
+    assert canonicalize_url("https://leibal.com/a?page=2") != canonicalize_url("https://leibal.com/a?page=3")
+    assert canonicalize_url("https://leibal.com") == "https://leibal.com/"
+
+
+def test_canonicalize_url_resolves_relative_urls():
+    assert canonicalize_url("/architecture/house/", base="https://leibal.com/architecture/") == \
+        "https://leibal.com/architecture/house"
+
+
+def test_dedupe_urls_keeps_the_first_of_each_url_in_order():
+    urls = ["https://leibal.com/b/", None, "https://leibal.com/a", "", "http://www.leibal.com/b"]
+    assert dedupe_urls(urls) == ["https://leibal.com/b/", "https://leibal.com/a"]
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000)
+    keys = [f"https://leibal.com/{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert bloom.full
+    false_positives = sum(f"https://dezeen.com/{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+def test_bloom_filter_round_trips_through_a_file(tmp_path):
+    path = str(tmp_path / "urls.bloom")
+    bloom = BloomFilter(capacity=100)
+    bloom.add("https://leibal.com/a")
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+    assert "https://leibal.com/a" in loaded
+    assert (loaded.capacity, loaded.count, loaded.bits) == (bloom.capacity, bloom.count, bloom.bits)
+
+
+def test_bloom_filter_rejects_a_truncated_file(tmp_path):
+    path = tmp_path / "urls.bloom"
+    BloomFilter(capacity=100).save(str(path))
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        BloomFilter.load(str(path))
+
+
+def test_frontier_filters_stored_urls(frontier):
+    frontier.mark_fetched("https://leibal.com/a/", "Leibal")
+    assert "http://www.leibal.com/a" in frontier
+    assert "https://leibal.com/b" not in frontier
+    urls = ["https://leibal.com/a", "https://leibal.com/b", "https://leibal.com/b/"]
+    assert frontier.filter_unfetched(urls) == ["https://leibal.com/b"]
+    assert not frontier.should_fetch("https://leibal.com/a?utm_source=feed")
+
+
+def test_frontier_refetches_old_and_modified_urls(frontier, monkeypatch):
+    frontier.mark_fetched("https://leibal.com/a")
+    assert frontier.filter_unfetched(["https://leibal.com/a"], max_age=0) == ["https://leibal.com/a"]
+    modified = {"https://leibal.com/a": time.time() + 60}
+    assert frontier.filter_unfetched(["https://leibal.com/a"], modified=modified) == ["https://leibal.com/a"]
+
+    later = time.time() + 8 * 24 * 3600
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert frontier.should_fetch("https://leibal.com/a")
+
+
+def test_frontier_persists_across_instances(tmp_path):
+    path = str(tmp_path / "urls.sqlite")
+    frontier = URLFrontier(path, capacity=100)
+    frontier.mark_fetched("https://leibal.com/a")
+    frontier.close()
+
+    reopened = URLFrontier(path, capacity=100)
+    try:
+        assert "https://leibal.com/a" in reopened
+        assert reopened.bloom.count == 1
+    finally:
+        reopened.close()
+
+
+def test_frontier_grows_its_bloom_filter_when_full(frontier):
+    for i in range(150):
+        frontier.mark_fetched(f"https://leibal.com/{i}")
+    assert frontier.bloom.capacity >= 200
+    assert all(f"https://leibal.com/{i}" in frontier for i in range(150))
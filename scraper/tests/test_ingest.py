@@ -0,0 +1,99 @@
+import pytest
+
+from scraper.ingest import BulkIngestor
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.rows = None
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        return self
+
+    def update(self, values):
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        if self.table == "sources" and self.rows is None:
+            return FakeResponse([{"id": "leibal-id", "name": "Leibal"}])
+        if self.rows is not None:
+            if self.client.fail_upserts:
+                raise RuntimeError("upsert failed")
+            self.client.upserts.append(self.rows)
+            return FakeResponse([])
+        return FakeResponse(list(self.client.stored.values()))
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeSupabase:
+    """Enough of the Supabase client for BulkIngestor"""
+
+    def __init__(self, stored=None, fail_upserts=False):
+        self.stored = stored or {}
+        self.fail_upserts = fail_upserts
+        self.upserts = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def article(url, content="Concrete house", **extra):
+    return {"source": "Leibal", "title": url, "url": url, "content": content, **extra}
+
+
+@pytest.fixture(autouse=True)
+def no_frontier(monkeypatch):
+    monkeypatch.setenv("SCRAPER_FRONTIER_DISABLED", "1")
+
+
+def test_counts_inserted_updated_and_unchanged_rows():
+    ingestor = BulkIngestor(FakeSupabase())
+    ingestor.ingest_batch([article("https://leibal.com/a")])
+    row = ingestor.supabase.upserts[0][0]
+    ingestor.supabase.stored = {row["url"]: row}
+
+    ingestor.ingest_batch([article("https://leibal.com/a"), article("https://leibal.com/b")])
+    ingestor.ingest_batch([article("https://leibal.com/a", content="Timber house")])
+    assert ingestor.stats == {"inserted": 2, "updated": 1, "unchanged": 1, "skipped": 0, "failed": 0}
+
+
+def test_failed_upsert_is_counted_only_as_failed():
+    ingestor = BulkIngestor(FakeSupabase(fail_upserts=True))
+    stats = ingestor.ingest([article("https://leibal.com/a"), article("https://leibal.com/b")])
+    assert stats["inserted"] == 0
+    assert stats["updated"] == 0
+    assert stats["failed"] == 2
+
+
+def test_rows_without_image_variants_keep_the_stored_ones():
+    variants = [{"width": 640, "path": "a-640.webp"}]
+    stored = {
+        "https://leibal.com/a": {"url": "https://leibal.com/a", "content_hash": None, "image_variants": variants},
+    }
+    ingestor = BulkIngestor(FakeSupabase(stored))
+    ingestor.ingest_batch([
+        article("https://leibal.com/a", content="Timber house"),
+        article("https://leibal.com/b", image_variants=[{"width": 640, "path": "b-640.webp"}]),
+    ])
+    rows = {row["url"]: row for row in ingestor.supabase.upserts[0]}
+    assert rows["https://leibal.com/a"]["image_variants"] == variants
+    assert rows["https://leibal.com/b"]["image_variants"] == [{"width": 640, "path": "b-640.webp"}]
+
+
+def test_image_variants_are_left_out_of_batches_without_them():
+    ingestor = BulkIngestor(FakeSupabase())
+    ingestor.ingest_batch([article("https://leibal.com/a")])
+    assert "image_variants" not in ingestor.supabase.upserts[0][0]
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from scraper.pipeline import StreamingPipeline
+
+
+class Writer:
+    """Records written batches, failing those that contain a poisoned article"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, batch):
+        if any(article.get("fail") for article in batch):
+            raise RuntimeError("write failed")
+        self.batches.append([article["url"] for article in batch])
+
+
+def test_flush_writes_partial_batches_and_reports_success():
+    writer = Writer()
+    with StreamingPipeline(writer, batch_size=10, flush_interval=60) as pipeline:
+        pipeline.put("Leibal", {"url": "a"})
+        pipeline.put("Dezeen", {"url": "b"})
+        assert pipeline.flush(timeout=5)
+        assert writer.batches == [["a", "b"]]
+    assert pipeline.stats == {"received": 2, "written": 2, "failed": 0, "batches": 1}
+    assert pipeline.counts == {"Leibal": 1, "Dezeen": 1}
+
+
+def test_full_batches_are_written_at_batch_size():
+    writer = Writer()
+    with StreamingPipeline(writer, batch_size=2, flush_interval=60) as pipeline:
+        for url in "abcde":
+            pipeline.put("Leibal", {"url": url})
+    assert writer.batches == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_flush_reports_a_failed_write_for_the_rest_of_the_run():
+    writer = Writer()
+    with StreamingPipeline(writer, batch_size=10, flush_interval=60) as pipeline:
+        pipeline.put("Leibal", {"url": "a", "fail": True})
+        assert not pipeline.flush(timeout=5)
+        # Later batches still go out, but the earlier loss is not forgotten
+        pipeline.put("Leibal", {"url": "b"})
+        assert not pipeline.flush(timeout=5)
+    assert writer.batches == [["b"]]
+    assert pipeline.stats["failed"] == 1
+    assert pipeline.stats["written"] == 1
+
+
+def test_partial_batch_is_written_after_the_flush_interval():
+    written = threading.Event()
+
+    def write_batch(batch):
+        written.set()
+
+    with StreamingPipeline(write_batch, batch_size=10, flush_interval=0.05) as pipeline:
+        pipeline.put("Leibal", {"url": "a"})
+        assert written.wait(5)
+
+
+def test_flush_times_out_while_a_write_is_stuck():
+    release = threading.Event()
+
+    def write_batch(batch):
+        release.wait(5)
+
+    with StreamingPipeline(write_batch, batch_size=1, flush_interval=60) as pipeline:
+        pipeline.put("Leibal", {"url": "a"})
+        with pytest.raises(TimeoutError):
+            pipeline.flush(timeout=0.05)
+        release.set()
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from scraper.scrapers import rate_limit
+from scraper.scrapers.rate_limit import (
+    DEFAULT_LIMIT, DEFAULT_RETRY_AFTER, SCOPE_LIMITS, RateLimiter, TokenBucket, parse_retry_after
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_reserve_allows_the_burst_without_waiting(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_reserve_queues_callers_in_order(clock):
+    bucket = TokenBucket(rate=2.0, capacity=1)
+    assert bucket.reserve() == 0.0
+    # Each caller waits behind everyone who reserved before it
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+
+
+def test_reserve_refills_over_time_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 0.5
+    assert bucket.reserve() == 0.0
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.reserve() == 0.5
+
+
+def test_penalize_delays_the_next_reservation(clock):
+    bucket = TokenBucket(rate=1.0, capacity=5)
+    bucket.penalize(10)
+    assert bucket.reserve() == pytest.approx(11.0)
+    clock.now += 12
+    assert bucket.reserve() == 0.0
+
+
+def test_parse_retry_after_reads_seconds():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("-5") == 0.0
+
+
+def test_parse_retry_after_reads_http_dates():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(60, abs=2)
+    past = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+def test_parse_retry_after_falls_back_to_the_default():
+    assert parse_retry_after(None) == DEFAULT_RETRY_AFTER
+    assert parse_retry_after("soon") == DEFAULT_RETRY_AFTER
+    assert parse_retry_after("", default=5.0) == 5.0
+
+
+def test_limiter_uses_host_limits_and_the_default():
+    limiter = RateLimiter({"leibal.com": (0.5, 3)})
+    bucket = limiter.bucket("https://leibal.com/architecture/")
+    assert (bucket.rate, bucket.capacity) == (0.5, 3)
+    assert limiter.bucket("https://leibal.com/other/") is bucket
+    other = limiter.bucket("https://example.com/")
+    assert (other.rate, other.capacity) == DEFAULT_LIMIT
+
+
+def test_scoped_buckets_are_separate_from_page_buckets():
+    limiter = RateLimiter({"static.dezeen.com": (0.5, 1)})
+    page = limiter.bucket("https://static.dezeen.com/a.jpg")
+    image = limiter.bucket("https://static.dezeen.com/a.jpg", scope="images")
+    assert image is not page
+    assert (image.rate, image.capacity) == SCOPE_LIMITS["images"]
@@ -0,0 +1,45 @@
+-- Add content fingerprint columns so change detection never ships article bodies
+ALTER TABLE public.articles
+ADD COLUMN IF NOT EXISTS content_hash TEXT,
+ADD COLUMN IF NOT EXISTS block_hashes JSONB;
+
+-- Add index for hash lookups
+CREATE INDEX IF NOT EXISTS idx_articles_content_hash
+    ON public.articles(content_hash);
+
+-- Compare fingerprints instead of full TEXT columns when both rows carry one
+CREATE OR REPLACE FUNCTION handle_article_update()
+RETURNS TRIGGER AS $$
+DECLARE
+    content_changed BOOLEAN;
+BEGIN
+    -- Update scraping metadata
+    NEW.last_scraped_at = NOW();
+    NEW.scraping_attempts = COALESCE(OLD.scraping_attempts, 0) + 1;
+
+    -- Update content status
+    IF NEW.content_hash IS NOT NULL AND OLD.content_hash IS NOT NULL THEN
+        content_changed = NEW.content_hash IS DISTINCT FROM OLD.content_hash;
+    ELSE
+        content_changed = NEW.original_content IS NOT NULL
+            AND NEW.original_content IS DISTINCT FROM OLD.original_content;
+    END IF;
+
+    IF content_changed THEN
+        NEW.is_processed = FALSE;
+        NEW.transformed_content = NULL;
+    END IF;
+
+    -- Set status based on condition
+    IF NEW.scraping_status = 'completed' AND NEW.original_content IS NULL THEN
+        NEW.scraping_status = 'failed';
+        NEW.last_scraping_error = 'No content found';
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add comments for documentation
+COMMENT ON COLUMN public.articles.content_hash IS 'SHA-256 of the normalized article text';
+COMMENT ON COLUMN public.articles.block_hashes IS 'SHA-256 per structured content block, in document order';
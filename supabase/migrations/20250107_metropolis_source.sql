@@ -0,0 +1,4 @@
+-- Register Metropolis so its results are ingested alongside the other sources
+INSERT INTO public.sources (name, url) VALUES
+('Metropolis', 'https://metropolismag.com/')
+ON CONFLICT (name) DO NOTHING;
@@ -0,0 +1,27 @@
+-- Resized WebP variants of each article's images, stored by content hash
+ALTER TABLE public.articles
+ADD COLUMN IF NOT EXISTS image_variants JSONB;
+
+-- Bucket the scrapers upload variants to; objects are public and immutable
+INSERT INTO storage.buckets (id, name, public)
+VALUES ('article-images', 'article-images', true)
+ON CONFLICT (id) DO NOTHING;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_policies
+        WHERE schemaname = 'storage'
+            AND tablename = 'objects'
+            AND policyname = 'Article images are publicly accessible'
+    ) THEN
+        CREATE POLICY "Article images are publicly accessible"
+            ON storage.objects FOR SELECT
+            USING (bucket_id = 'article-images');
+    END IF;
+END
+$$;
+
+-- Add comments for documentation
+COMMENT ON COLUMN public.articles.image_variants IS
+    'Per image: source url, role (main or additional), sha256 and WebP variants as {width, height, path, bytes}; paths are relative to the article-images bucket';